@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from Utils.Metrics import Metrics, CONTENT_TYPE
+
+router = APIRouter()
+
+
+# ------------------------------
+# Metrics API
+# ------------------------------
+
+@router.get("/metrics", tags=["metrics"])
+async def get_metrics() -> Response:
+    return Response(content=Metrics().render(), media_type=CONTENT_TYPE)
@@ -1,4 +1,7 @@
+import asyncio
+
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 from Manager.ManagerLib.ManagerComponents import ManagerComponents
 from Models.OrchestratorModels import *
@@ -7,6 +10,9 @@ from Modules.SubModuleMgr import SubModuleMgr
 
 router = APIRouter()
 
+# Comment lines keep idle connections open through proxies
+PROGRESS_KEEPALIVE_S: float = 15.0
+
 # ------------------------------
 # Task API
 # ------------------------------
@@ -43,6 +49,10 @@ async def init_task(task: TaskInitRequest) -> TaskInitResponse:
 async def query_task_minimal() -> TaskMinimalQueryAllResponse:
     return ManagerComponents().get_test_task_mgr().api_minimal_query_all_tasks()
 
+@router.post("/orchestrator/task/query/page", tags=["orchestrator"])
+async def query_task_page(page: TaskPageRequest) -> TaskPageResponse:
+    return ManagerComponents().get_test_task_mgr().api_query_task_page(page)
+
 @router.post("/orchestrator/task/config/spec", tags=["orchestrator"])
 async def query_task_config_spec(task: TaskOperationRequest) -> TaskConfigSpecResponse:
     return ManagerComponents().get_test_task_mgr().api_get_task_config_spec(task)
@@ -67,6 +77,52 @@ async def query_active_submodules() -> SubModuleQueryResponse:
 
     return SubModuleQueryResponse(submodules=modules)
 
+# ------------------------------
+# Results API
+# ------------------------------
+
+@router.post("/orchestrator/results/stats", tags=["orchestrator"])
+async def query_result_stats(request: ResultStatsRequest) -> ResultStatsResponse:
+    return ManagerComponents().get_result_store().api_get_stats(request)
+
+@router.post("/orchestrator/results/ratings", tags=["orchestrator"])
+async def query_result_ratings(request: RatingsRequest) -> RatingsResponse:
+    return ManagerComponents().get_result_store().api_get_ratings(request)
+
+# ------------------------------
+# Progress API
+# ------------------------------
+
+# Server-Sent Events stream, the first event is sent right away and later ones at most once per progress interval
+@router.get("/orchestrator/progress/stream", tags=["orchestrator"])
+async def stream_progress() -> StreamingResponse:
+    return StreamingResponse(_progress_events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+async def _progress_events():
+    broadcaster = ManagerComponents().get_progress_broadcaster()
+    update = asyncio.Event()
+    broadcaster.subscribe(asyncio.get_running_loop(), update)
+    version = -1
+
+    try:
+        while broadcaster.is_running():
+            # Cleared before reading, so an event published in between sets it again
+            update.clear()
+            new_version, payload = broadcaster.get_latest()
+
+            if new_version != version:
+                version = new_version
+                yield f"id: {version}\nevent: progress\ndata: {payload}\n\n"
+                continue
+
+            try:
+                await asyncio.wait_for(update.wait(), PROGRESS_KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(update)
+
 # ------------------------------
 # Worker API
 # ------------------------------
@@ -0,0 +1,318 @@
+from collections import deque
+from threading import Thread, Condition
+from typing import Deque, Callable
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.TestJob import TestJobRequest
+from Manager.ManagerLib.Worker import Worker
+from Models.OrchestratorModels import WorkerState, JobState
+from Utils.Logger import Logger, LogLevel
+from Utils.RWLock import MgrModel
+from Utils.SettingsLoader import SettingsLoader
+
+
+class WorkerLane:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    worker: Worker
+    queue: Deque[TestJobRequest]
+    queued_games: int
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, worker: Worker) -> None:
+        self.worker = worker
+        self.queue = deque()
+        self.queued_games = 0
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def push(self, job: TestJobRequest) -> None:
+        self.queue.append(job)
+        self.queued_games += job.get_num_games()
+
+    def pop_front(self) -> TestJobRequest:
+        job = self.queue.popleft()
+        self.queued_games -= job.get_num_games()
+        return job
+
+    def pop_back(self) -> TestJobRequest:
+        job = self.queue.pop()
+        self.queued_games -= job.get_num_games()
+        return job
+
+    # Until the first games finish every core is assumed to play one game per second
+    def get_rate(self) -> float:
+        rate = self.worker.get_games_per_s()
+        return rate if rate > 0 else float(self.worker.get_cpus())
+
+    def get_target_games(self) -> float:
+        return max(2 * self.worker.get_cpus(), self.get_rate() * SettingsLoader().get_settings().job_assign_horizon)
+
+    def get_assigned_games(self) -> int:
+        return self.queued_games + self.worker.get_inflight_games()
+
+    # Expected time until the worker runs out of assigned work
+    def get_drain_time(self, extra_games: int = 0) -> float:
+        return (self.get_assigned_games() + extra_games) / self.get_rate()
+
+
+class JobAssigner(MgrModel):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _pending: Deque[TestJobRequest]
+    _lanes: dict[int, WorkerLane]
+    _duplicates: list[TestJobRequest]
+
+    _cv: Condition
+    _should_work: bool
+    _has_work: bool
+    _thread: Thread
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._pending = deque()
+        self._lanes = dict[int, WorkerLane]()
+        self._duplicates = list[TestJobRequest]()
+
+        self._cv = Condition()
+        self._should_work = True
+        self._has_work = False
+        self._thread = Thread(target=self._assigner_thread)
+        self._thread.start()
+
+        Logger().log_info("JobAssigner created", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        with self._cv:
+            self._should_work = False
+            self._cv.notify_all()
+
+        self._thread.join()
+
+        Logger().log_info(f"JobAssigner destroyed, dropped jobs: {self.get_num_queued_jobs()}", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Jobs must be in CREATED state, they are bound to a worker only when its capacity allows it
+    def submit_jobs(self, jobs: list[TestJobRequest]) -> None:
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().save_jobs([job.to_record() for job in jobs])
+
+        with self.get_lock().write():
+            self._pending.extend(jobs)
+
+        self.wake()
+
+    def drop_task_jobs(self, task_id: int, task_gen_num: int) -> None:
+        with self.get_lock().write():
+            self._drop_unlocked(lambda job: job.get_task_id() != task_id or job.get_task_gen_num() != task_gen_num)
+
+    def drop_jobs(self, job_ids: set[int]) -> None:
+        with self.get_lock().write():
+            self._drop_unlocked(lambda job: job.get_id() not in job_ids)
+
+    def get_num_queued_jobs(self) -> int:
+        with self.get_lock().read():
+            return len(self._pending) + sum(len(lane.queue) for lane in self._lanes.values())
+
+    def wake(self) -> None:
+        with self._cv:
+            self._has_work = True
+            self._cv.notify()
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _assigner_thread(self) -> None:
+        while True:
+            with self._cv:
+                # Workers joining or leaving are only noticed on the timeout
+                if not self._has_work and self._should_work:
+                    self._cv.wait(SettingsLoader().get_settings().job_assign_interval)
+
+                if not self._should_work:
+                    return
+
+                self._has_work = False
+
+            try:
+                self._assign()
+            except Exception as e:
+                Logger().log_error(f"Job assignment failed: {e}", LogLevel.LOW_FREQ)
+
+    def _assign(self) -> None:
+        # Oldest first, gathered before taking the lock as it touches every in-flight job
+        inflight = sorted(((job, job.get_worker(), job.get_inflight_time()) for job in
+                           ManagerComponents().get_test_job_mgr().get_inflight_jobs()),
+                          key=lambda entry: entry[2], reverse=True)
+
+        with self.get_lock().write():
+            self._sync_lanes_unlocked()
+            self._fill_lanes_unlocked()
+            self._steal_unlocked()
+            self._speculate_unlocked(inflight)
+            to_dispatch = self._collect_dispatchable_unlocked()
+
+        failed = []
+        for lane, job in to_dispatch:
+            try:
+                job.prepare_job(lane.worker)
+            except Exception as e:
+                Logger().log_info(f"Job: {job.get_id()} not dispatched to worker: {lane.worker.get_model().name}: {e}",
+                                  LogLevel.MEDIUM_FREQ)
+                if job.get_state() == JobState.CREATED:
+                    failed.append(job)
+                continue
+
+            ManagerComponents().get_test_job_mgr().add_request(job)
+
+        # Worker went away in the meantime, the jobs go first to whoever is next
+        if len(failed) != 0:
+            with self.get_lock().write():
+                self._pending.extendleft(reversed(failed))
+
+    def _drop_unlocked(self, is_kept: Callable[[TestJobRequest], bool]) -> None:
+        self._pending = deque(filter(is_kept, self._pending))
+
+        for token, lane in self._lanes.items():
+            new_lane = WorkerLane(lane.worker)
+            for job in filter(is_kept, lane.queue):
+                new_lane.push(job)
+            self._lanes[token] = new_lane
+
+    def _sync_lanes_unlocked(self) -> None:
+        connected = {worker.get_session_token(): worker for worker in
+                     ManagerComponents().get_worker_mgr().get_workers()
+                     if worker.get_state() == WorkerState.CONNECTED}
+
+        for token in list(self._lanes.keys()):
+            if token not in connected:
+                lane = self._lanes.pop(token)
+                self._pending.extendleft(reversed(lane.queue))
+
+                Logger().log_info(f"Lane of worker: {lane.worker.get_model().name} closed, "
+                                  f"requeued jobs: {len(lane.queue)}", LogLevel.MEDIUM_FREQ)
+
+        for token, worker in connected.items():
+            if token not in self._lanes:
+                self._lanes[token] = WorkerLane(worker)
+
+    def _fill_lanes_unlocked(self) -> None:
+        while len(self._pending) != 0 and len(self._lanes) != 0:
+            # Lane that empties first is the most starved one
+            lane = min(self._lanes.values(), key=lambda lane: lane.get_drain_time())
+
+            if lane.get_assigned_games() >= lane.get_target_games():
+                return
+
+            lane.push(self._pending.popleft())
+
+    # Idle workers take queued jobs from the back of the lane that would finish them last
+    def _steal_unlocked(self) -> None:
+        for thief in self._lanes.values():
+            if len(thief.queue) != 0 or thief.worker.get_inflight_games() >= thief.worker.get_available_cpus():
+                continue
+
+            victims = [lane for lane in self._lanes.values() if lane is not thief and len(lane.queue) != 0]
+            if len(victims) == 0:
+                return
+
+            victim = max(victims, key=lambda lane: lane.get_drain_time())
+            job_games = victim.queue[-1].get_num_games()
+
+            if thief.get_drain_time(job_games) >= victim.get_drain_time():
+                continue
+
+            thief.push(victim.pop_back())
+            Logger().log_info(f"Worker: {thief.worker.get_model().name} stole job from: "
+                              f"{victim.worker.get_model().name}", LogLevel.HIGH_FREQ)
+
+    # Workers that have not finished enough games yet are assumed to be as fast per core as the rest of the fleet
+    @staticmethod
+    def _get_expected_job_time(job: TestJobRequest, worker: Worker, fleet_core_rate: float) -> float | None:
+        core_rate = worker.get_games_per_s() / worker.get_cpus()
+
+        if core_rate == 0:
+            core_rate = fleet_core_rate
+
+        if core_rate == 0:
+            return None
+
+        # Games of a job run in parallel on at most all cores of the worker
+        games = job.get_num_games()
+        return games / (core_rate * max(1, min(games, worker.get_cpus())))
+
+    # Once everything is handed out, idle workers run copies of the slowest in-flight jobs.
+    # Whichever copy finishes first wins and the other one is cancelled.
+    def _speculate_unlocked(self, inflight: list[tuple[TestJobRequest, Worker | None, float]]) -> None:
+        settings = SettingsLoader().get_settings()
+
+        self._duplicates = [job for job in self._duplicates
+                            if job.get_state() in (JobState.CREATED, JobState.PREPARED, JobState.INFLIGHT)]
+        budget = settings.straggler_duplicate_budget - len(self._duplicates)
+
+        if budget <= 0 or len(self._pending) != 0 or any(len(lane.queue) != 0 for lane in self._lanes.values()):
+            return
+
+        idle_lanes = [lane for lane in self._lanes.values() if lane.worker.get_inflight_games() == 0]
+
+        measured = [lane.worker for lane in self._lanes.values() if lane.worker.get_games_per_s() > 0]
+        fleet_core_rate = sum(worker.get_games_per_s() for worker in measured) / \
+            max(1, sum(worker.get_cpus() for worker in measured))
+
+        for job, worker, inflight_time in inflight:
+            if budget == 0 or len(idle_lanes) == 0:
+                return
+
+            if worker is None or job.get_group() is not None:
+                continue
+
+            expected = JobAssigner._get_expected_job_time(job, worker, fleet_core_rate)
+            if expected is None or inflight_time < expected * settings.straggler_timeout_multiplier:
+                continue
+
+            lanes = [lane for lane in idle_lanes if lane.worker is not worker]
+            if len(lanes) == 0:
+                continue
+
+            lane = max(lanes, key=lambda lane: lane.get_rate())
+            idle_lanes.remove(lane)
+
+            duplicate = job.create_duplicate()
+            lane.push(duplicate)
+            self._duplicates.append(duplicate)
+            budget -= 1
+
+            Logger().log_info(f"Job: {job.get_id()} running for {inflight_time:.1f}s on worker: "
+                              f"{worker.get_model().name} duplicated as job: {duplicate.get_id()} on worker: "
+                              f"{lane.worker.get_model().name}", LogLevel.MEDIUM_FREQ)
+
+    # Jobs are bound to a worker only while it has free cores, the rest stays stealable in the lane
+    def _collect_dispatchable_unlocked(self) -> list[tuple[WorkerLane, TestJobRequest]]:
+        to_dispatch = []
+
+        for lane in self._lanes.values():
+            free_games = lane.worker.get_available_cpus() - lane.worker.get_inflight_games()
+
+            while len(lane.queue) != 0 and free_games > 0:
+                job = lane.pop_front()
+                free_games -= job.get_num_games()
+                to_dispatch.append((lane, job))
+
+        return to_dispatch
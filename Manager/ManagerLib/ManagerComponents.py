@@ -3,6 +3,11 @@ from typing import TYPE_CHECKING, Union
 from Utils.GlobalObj import GlobalObj
 
 if TYPE_CHECKING:
+    from Utils.DeadlineScheduler import DeadlineScheduler
+    from Manager.ManagerLib.JobAssigner import JobAssigner
+    from Manager.ManagerLib.ProgressBroadcaster import ProgressBroadcaster
+    from Manager.ManagerLib.ResultStore import ResultStore
+    from Manager.ManagerLib.StateStore import StateStore
     from Manager.ManagerLib.TestJobMgr import TestJobMgr
     from Manager.ManagerLib.TestTaskMgr import TestTaskMgr
     from Manager.ManagerLib.WorkerMgr import WorkerMgr
@@ -16,6 +21,11 @@ class ManagerComponents(metaclass=GlobalObj):
     _test_job_mgr: Union['TestJobMgr', None]
     _test_task_mgr: Union['TestTaskMgr', None]
     _worker_mgr: Union['WorkerMgr', None]
+    _deadline_scheduler: Union['DeadlineScheduler', None]
+    _job_assigner: Union['JobAssigner', None]
+    _state_store: Union['StateStore', None]
+    _result_store: Union['ResultStore', None]
+    _progress_broadcaster: Union['ProgressBroadcaster', None]
 
     # ------------------------------
     # Class creation
@@ -25,6 +35,11 @@ class ManagerComponents(metaclass=GlobalObj):
         self._test_job_mgr = None
         self._test_task_mgr = None
         self._worker_mgr = None
+        self._deadline_scheduler = None
+        self._job_assigner = None
+        self._state_store = None
+        self._result_store = None
+        self._progress_broadcaster = None
 
     # ------------------------------
     # Class interaction
@@ -34,20 +49,46 @@ class ManagerComponents(metaclass=GlobalObj):
         from Manager.ManagerLib.TestJobMgr import TestJobMgr
         from Manager.ManagerLib.TestTaskMgr import TestTaskMgr
         from Manager.ManagerLib.WorkerMgr import WorkerMgr
-
+        from Utils.DeadlineScheduler import DeadlineScheduler
+        from Manager.ManagerLib.JobAssigner import JobAssigner
+        from Manager.ManagerLib.StateStore import StateStore
+        from Manager.ManagerLib.ResultStore import ResultStore
+        from Manager.ManagerLib.ProgressBroadcaster import ProgressBroadcaster
+        from Utils.SettingsLoader import SettingsLoader
+
+        # Shared by the other components, so it is created first and destroyed last
+        self._deadline_scheduler = DeadlineScheduler()
+        self._state_store = StateStore(SettingsLoader().get_settings().state_store_path)
+        self._result_store = ResultStore(SettingsLoader().get_settings().result_store_path,
+                                         SettingsLoader().get_settings().result_store_save_interval_s)
+        self._progress_broadcaster = ProgressBroadcaster(SettingsLoader().get_settings().progress_interval_s)
         self._test_job_mgr = TestJobMgr()
         self._test_task_mgr = TestTaskMgr()
         self._worker_mgr = WorkerMgr()
+        self._job_assigner = JobAssigner()
 
-
+        # Jobs are checked against the restored tasks, so tasks go first
+        self._test_task_mgr.restore_tasks()
+        self._test_job_mgr.restore_jobs()
 
     def destroy_components(self) -> None:
+        if self._job_assigner:
+            self._job_assigner.destroy()
         if self._test_job_mgr:
             self._test_job_mgr.destroy()
         if self._test_task_mgr:
             self._test_task_mgr.destroy()
         if self._worker_mgr:
             self._worker_mgr.destroy()
+        if self._progress_broadcaster:
+            self._progress_broadcaster.destroy()
+        # Last result store save deletes the saved hardened jobs, so the state store is still needed
+        if self._result_store:
+            self._result_store.destroy()
+        if self._state_store:
+            self._state_store.destroy()
+        if self._deadline_scheduler:
+            self._deadline_scheduler.destroy()
 
     def is_inited(self) -> bool:
         return self._test_job_mgr is not None and self._test_task_mgr is not None and self._worker_mgr is not None
@@ -61,4 +102,19 @@ class ManagerComponents(metaclass=GlobalObj):
     def get_worker_mgr(self) -> Union['WorkerMgr', None]:
         return self._worker_mgr
 
+    def get_deadline_scheduler(self) -> Union['DeadlineScheduler', None]:
+        return self._deadline_scheduler
+
+    def get_job_assigner(self) -> Union['JobAssigner', None]:
+        return self._job_assigner
+
+    def get_state_store(self) -> Union['StateStore', None]:
+        return self._state_store
+
+    def get_result_store(self) -> Union['ResultStore', None]:
+        return self._result_store
+
+    def get_progress_broadcaster(self) -> Union['ProgressBroadcaster', None]:
+        return self._progress_broadcaster
+
 
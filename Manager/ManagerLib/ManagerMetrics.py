@@ -0,0 +1,64 @@
+import time
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Models.OrchestratorModels import JobState, WorkerState
+from Utils.Logger import Logger
+from Utils.Metrics import Metrics, LabelValues
+
+# Gauges below are computed from the components when scraped, components not running report nothing.
+
+
+def register_manager_metrics() -> None:
+    metrics = Metrics()
+
+    metrics.gauge("manager_job_queue_depth", "Jobs per state, CREATED counts jobs waiting in the assigner",
+                  ("state",), _collect_queue_depths)
+    metrics.gauge("manager_job_threads", "Active job threads", (), _collect_job_threads)
+    metrics.gauge("manager_workers", "Registered workers per state", ("state",), _collect_workers)
+    metrics.gauge("manager_worker_ka_lag_seconds", "Time since the last activity of the worker", ("worker",),
+                  _collect_ka_lags)
+    metrics.gauge("logger_queue_length", "Log messages waiting for the flusher thread", (),
+                  lambda: {(): Logger().get_queue_length()})
+
+
+# ------------------------------
+# Private functions
+# ------------------------------
+
+def _collect_queue_depths() -> dict[LabelValues, float]:
+    depths = {(state.name,): 0 for state in JobState}
+
+    if ManagerComponents().get_test_job_mgr() is not None:
+        for state, depth in ManagerComponents().get_test_job_mgr().get_queue_depths().items():
+            depths[(state.name,)] += depth
+
+    if ManagerComponents().get_job_assigner() is not None:
+        depths[(JobState.CREATED.name,)] += ManagerComponents().get_job_assigner().get_num_queued_jobs()
+
+    return depths
+
+
+def _collect_job_threads() -> dict[LabelValues, float]:
+    if ManagerComponents().get_test_job_mgr() is None:
+        return {}
+
+    return {(): ManagerComponents().get_test_job_mgr().get_worker_thread_count()}
+
+
+def _collect_workers() -> dict[LabelValues, float]:
+    counts = {(state.name,): 0 for state in WorkerState}
+
+    if ManagerComponents().get_worker_mgr() is not None:
+        for worker in ManagerComponents().get_worker_mgr().get_workers():
+            counts[(worker.get_state().name,)] += 1
+
+    return counts
+
+
+def _collect_ka_lags() -> dict[LabelValues, float]:
+    if ManagerComponents().get_worker_mgr() is None:
+        return {}
+
+    now = time.perf_counter()
+    return {(worker.get_model().name,): now - worker.get_last_activity()
+            for worker in ManagerComponents().get_worker_mgr().get_workers()}
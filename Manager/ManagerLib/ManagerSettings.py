@@ -14,7 +14,23 @@ class ManagerSettings(BaseModel):
     worker_timeout: int = 10
     build_dir: str = "/tmp/Checkmate-Chariot-tune-builds/"
     job_threads: int = 8
+    job_threads_max: int = 32
+    job_autoscale: bool = True
+    job_autoscale_interval: float = 1.0
+    job_autoscale_jobs_per_thread: int = 4
     job_failures_limit: int = 3
+    job_assign_horizon: float = 30.0
+    job_assign_interval: float = 1.0
+    straggler_duplicate_budget: int = 2
+    straggler_timeout_multiplier: float = 2.0
+    job_deadline_slack: float = 1.5
+    job_deadline_grace_s: float = 30.0
+    # Bound of a single game for jobs not knowing their own, zero disables deadlines of such jobs
+    job_max_game_time_s: float = 600.0
+    state_store_path: str = ""
+    result_store_path: str = ""
+    result_store_save_interval_s: float = 30.0
+    progress_interval_s: float = 0.5
 
 
 def update_logger_freq(settings: BaseModel) -> None:
@@ -24,4 +40,5 @@ def update_build_dir(settings: BaseModel) -> None:
     ensure_path_exists(settings.build_dir)
 
 def update_job_threads(settings: BaseModel) -> None:
-    ManagerComponents().get_test_job_mgr().update_thread_count(settings.job_threads)
\ No newline at end of file
+    if ManagerComponents().get_test_job_mgr() is not None:
+        ManagerComponents().get_test_job_mgr().update_thread_count(settings.job_threads)
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from threading import Thread, Condition
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Models.OrchestratorModels import TaskState, TaskProgress, ProgressEvent
+from Utils.Logger import Logger, LogLevel
+
+
+class ProgressBroadcaster:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _interval_s: float
+    _progress: dict[int, TaskProgress]
+    _new_games: dict[int, int]
+    _hardened_tasks: set[int]
+    _is_dirty: bool
+
+    _version: int
+    _payload: str
+
+    # Subscribers on event loops are woken through their loop, so no thread waits on their behalf
+    _subscribers: dict[asyncio.Event, asyncio.AbstractEventLoop]
+
+    _cv: Condition
+    _should_work: bool
+    _thread: Thread
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Updates are only collected between flushes, subscribers see at most one event per interval
+    def __init__(self, interval_s: float) -> None:
+        self._interval_s = interval_s
+        self._progress = {}
+        self._new_games = {}
+        self._hardened_tasks = set()
+        self._is_dirty = False
+
+        self._version = 0
+        self._payload = ProgressEvent(version=0, tasks=[]).model_dump_json()
+
+        self._subscribers = {}
+
+        self._cv = Condition()
+        self._should_work = True
+        self._thread = Thread(target=self._flusher_thread)
+        self._thread.start()
+
+        Logger().log_info("Progress broadcaster started", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        with self._cv:
+            self._should_work = False
+            self._cv.notify_all()
+            self._wake_subscribers_unlocked()
+
+        self._thread.join()
+        Logger().log_info(f"Progress broadcaster destroyed, published events: {self._version}", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def on_task_state(self, task_id: int, state: TaskState, gen_num: int) -> None:
+        with self._cv:
+            progress = self._progress.get(task_id)
+
+            if progress is None:
+                self._progress[task_id] = TaskProgress(task_id=task_id, state=state, gen_num=gen_num)
+            else:
+                progress.state = state
+                progress.gen_num = gen_num
+
+            self._is_dirty = True
+
+    def on_games(self, task_id: int, count: int) -> None:
+        if count == 0:
+            return
+
+        with self._cv:
+            self._new_games[task_id] = self._new_games.get(task_id, 0) + count
+            self._is_dirty = True
+
+    # Best params only change once results are hardened, which happens after their games were counted
+    def on_results_hardened(self, task_id: int) -> None:
+        with self._cv:
+            self._hardened_tasks.add(task_id)
+            self._is_dirty = True
+
+    def is_running(self) -> bool:
+        with self._cv:
+            return self._should_work
+
+    # Slow subscribers skip intermediate events, every event carries the full progress of all tasks
+    def get_latest(self) -> tuple[int, str]:
+        with self._cv:
+            return self._version, self._payload
+
+    # The event is set on the given loop after every published event and on destroy
+    def subscribe(self, loop: asyncio.AbstractEventLoop, update: asyncio.Event) -> None:
+        with self._cv:
+            self._subscribers[update] = loop
+
+    def unsubscribe(self, update: asyncio.Event) -> None:
+        with self._cv:
+            self._subscribers.pop(update, None)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _flusher_thread(self) -> None:
+        last_flush = time.perf_counter()
+
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: not self._should_work, self._interval_s)
+
+                if not self._should_work:
+                    return
+
+            now = time.perf_counter()
+            try:
+                self._flush(now - last_flush)
+            except Exception as e:
+                Logger().log_error(f"Progress flush failed: {e}", LogLevel.LOW_FREQ)
+            last_flush = now
+
+    def _flush(self, elapsed_s: float) -> None:
+        with self._cv:
+            if not self._is_dirty and not any(progress.games_per_s != 0 for progress in self._progress.values()):
+                return
+
+            new_games = self._new_games
+            hardened_tasks = self._hardened_tasks
+            self._new_games = {}
+            self._hardened_tasks = set()
+            self._is_dirty = False
+            tasks = [(progress.task_id, progress.gen_num) for progress in self._progress.values()]
+
+        # Result store is queried outside the lock, so publishers never wait on it
+        best_params = {task_id: self._get_best_params(task_id, gen_num) for task_id, gen_num in tasks
+                       if task_id in new_games or task_id in hardened_tasks}
+
+        with self._cv:
+            for progress in self._progress.values():
+                progress.games_played += new_games.get(progress.task_id, 0)
+                progress.games_per_s = new_games.get(progress.task_id, 0) / elapsed_s
+
+                if progress.task_id in best_params:
+                    progress.best_params, progress.best_score = best_params[progress.task_id]
+
+            self._version += 1
+            self._payload = ProgressEvent(version=self._version,
+                                          tasks=list(self._progress.values())).model_dump_json()
+            self._wake_subscribers_unlocked()
+
+    def _wake_subscribers_unlocked(self) -> None:
+        for update, loop in list(self._subscribers.items()):
+            try:
+                loop.call_soon_threadsafe(update.set)
+            except RuntimeError:
+                # Loop already closed, its stream is gone as well
+                self._subscribers.pop(update, None)
+
+    # Scores come from finished jobs only, games still in flight are not counted yet
+    @staticmethod
+    def _get_best_params(task_id: int, gen_num: int) -> tuple[str | None, float | None]:
+        if ManagerComponents().get_result_store() is None:
+            return None, None
+
+        stats = ManagerComponents().get_result_store().aggregate("params", task_id, gen_num)
+        if len(stats) == 0:
+            return None, None
+
+        best = max(stats, key=lambda row: row.score)
+        return best.key, best.score
@@ -0,0 +1,356 @@
+import os
+from dataclasses import dataclass, asdict
+from threading import Thread, Condition
+
+import numpy as np
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.StateStore import GameRecord
+from Models.OrchestratorModels import ResultStatsRequest, ResultStatsResponse, RatingsRequest, RatingsResponse
+from Utils.EloStats import trinomial_estimate, pentanomial_estimate, pair_games, pentanomial_counts, bayes_elo
+from Utils.Logger import Logger, LogLevel
+from Utils.RWLock import MgrModel
+
+# Results are kept as scores in half points of the tested side
+RESULT_SCORES: dict[str, int] = {"W": 2, "D": 1, "L": 0}
+
+COLUMNS: dict[str, np.dtype] = {
+    "task_id": np.dtype(np.int32),
+    "gen_num": np.dtype(np.int32),
+    "job_id": np.dtype(np.int64),
+    "seed": np.dtype(np.int64),
+    "params": np.dtype(np.int32),
+    "opponent": np.dtype(np.int32),
+    "colour": np.dtype(np.int8),
+    "score": np.dtype(np.int8),
+    "duration_s": np.dtype(np.float32),
+    "worker": np.dtype(np.int32),
+}
+
+# Columns holding ids of interned strings, params are interned as their canonical JSON
+INTERNED_COLUMNS: list[str] = ["params", "opponent", "worker"]
+
+# All of them hold small non-negative ids, so games are grouped with bincount instead of sorting
+GROUP_KEYS: list[str] = ["task_id", "gen_num", "params", "opponent", "colour", "worker"]
+
+
+# Errors are half widths of 95% confidence intervals, undefined values are nan
+@dataclass(frozen=True, slots=True)
+class ScoreAggregate:
+    key: int | str
+    wins: int
+    draws: int
+    losses: int
+    score: float
+    elo: float
+    elo_error: float
+    nelo: float
+    nelo_error: float
+    los: float
+    pentanomial: list[int]
+    pentanomial_elo: float
+    pentanomial_elo_error: float
+    mean_duration_s: float
+
+
+@dataclass(frozen=True, slots=True)
+class PlayerRating:
+    name: str
+    is_opponent: bool
+    games: int
+    elo: float
+    elo_error: float
+
+
+class ResultStore(MgrModel):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    INITIAL_CAPACITY: int = 1024
+
+    _path: str
+    _size: int
+    _saved_size: int
+    _columns: dict[str, np.ndarray]
+
+    _strings: dict[str, list[str]]
+    _string_ids: dict[str, dict[str, int]]
+
+    _save_interval_s: float
+    _cv: Condition
+    _should_work: bool
+    _thread: Thread | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Empty path keeps the results in memory only, otherwise new games are saved every interval
+    def __init__(self, path: str = "", save_interval_s: float = 30.0) -> None:
+        super().__init__()
+        self._path = path
+        self._size = 0
+        self._columns = {name: np.empty(ResultStore.INITIAL_CAPACITY, dtype) for name, dtype in COLUMNS.items()}
+        self._strings = {name: [] for name in INTERNED_COLUMNS}
+        self._string_ids = {name: {} for name in INTERNED_COLUMNS}
+
+        if path != "" and os.path.isfile(path):
+            self._load()
+        self._saved_size = self._size
+
+        self._save_interval_s = save_interval_s
+        self._cv = Condition()
+        self._should_work = True
+        self._thread = None
+
+        if path != "":
+            self._thread = Thread(target=self._saver_thread)
+            self._thread.start()
+
+        Logger().log_info(f"Result store created with {self._size} games", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        if self._thread is not None:
+            with self._cv:
+                self._should_work = False
+                self._cv.notify_all()
+
+            self._thread.join()
+
+        Logger().log_info(f"Result store destroyed with {self._size} games", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Seeds must be sorted, so both games of a pair end up next to each other
+    def append_games(self, task_id: int, gen_num: int, job_id: int, params: str, opponent: str, seeds: list[int],
+                     colours: list[int], games: list[GameRecord]) -> None:
+        count = len(games)
+        if count == 0:
+            return
+
+        with self.get_lock().write():
+            self._reserve_unlocked(self._size + count)
+
+            rows = slice(self._size, self._size + count)
+            self._columns["task_id"][rows] = task_id
+            self._columns["gen_num"][rows] = gen_num
+            self._columns["job_id"][rows] = job_id
+            self._columns["seed"][rows] = seeds
+            self._columns["params"][rows] = self._intern_unlocked("params", params)
+            self._columns["opponent"][rows] = self._intern_unlocked("opponent", opponent)
+            self._columns["colour"][rows] = colours
+            self._columns["score"][rows] = [RESULT_SCORES.get(game.result, -1) for game in games]
+            self._columns["duration_s"][rows] = [game.duration_s for game in games]
+            self._columns["worker"][rows] = [self._intern_unlocked("worker", game.worker) for game in games]
+
+            # Readers only see the rows once they are complete
+            self._size += count
+
+    def get_job_ids(self) -> set[int]:
+        with self.get_lock().read():
+            return set(np.unique(self._columns["job_id"][:self._size]).tolist())
+
+    def get_num_games(self) -> int:
+        with self.get_lock().read():
+            return self._size
+
+    # Rows are never changed once written, so the returned views stay valid while new games are appended
+    def get_columns(self, task_id: int | None = None, gen_num: int | None = None,
+                    opponent: str | None = None) -> dict[str, np.ndarray]:
+        with self.get_lock().read():
+            columns = {name: column[:self._size] for name, column in self._columns.items()}
+            opponent_id = self._string_ids["opponent"].get(opponent, -1) if opponent is not None else None
+
+        mask = columns["score"] >= 0
+        if task_id is not None:
+            mask &= columns["task_id"] == task_id
+        if gen_num is not None:
+            mask &= columns["gen_num"] == gen_num
+        if opponent_id is not None:
+            mask &= columns["opponent"] == opponent_id
+
+        if mask.all():
+            return columns
+        return {name: column[mask] for name, column in columns.items()}
+
+    def aggregate(self, group_by: str, task_id: int | None = None, gen_num: int | None = None,
+                  opponent: str | None = None) -> list[ScoreAggregate]:
+        if group_by not in GROUP_KEYS:
+            raise ValueError(f"Unknown group key: {group_by}, expected one of: {GROUP_KEYS}")
+
+        columns = self.get_columns(task_id, gen_num, opponent)
+        groups = columns[group_by]
+        scores = columns["score"]
+
+        # A single pass over the scores, every (group, score) pair gets its own bin
+        num_groups = int(groups.max()) + 1 if len(groups) != 0 else 0
+        counts = np.bincount(groups.astype(np.intp) * 3 + scores, minlength=num_groups * 3).reshape(-1, 3)
+        losses, draws, wins = counts[:, 0], counts[:, 1], counts[:, 2]
+        games = wins + draws + losses
+        durations = np.bincount(groups, weights=columns["duration_s"], minlength=num_groups)
+
+        pair_starts, pair_scores = pair_games(columns["job_id"], columns["seed"], scores)
+        pentanomial = pentanomial_counts(groups[pair_starts], pair_scores, num_groups)
+
+        keys = np.flatnonzero(games)
+        trinomial = trinomial_estimate(wins[keys], draws[keys], losses[keys])
+        paired = pentanomial_estimate(pentanomial[keys])
+        mean_duration = durations[keys] / games[keys]
+
+        names = self._resolve_keys(group_by, keys)
+        return [ScoreAggregate(key=names[i], wins=int(wins[key]), draws=int(draws[key]), losses=int(losses[key]),
+                               score=float(trinomial.score[i]), elo=float(trinomial.elo[i]),
+                               elo_error=float(trinomial.elo_error[i]), nelo=float(trinomial.nelo[i]),
+                               nelo_error=float(trinomial.nelo_error[i]), los=float(trinomial.los[i]),
+                               pentanomial=pentanomial[key].tolist(), pentanomial_elo=float(paired.elo[i]),
+                               pentanomial_elo_error=float(paired.elo_error[i]),
+                               mean_duration_s=float(mean_duration[i]))
+                for i, key in enumerate(keys)]
+
+    # Params sets and opponents are rated together, so params tested against different opponents stay comparable
+    def get_ratings(self, task_id: int | None = None, gen_num: int | None = None) -> list[PlayerRating]:
+        columns = self.get_columns(task_id, gen_num)
+        params = columns["params"].astype(np.intp)
+        num_params = int(params.max()) + 1 if len(params) != 0 else 0
+        opponents = columns["opponent"].astype(np.intp) + num_params
+        num_players = num_params + (int(columns["opponent"].max()) + 1 if len(params) != 0 else 0)
+
+        ratings, errors = bayes_elo(params, opponents, columns["score"], columns["colour"] == 0, num_players)
+        games = np.bincount(params, minlength=num_players) + np.bincount(opponents, minlength=num_players)
+
+        players = np.flatnonzero(games)
+        params_names = self._resolve_keys("params", players[players < num_params])
+        opponent_names = self._resolve_keys("opponent", players[players >= num_params] - num_params)
+
+        return [PlayerRating(name=name, is_opponent=player >= num_params, games=int(games[player]),
+                             elo=float(ratings[player]), elo_error=float(errors[player]))
+                for name, player in zip(params_names + opponent_names, players)]
+
+    # ------------------------------
+    # API methods
+    # ------------------------------
+
+    def api_get_stats(self, request: ResultStatsRequest) -> ResultStatsResponse:
+        try:
+            stats = self.aggregate(request.group_by, request.task_id, request.gen_num, request.opponent)
+            return ResultStatsResponse(result="", stats=[ResultStore._to_json_safe(row) for row in stats])
+        except Exception as e:
+
+            Logger().save_error_to_journal(e)
+            Logger().log_error(f"Error while computing result stats: {e}", LogLevel.LOW_FREQ)
+
+            return ResultStatsResponse(result=f"Error while computing result stats: {e}", stats=[])
+
+    def api_get_ratings(self, request: RatingsRequest) -> RatingsResponse:
+        try:
+            ratings = self.get_ratings(request.task_id, request.gen_num)
+            return RatingsResponse(result="", ratings=[ResultStore._to_json_safe(rating) for rating in ratings])
+        except Exception as e:
+
+            Logger().save_error_to_journal(e)
+            Logger().log_error(f"Error while computing ratings: {e}", LogLevel.LOW_FREQ)
+
+            return RatingsResponse(result=f"Error while computing ratings: {e}", ratings=[])
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    # JSON has no nan or inf, undefined estimates are sent as null
+    @staticmethod
+    def _to_json_safe(row: ScoreAggregate | PlayerRating) -> dict[str, any]:
+        return {name: None if isinstance(value, float) and not np.isfinite(value) else value
+                for name, value in asdict(row).items()}
+
+    def _resolve_keys(self, group_by: str, keys: np.ndarray) -> list[int | str]:
+        if group_by not in INTERNED_COLUMNS:
+            return [int(key) for key in keys]
+
+        # Interned lists are append only, reading them without the lock is safe
+        strings = self._strings[group_by]
+        return [strings[key] for key in keys]
+
+    def _intern_unlocked(self, column: str, value: str) -> int:
+        ids = self._string_ids[column]
+
+        if value not in ids:
+            ids[value] = len(self._strings[column])
+            self._strings[column].append(value)
+
+        return ids[value]
+
+    # Capacity doubles, so appends are amortized O(1) per game
+    def _reserve_unlocked(self, size: int) -> None:
+        capacity = len(self._columns["score"])
+        if size <= capacity:
+            return
+
+        while capacity < size:
+            capacity *= 2
+
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, column.dtype)
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+
+    # Last save runs after the stop request, so games appended until then are not lost
+    def _saver_thread(self) -> None:
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: not self._should_work, self._save_interval_s)
+                should_work = self._should_work
+
+            try:
+                if self.get_num_games() != self._saved_size:
+                    self._save()
+            except Exception as e:
+                Logger().log_error(f"Result store failed to save to: {self._path}: {e}", LogLevel.LOW_FREQ)
+
+            if not should_work:
+                break
+
+    def _save(self) -> None:
+        with self.get_lock().read():
+            size = self._size
+            arrays = {name: column[:size] for name, column in self._columns.items()}
+            arrays |= {f"{name}_strings": np.array(self._strings[name], dtype=str) for name in INTERNED_COLUMNS}
+            saved_job_ids = np.unique(self._columns["job_id"][self._saved_size:size]).tolist()
+
+        # Written aside first, so a crash while saving never corrupts the previous file
+        with open(f"{self._path}.tmp", "wb") as file:
+            np.savez(file, **arrays)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(f"{self._path}.tmp", self._path)
+        ResultStore._sync_dir(self._path)
+
+        self._saved_size = size
+
+        # Snapshot is durable now, the state store no longer has to keep the games of these jobs
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().delete_hardened_jobs(saved_job_ids)
+
+    @staticmethod
+    def _sync_dir(path: str) -> None:
+        dir_fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _load(self) -> None:
+        with np.load(self._path) as data:
+            size = len(data["score"])
+
+            self._reserve_unlocked(size)
+            for name in COLUMNS:
+                self._columns[name][:size] = data[name]
+
+            for name in INTERNED_COLUMNS:
+                self._strings[name] = [str(value) for value in data[f"{name}_strings"]]
+                self._string_ids[name] = {value: i for i, value in enumerate(self._strings[name])}
+
+            self._size = size
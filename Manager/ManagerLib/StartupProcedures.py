@@ -1,20 +1,25 @@
 import os
 
 from Manager.ManagerLib.ManagerComponents import ManagerComponents
-from Manager.ManagerLib.ManagerSettings import ManagerSettings, update_logger_freq, update_build_dir
+from Manager.ManagerLib.ManagerMetrics import register_manager_metrics
+from Manager.ManagerLib.ManagerSettings import ManagerSettings, update_logger_freq, update_build_dir, \
+    update_job_threads
 from ProjectInfo.ProjectInfo import ProjectInfoInstance
 from Utils.Logger import Logger, LogLevel
 from Utils.SettingsLoader import SettingsLoader
+from Utils.StartupProfiler import StartupProfiler
 
 SETTINGS_PATH = f"{os.path.dirname(os.path.abspath(__file__))}/settings.json"
 
 
 def startup():
     # load settings
-    settings = SettingsLoader(ManagerSettings, SETTINGS_PATH).get_settings()
+    with StartupProfiler().phase("SettingsLoader"):
+        settings = SettingsLoader(ManagerSettings, SETTINGS_PATH).get_settings()
 
     # init logger
-    Logger(settings.logger_path, settings.log_std_out, LogLevel(settings.log_level), settings.error_journal_path)
+    with StartupProfiler().phase("Logger"):
+        Logger(settings.logger_path, settings.log_std_out, LogLevel(settings.log_level), settings.error_journal_path)
 
     SettingsLoader().add_event(update_logger_freq)
     SettingsLoader().add_event(update_build_dir)
@@ -23,12 +28,18 @@ def startup():
     update_build_dir(settings)
 
     # init singleton managers:
-    ManagerComponents()
-    ManagerComponents().init_components()
+    with StartupProfiler().phase("ManagerComponents.init_components"):
+        ManagerComponents()
+        ManagerComponents().init_components()
+
+    SettingsLoader().add_event(update_job_threads)
+    register_manager_metrics()
 
     # Display initial info
     ProjectInfoInstance.display_info("Manager")
 
+    StartupProfiler().report()
+
 
 def cleanup():
     ManagerComponents().destroy_components()
@@ -0,0 +1,217 @@
+import json
+import sqlite3
+from dataclasses import dataclass, asdict
+from threading import Thread, Condition
+
+from Models.OrchestratorModels import JobState
+from Utils.Logger import Logger, LogLevel
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS tasks (task_id INTEGER PRIMARY KEY, snapshot TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS jobs (job_id INTEGER PRIMARY KEY, task_id INTEGER NOT NULL, "
+    "task_gen_num INTEGER NOT NULL, state INTEGER NOT NULL, arg_str TEXT NOT NULL, seeds TEXT NOT NULL, "
+    "max_game_time_s REAL NOT NULL, failure_reasons TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS results (job_id INTEGER NOT NULL, seed INTEGER NOT NULL, result TEXT NOT NULL, "
+    "duration_s REAL NOT NULL, worker TEXT NOT NULL, PRIMARY KEY (job_id, seed)) WITHOUT ROWID",
+]
+
+
+# Jobs are stored only as CREATED, COMPLETED, FAILED or HARDENED, anything bound to a worker is dispatched again on
+# restore. Hardened jobs outlive their task, their games are kept until a result store snapshot holds them.
+@dataclass(frozen=True, slots=True)
+class JobRecord:
+    job_id: int
+    task_id: int
+    task_gen_num: int
+    state: JobState
+    arg_str: str
+    seeds: list[int]
+    max_game_time_s: float
+    failure_reasons: list[str]
+
+
+@dataclass(frozen=True, slots=True)
+class GameRecord:
+    result: str
+    duration_s: float
+    worker: str
+
+
+class StateStore:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _path: str
+    _ops: list[tuple[str, list[tuple]]]
+    _num_submitted: int
+    _num_written: int
+
+    _cv: Condition
+    _should_work: bool
+    _thread: Thread | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Empty path disables the store, every write is then dropped
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._ops = []
+        self._num_submitted = 0
+        self._num_written = 0
+
+        self._cv = Condition()
+        self._should_work = True
+        self._thread = None
+
+        if not self.is_enabled():
+            Logger().log_info("State store disabled", LogLevel.LOW_FREQ)
+            return
+
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+
+        # Games of straggler copies are saved before the copy itself, which is stored only once it wins
+        conn.execute("DELETE FROM results WHERE job_id NOT IN (SELECT job_id FROM jobs)")
+        conn.commit()
+        conn.close()
+
+        self._thread = Thread(target=self._writer_thread)
+        self._thread.start()
+
+        Logger().log_info(f"State store opened at: {path}", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        if self._thread is None:
+            return
+
+        with self._cv:
+            self._should_work = False
+            self._cv.notify_all()
+
+        self._thread.join()
+        Logger().log_info(f"State store closed, written operations: {self._num_written}", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def is_enabled(self) -> bool:
+        return self._path != ""
+
+    def save_task(self, task_id: int, snapshot: any) -> None:
+        self._submit("INSERT OR REPLACE INTO tasks VALUES (?, ?)", [(task_id, json.dumps(asdict(snapshot)))])
+
+    def save_jobs(self, records: list[JobRecord]) -> None:
+        self._submit("INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     [(record.job_id, record.task_id, record.task_gen_num, int(record.state), record.arg_str,
+                       json.dumps(record.seeds), record.max_game_time_s, json.dumps(record.failure_reasons))
+                      for record in records])
+
+    # Results are resent by workers after reconnects, already stored games are kept as they are
+    def save_results(self, job_id: int, games: dict[int, GameRecord]) -> None:
+        self._submit("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?)",
+                     [(job_id, seed, game.result, game.duration_s, game.worker) for seed, game in games.items()])
+
+    def delete_jobs(self, job_ids: list[int]) -> None:
+        params = [(job_id,) for job_id in job_ids]
+        self._submit("DELETE FROM jobs WHERE job_id = ?", params)
+        self._submit("DELETE FROM results WHERE job_id = ?", params)
+
+    def delete_task_jobs(self, task_id: int, task_gen_num: int) -> None:
+        params = [(task_id, task_gen_num, int(JobState.HARDENED))]
+        self._submit("DELETE FROM results WHERE job_id IN "
+                     "(SELECT job_id FROM jobs WHERE task_id = ? AND task_gen_num = ? AND state != ?)", params)
+        self._submit("DELETE FROM jobs WHERE task_id = ? AND task_gen_num = ? AND state != ?", params)
+
+    # Jobs hardened again in the meantime are stored as a new record, only the saved ones are deleted
+    def delete_hardened_jobs(self, job_ids: list[int]) -> None:
+        params = [(job_id, int(JobState.HARDENED)) for job_id in job_ids]
+        self._submit("DELETE FROM results WHERE job_id IN (SELECT job_id FROM jobs WHERE job_id = ? AND state = ?)",
+                     params)
+        self._submit("DELETE FROM jobs WHERE job_id = ? AND state = ?", params)
+
+    # Task snapshots are returned as plain dicts, the store knows nothing about the modules behind them
+    def load_tasks(self) -> list[dict[str, any]]:
+        if not self.is_enabled():
+            return []
+
+        conn = self._connect()
+        try:
+            return [json.loads(row[0]) for row in conn.execute("SELECT snapshot FROM tasks ORDER BY task_id")]
+        finally:
+            conn.close()
+
+    def load_jobs(self) -> tuple[list[JobRecord], dict[int, dict[int, GameRecord]]]:
+        if not self.is_enabled():
+            return [], {}
+
+        conn = self._connect()
+        try:
+            records = [JobRecord(job_id=row[0], task_id=row[1], task_gen_num=row[2], state=JobState(row[3]),
+                                 arg_str=row[4], seeds=json.loads(row[5]), max_game_time_s=row[6],
+                                 failure_reasons=json.loads(row[7]))
+                       for row in conn.execute("SELECT * FROM jobs ORDER BY job_id")]
+
+            results: dict[int, dict[int, GameRecord]] = {}
+            for job_id, seed, result, duration_s, worker in conn.execute("SELECT * FROM results"):
+                results.setdefault(job_id, {})[seed] = GameRecord(result=result, duration_s=duration_s, worker=worker)
+
+            return records, results
+        finally:
+            conn.close()
+
+    # Blocks until everything submitted so far is committed
+    def flush(self) -> None:
+        with self._cv:
+            target = self._num_submitted
+            self._cv.wait_for(lambda: self._num_written >= target or self._thread is None)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self._path, check_same_thread=False)
+
+    def _submit(self, statement: str, params: list[tuple]) -> None:
+        if not self.is_enabled() or len(params) == 0:
+            return
+
+        with self._cv:
+            self._ops.append((statement, params))
+            self._num_submitted += 1
+            self._cv.notify_all()
+
+    # Everything queued since the last wake up is committed in a single transaction
+    def _writer_thread(self) -> None:
+        conn = self._connect()
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: len(self._ops) != 0 or not self._should_work)
+
+                ops = self._ops
+                self._ops = []
+                should_work = self._should_work
+
+            try:
+                with conn:
+                    for statement, params in ops:
+                        conn.executemany(statement, params)
+            except Exception as e:
+                Logger().log_error(f"State store failed to write {len(ops)} operations: {e}", LogLevel.LOW_FREQ)
+
+            with self._cv:
+                self._num_written += len(ops)
+                self._cv.notify_all()
+
+            if not should_work:
+                break
+
+        conn.close()
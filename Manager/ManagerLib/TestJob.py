@@ -1,13 +1,68 @@
+import json
+import time
 from abc import ABC, abstractmethod
-from asyncio import Lock
+from threading import Lock
 
 from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.StateStore import JobRecord, GameRecord
 from Manager.ManagerLib.Worker import Worker
 from Models.OrchestratorModels import JobState, WorkerState, WORKABLE_STATES
+from Models.WorkerModels import JobRequestPayload, SocketMsg, SocketMsgType, JobResultChunk
 from Utils.Logger import Logger, LogLevel
+from Utils.Metrics import Metrics
 from Utils.RWLock import ObjectModel
 from Utils.SettingsLoader import SettingsLoader
 
+JOB_DISPATCH_LATENCY_SECONDS = Metrics().histogram("manager_job_dispatch_latency_seconds",
+                                                   "Time from a job being queued until it is sent to a worker")
+JOB_RUN_SECONDS = Metrics().histogram("manager_job_run_seconds",
+                                      "Time from a job being sent to a worker until all its results arrived")
+JOB_FAILURES = Metrics().counter("manager_job_failures_total", "Failed job dispatches, including requeued ones",
+                                 ("task",))
+
+
+# Copies of the same job dispatched to different workers, only the first finished copy is kept
+class JobGroup:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _lock: Lock
+    _members: list['TestJobRequest']
+    _winner_id: int | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, original: 'TestJobRequest') -> None:
+        self._lock = Lock()
+        self._members = [original]
+        self._winner_id = None
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def add(self, job: 'TestJobRequest') -> None:
+        with self._lock:
+            self._members.append(job)
+
+    def try_win(self, job: 'TestJobRequest') -> bool:
+        with self._lock:
+            if self._winner_id is None:
+                self._winner_id = job.get_id()
+
+            return self._winner_id == job.get_id()
+
+    def is_resolved(self) -> bool:
+        with self._lock:
+            return self._winner_id is not None
+
+    def get_others(self, job: 'TestJobRequest') -> list['TestJobRequest']:
+        with self._lock:
+            return [member for member in self._members if member is not job]
+
 
 class TestJobRequest(ObjectModel, ABC):
     # ------------------------------
@@ -25,10 +80,16 @@ class TestJobRequest(ObjectModel, ABC):
     _failure_reasons: list[str]
 
     _result_payload: str
+    _results: dict[int, GameRecord]
 
     _task_id: int
     _task_gen_num: int
 
+    _group: JobGroup | None
+    _queued_timestamp: float
+    _inflight_timestamp: float
+    _dispatch_count: int
+
     # ------------------------------
     # Class creation
     # ------------------------------
@@ -44,8 +105,13 @@ class TestJobRequest(ObjectModel, ABC):
 
         self._worker = None
         self._result_payload = ""
+        self._results = {}
         self._task_id = task_id
         self._task_gen_num = task_gen_num
+        self._group = None
+        self._queued_timestamp = time.perf_counter()
+        self._inflight_timestamp = 0
+        self._dispatch_count = 0
 
         Logger().log_info(
             f"TestJobRequest created with ID: {self._test_job_id} for task ID: {self._task_id} with gen num: {self._task_gen_num}",
@@ -60,11 +126,45 @@ class TestJobRequest(ObjectModel, ABC):
     # ------------------------------
 
     @abstractmethod
-    async def _process_prepared_unlocked_internal(self) -> str:
+    async def _process_prepared_unlocked_internal(self) -> JobRequestPayload:
+        pass
+
+    @abstractmethod
+    async def _process_completed_unlocked_internal(self, results: dict[int, GameRecord]) -> None:
+        pass
+
+    @abstractmethod
+    def _append_results_unlocked(self, results: dict[int, GameRecord]) -> None:
+        params, opponent = self._get_game_context()
+        seeds = sorted(results.keys())
+
+        # Tested side plays white on even seeds
+        ManagerComponents().get_result_store().append_games(self._task_id, self._task_gen_num, self._test_job_id,
+                                                            params, opponent, seeds, [seed % 2 for seed in seeds],
+                                                            [results[seed] for seed in seeds])
+
+        if ManagerComponents().get_progress_broadcaster() is not None:
+            ManagerComponents().get_progress_broadcaster().on_results_hardened(self._task_id)
+
+    def _is_complete_unlocked(self) -> bool:
+        pass
+
+    @abstractmethod
+    def get_num_games(self) -> int:
+        pass
+
+    # Longest time a single game of the job may take, unknown when 0
+    @abstractmethod
+    def get_max_game_time_s(self) -> float:
         pass
 
+    # Fresh job in CREATED state doing the same work
     @abstractmethod
-    async def _process_completed_unlocked_internal(self, payload: str) -> None:
+    def _clone(self) -> 'TestJobRequest':
+        pass
+
+    @abstractmethod
+    def _to_record_unlocked(self, state: JobState) -> JobRecord:
         pass
 
     # ------------------------------
@@ -92,6 +192,50 @@ class TestJobRequest(ObjectModel, ABC):
         with self.get_lock().write():
             self._detach_from_worker_unlocked()
 
+    def get_worker(self) -> Worker | None:
+        with self.get_lock().read():
+            return self._worker
+
+    def get_group(self) -> JobGroup | None:
+        return self._group
+
+    def get_dispatch_count(self) -> int:
+        with self.get_lock().read():
+            return self._dispatch_count
+
+    def get_inflight_time(self) -> float:
+        with self.get_lock().read():
+            return time.perf_counter() - self._inflight_timestamp if self._state == JobState.INFLIGHT else 0
+
+    def create_duplicate(self) -> 'TestJobRequest':
+        duplicate = self._clone()
+
+        with self.get_lock().write():
+            if self._group is None:
+                self._group = JobGroup(self)
+
+            self._group.add(duplicate)
+            duplicate._group = self._group
+
+        return duplicate
+
+    # Returns the worker, which still runs the job and has to be told to drop it
+    def cancel(self) -> Worker | None:
+        with self.get_lock().write():
+            if self._state in (JobState.HARDENED, JobState.CANCELLED):
+                return None
+
+            worker = self._worker if self._state == JobState.INFLIGHT else None
+
+            if self._worker is not None:
+                self._worker.on_job_failed(self._test_job_id)
+
+            self._worker = None
+            self._state = JobState.CANCELLED
+
+        self._cancel_deadline()
+        return worker
+
     def get_failure_counter(self) -> int:
         with self.get_lock().read():
             return len(self._failure_reasons)
@@ -112,20 +256,85 @@ class TestJobRequest(ObjectModel, ABC):
         with self.get_lock().write():
             self._result_payload = payload
 
+    def get_results(self) -> dict[int, str]:
+        with self.get_lock().read():
+            return {seed: game.result for seed, game in self._results.items()}
+
+    # Returns True when the chunk finished the job. Chunks are resent after reconnects,
+    # so merging the same chunk again changes nothing.
+    def merge_result_chunk(self, worker: Worker, chunk: JobResultChunk) -> bool:
+        with self.get_lock().write():
+            if self._state != JobState.INFLIGHT or self._worker is not worker:
+                return False
+
+            # Durations are optional on the wire
+            durations = chunk.durations if len(chunk.durations) == len(chunk.seeds) else [0.0] * len(chunk.seeds)
+            worker_name = self._worker.get_model().name
+
+            new_games = {seed: GameRecord(result=result, duration_s=duration, worker=worker_name)
+                         for seed, result, duration in zip(chunk.seeds, chunk.results, durations)
+                         if seed not in self._results}
+            self._results.update(new_games)
+
+            self._worker.on_games_finished(len(new_games))
+
+            if len(new_games) != 0 and ManagerComponents().get_state_store() is not None:
+                ManagerComponents().get_state_store().save_results(self._test_job_id, new_games)
+
+            if ManagerComponents().get_progress_broadcaster() is not None:
+                ManagerComponents().get_progress_broadcaster().on_games(self._task_id, len(new_games))
+
+            return chunk.done and self._is_complete_unlocked()
+
+    def is_inflight_on(self, worker: Worker) -> bool:
+        with self.get_lock().read():
+            return self._state == JobState.INFLIGHT and self._worker is worker
+
+    # Deadline or cancel may land between the last merged chunk and this call, the job is then left as it is
+    def try_mark_completed(self) -> bool:
+        with self.get_lock().write():
+            if self._state != JobState.INFLIGHT:
+                return False
+
+            self._state = JobState.COMPLETED
+            self._worker.on_job_completed(self._test_job_id)
+            JOB_RUN_SECONDS.observe(time.perf_counter() - self._inflight_timestamp)
+            self._save_record_unlocked()
+
+        self._cancel_deadline()
+        return True
+
+    # Job goes back to the assigner until it runs out of allowed failures, then it is parked in the FAILED queue
     def try_to_fail(self, reason: str) -> None:
         with self.get_lock().write():
-            self._try_to_fail_unlocked(reason)
+            if self._state in (JobState.CANCELLED, JobState.FAILED, JobState.HARDENED):
+                return
+
+            should_retry = self._try_to_fail_unlocked(reason)
 
-        ManagerComponents().get_test_job_mgr().add_request(self)
+            # Retried jobs are saved once the assigner takes them back
+            if not should_retry:
+                self._save_record_unlocked()
+
+        self._cancel_deadline()
+
+        if should_retry:
+            ManagerComponents().get_job_assigner().submit_jobs([self])
+        else:
+            ManagerComponents().get_test_job_mgr().add_request(self)
 
     def abort_job(self) -> None:
-        with self.get_lock().write:
+        with self.get_lock().write():
             self._abort_job_unlocked()
 
     async def run(self) -> None:
         with self.get_lock().write():
             await self._run_unlocked()
 
+    def to_record(self) -> JobRecord:
+        with self.get_lock().read():
+            return self._to_record_unlocked(self._get_stored_state_unlocked())
+
     # ------------------------------
     # Private methods
     # ------------------------------
@@ -148,33 +357,77 @@ class TestJobRequest(ObjectModel, ABC):
 
         self._worker = worker
         self._state = JobState.PREPARED
+        worker.on_job_started(self._test_job_id, self.get_num_games())
 
     def _detach_from_worker_unlocked(self) -> None:
         if self._worker is None:
             raise Exception("Worker not set for job!")
 
+        self._worker.on_job_failed(self._test_job_id)
         self._worker = None
         self._state = JobState.CREATED
+        self._queued_timestamp = time.perf_counter()
 
     def _is_attached_to_worker_unlocked(self) -> bool:
         return self._worker is not None
 
-    def _try_to_fail_unlocked(self, reason: str) -> None:
+    def _try_to_fail_unlocked(self, reason: str) -> bool:
         self._failure_reasons.append(reason)
+        JOB_FAILURES.inc(labels=(str(self._task_id),))
+
+        if self._worker is not None:
+            self._worker.on_job_failed(self._test_job_id)
+
+        self._worker = None
 
-        if len(self._failure_reasons) <= SettingsLoader().get_settings().job_failures_limit:
+        if len(self._failure_reasons) > SettingsLoader().get_settings().job_failures_limit:
             self._state = JobState.FAILED
+            Logger().log_error(f"Job: {self._test_job_id} of task: {self._task_id} exceeded failures limit, "
+                               f"reasons: {self._failure_reasons}", LogLevel.LOW_FREQ)
+            return False
 
-            if self._worker is not None:
-                self._worker.on_job_failed()
+        self._state = JobState.CREATED
+        self._queued_timestamp = time.perf_counter()
+        Logger().log_info(f"Job: {self._test_job_id} failed with: {reason}, requeued", LogLevel.MEDIUM_FREQ)
+        return True
 
-            self._worker = None
+    def _get_stored_state_unlocked(self) -> JobState:
+        return self._state if self._state in (JobState.COMPLETED, JobState.FAILED, JobState.HARDENED) \
+            else JobState.CREATED
+
+    def _save_record_unlocked(self) -> None:
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().save_jobs(
+                [self._to_record_unlocked(self._get_stored_state_unlocked())])
+
+    def _get_deadline_key(self) -> tuple[str, int]:
+        return "job", self._test_job_id
+
+    # Games run in waves of worker cpus, every wave may take the longest possible game
+    def _schedule_deadline_unlocked(self) -> None:
+        settings = SettingsLoader().get_settings()
+        max_game_time_s = self.get_max_game_time_s() or settings.job_max_game_time_s
+
+        if max_game_time_s == 0:
+            return
+
+        waves = -(-self.get_num_games() // self._worker.get_cpus())
+        deadline_s = waves * max_game_time_s * settings.job_deadline_slack + settings.job_deadline_grace_s
+
+        dispatch_count = self._dispatch_count
+        ManagerComponents().get_deadline_scheduler().schedule_in(
+            self._get_deadline_key(), deadline_s,
+            lambda: ManagerComponents().get_test_job_mgr().on_job_deadline(self, dispatch_count))
+
+    def _cancel_deadline(self) -> None:
+        ManagerComponents().get_deadline_scheduler().cancel(self._get_deadline_key())
 
     async def _run_unlocked(self) -> None:
         if self._state not in WORKABLE_STATES:
             raise Exception("Job is not in a workable state!")
 
-        if self._worker is None:
+        # Jobs restored with all games played are completed without ever seeing a worker
+        if self._worker is None and self._state == JobState.PREPARED:
             raise Exception("Job is not attached to any worker!")
 
         if self._state == JobState.PREPARED:
@@ -190,17 +443,144 @@ class TestJobRequest(ObjectModel, ABC):
         if self._worker.get_state() != WorkerState.CONNECTED:
             raise Exception("Worker is not connected!")
 
-        socket = self._worker.get_conn_socket()
         payload = await self._process_prepared_unlocked_internal()
 
-        await socket.send_text(payload)
+        # Job threads run their own loops, the worker forwards the send to the socket loop
+        await self._worker.send_msg(SocketMsg(type=SocketMsgType.JOB, payload=payload.model_dump()))
 
         self._state = JobState.INFLIGHT
-        self._worker.on_job_started()
-        ManagerComponents().get_test_job_mgr().add_request(self)
-
+        self._inflight_timestamp = time.perf_counter()
+        self._dispatch_count += 1
+        JOB_DISPATCH_LATENCY_SECONDS.observe(self._inflight_timestamp - self._queued_timestamp)
+        self._schedule_deadline_unlocked()
+        ManagerComponents().get_test_job_mgr().add_request(self, self._state)
+
+    # Record goes to the state store before the games reach the result store, so a snapshot holding them
+    # is always written after it and a crash before the snapshot loses nothing
     async def _process_completed_unlocked(self) -> None:
-        await self._process_completed_unlocked_internal(self._result_payload)
-
         self._state = JobState.HARDENED
-        self._worker.on_job_completed()
+        self._save_record_unlocked()
+
+        await self._process_completed_unlocked_internal(self._results)
+
+
+class ModuleTestJobRequest(TestJobRequest):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _arg_str: str
+    _seeds: list[int]
+    _max_game_time_s: float
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, task_id: int, task_gen_num: int, arg_str: str, seeds: list[int],
+                 max_game_time_s: float = 0) -> None:
+        super().__init__(task_id, task_gen_num)
+        self._arg_str = arg_str
+        self._seeds = seeds
+        self._max_game_time_s = max_game_time_s
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def get_seeds(self) -> list[int]:
+        return self._seeds
+
+    # Games already played in an earlier dispatch or before a restart are not sent again
+    def get_num_games(self) -> int:
+        return len(self._get_missing_seeds())
+
+    def get_max_game_time_s(self) -> float:
+        return self._max_game_time_s
+
+    def _clone(self) -> TestJobRequest:
+        return ModuleTestJobRequest(self._task_id, self._task_gen_num, self._arg_str, self._seeds,
+                                    self._max_game_time_s)
+
+    @staticmethod
+    def from_record(record: JobRecord, results: dict[int, GameRecord]) -> 'ModuleTestJobRequest':
+        job = ModuleTestJobRequest(record.task_id, record.task_gen_num, record.arg_str, record.seeds,
+                                   record.max_game_time_s)
+
+        job._test_job_id = record.job_id
+        job._failure_reasons = list(record.failure_reasons)
+        seeds = set(record.seeds)
+        job._results = {seed: game for seed, game in results.items() if seed in seeds}
+
+        if record.state in (JobState.FAILED, JobState.HARDENED):
+            job._state = record.state
+        elif job._is_complete_unlocked():
+            job._state = JobState.COMPLETED
+
+        # New jobs must never reuse ids of the restored ones
+        with TestJobRequest._test_job_counter_lock:
+            TestJobRequest._test_job_counter = max(TestJobRequest._test_job_counter, record.job_id + 1)
+
+        return job
+
+    # Games of jobs hardened after the last result store save are appended again on restore
+    def restore_hardened_results(self) -> None:
+        with self.get_lock().write():
+            if self._state != JobState.HARDENED:
+                raise Exception("Job is not hardened!")
+
+            self._append_results_unlocked(self._results)
+
+    # ------------------------------
+    # Abstract methods implementation
+    # ------------------------------
+
+    async def _process_prepared_unlocked_internal(self) -> JobRequestPayload:
+        setup = ManagerComponents().get_test_task_mgr().get_worker_setup(self._task_id)
+        if setup is not None:
+            self._worker.ensure_task_setup(setup)
+
+        return JobRequestPayload(job_id=self._test_job_id, task_id=self._task_id, arg_str=self._arg_str,
+                                 seeds=self._get_missing_seeds())
+
+    async def _process_completed_unlocked_internal(self, results: dict[int, GameRecord]) -> None:
+        self._append_results_unlocked(results)
+
+        Logger().log_info(f"Job: {self._test_job_id} of task: {self._task_id} completed with "
+                          f"{len(results)} games", LogLevel.MEDIUM_FREQ)
+
+    def _append_results_unlocked(self, results: dict[int, GameRecord]) -> None:
+        params, opponent = self._get_game_context()
+        seeds = sorted(results.keys())
+
+        # Tested side plays white on even seeds
+        ManagerComponents().get_result_store().append_games(self._task_id, self._task_gen_num, self._test_job_id,
+                                                            params, opponent, seeds, [seed % 2 for seed in seeds],
+                                                            [results[seed] for seed in seeds])
+
+        if ManagerComponents().get_progress_broadcaster() is not None:
+            ManagerComponents().get_progress_broadcaster().on_results_hardened(self._task_id)
+
+    def _is_complete_unlocked(self) -> bool:
+        return all(seed in self._results for seed in self._seeds)
+
+    def _to_record_unlocked(self, state: JobState) -> JobRecord:
+        return JobRecord(job_id=self._test_job_id, task_id=self._task_id, task_gen_num=self._task_gen_num,
+                         state=state, arg_str=self._arg_str, seeds=self._seeds,
+                         max_game_time_s=self._max_game_time_s, failure_reasons=list(self._failure_reasons))
+
+    # Chess jobs carry the opponent and tested params, for other modules both stay empty
+    def _get_game_context(self) -> tuple[str, str]:
+        try:
+            parsed = json.loads(self._arg_str)
+        except ValueError:
+            return "", ""
+
+        if not isinstance(parsed, dict):
+            return "", ""
+
+        return json.dumps(parsed.get("params", {}), sort_keys=True), str(parsed.get("opponent", ""))
+
+    # Results only change while the job is in flight, when the game count is not used for assignment
+    def _get_missing_seeds(self) -> list[int]:
+        return [seed for seed in self._seeds if seed not in self._results]
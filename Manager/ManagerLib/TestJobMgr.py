@@ -3,8 +3,11 @@ from collections import deque
 from threading import Thread, Lock, Condition
 from typing import Deque
 
-from Manager.ManagerLib.TestJob import TestJobRequest
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.TestJob import TestJobRequest, ModuleTestJobRequest
+from Manager.ManagerLib.Worker import Worker
 from Models.OrchestratorModels import JobState, WORKABLE_STATES, QUEUEABLE_STATES
+from Models.WorkerModels import SocketMsg, SocketMsgType, JobCancelPayload
 from Utils.Logger import Logger, LogLevel
 from Utils.RWLock import MgrModel
 from Utils.SettingsLoader import SettingsLoader
@@ -72,11 +75,17 @@ class TestJobMgr(MgrModel):
     thread_counter_lock: Lock = Lock()
 
     _threads: dict[int, TestJobThreadData]
+    _base_thread_count: int
 
     _job_queues: dict[JobState, Deque[TestJobRequest]]
+    _jobs_by_id: dict[int, TestJobRequest]
 
     _cv: Condition
 
+    _autoscaler: Thread
+    _autoscaler_cv: Condition
+    _should_autoscaler_work: bool
+
     # ------------------------------
     # Class creation
     # ------------------------------
@@ -86,14 +95,39 @@ class TestJobMgr(MgrModel):
         self._threads = {}
         self._cv = Condition()
         self._job_queues = {state: deque() for state in QUEUEABLE_STATES}
+        self._jobs_by_id = {}
+        self._base_thread_count = SettingsLoader().get_settings().job_threads
+
+        self._startup_worker_threads(self._base_thread_count)
+
+        self._autoscaler_cv = Condition()
+        self._should_autoscaler_work = True
+        self._autoscaler = Thread(target=self._autoscaler_thread)
+        self._autoscaler.start()
 
-        self._startup_worker_threads(SettingsLoader().get_settings().job_threads)
         Logger().log_info("Test Job Manager correctly initialized", LogLevel.LOW_FREQ)
 
     def destroy(self) -> None:
-        self._stop_worker_threads(len(self._threads))
+        with self._autoscaler_cv:
+            self._should_autoscaler_work = False
+            self._autoscaler_cv.notify_all()
+        self._autoscaler.join()
 
-        Logger().log_info(f"Remaining requests in queue will be lost: {self.get_num_requests()}", LogLevel.LOW_FREQ)
+        # Threads already draining after a shrink are joined as well
+        with self.get_lock().write():
+            self._mark_for_stop_unlocked(len(self._threads))
+            threads = [thread_data.thread for thread_data in self._threads.values()]
+        self.signal_threads()
+
+        for thread in threads:
+            thread.join()
+
+        if ManagerComponents().get_state_store() is not None and ManagerComponents().get_state_store().is_enabled():
+            Logger().log_info(f"Remaining requests in queue kept in state store: {self.get_num_requests()}",
+                              LogLevel.LOW_FREQ)
+        else:
+            Logger().log_info(f"Remaining requests in queue will be lost: {self.get_num_requests()}",
+                              LogLevel.LOW_FREQ)
         Logger().log_info("Test Job Manager destroyed", LogLevel.LOW_FREQ)
 
     # ------------------------------
@@ -103,6 +137,12 @@ class TestJobMgr(MgrModel):
     def stop_task_jobs(self, task_id: int, task_gen_num: int) -> None:
         Logger().log_info(f"Stopping task jobs for task: {task_id} with gen num: {task_gen_num}", LogLevel.MEDIUM_FREQ)
 
+        if ManagerComponents().get_job_assigner() is not None:
+            ManagerComponents().get_job_assigner().drop_task_jobs(task_id, task_gen_num)
+
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().delete_task_jobs(task_id, task_gen_num)
+
         for state in QUEUEABLE_STATES:
             jobs_to_abort = []
             cleaned_jobs = []
@@ -116,6 +156,9 @@ class TestJobMgr(MgrModel):
 
                 self._job_queues[state] = deque(cleaned_jobs)
 
+                for job in jobs_to_abort:
+                    self._jobs_by_id.pop(job.get_id(), None)
+
             for job in jobs_to_abort:
                 job.abort_job()
 
@@ -127,43 +170,222 @@ class TestJobMgr(MgrModel):
             Logger().log_error("Thread count cannot be less than 1", LogLevel.LOW_FREQ)
             return
 
-        if new_thread_count > len(self._threads):
-            self._startup_worker_threads(new_thread_count - len(self._threads))
+        # Reloads of unrelated settings keep the size picked by the autoscaler
+        with self.get_lock().write():
+            if new_thread_count == self._base_thread_count:
+                return
+            self._base_thread_count = new_thread_count
 
-        if new_thread_count < len(self._threads):
-            self._stop_worker_threads(len(self._threads) - new_thread_count)
+        # Autoscaler grows to the new base at once and shrinks gently down to it
+        if not SettingsLoader().get_settings().job_autoscale:
+            self._resize_pool(new_thread_count)
+        self._wake_autoscaler()
 
         Logger().log_info(f"Thread count updated to {new_thread_count}", LogLevel.LOW_FREQ)
 
     def get_worker_thread_count(self) -> int:
         with self.get_lock().read():
-            return len(self._threads)
+            return self._get_active_thread_count_unlocked()
+
+    def get_queue_depths(self) -> dict[JobState, int]:
+        with self.get_lock().read():
+            return {state: len(queue) for state, queue in self._job_queues.items()}
 
     def get_num_requests(self) -> int:
         with self.get_lock().read():
             return sum(len(q) for q in self._job_queues.values())
 
-    def add_request(self, request: TestJobRequest) -> None:
+    # Jobs re-queueing themselves while holding their own lock pass the state, as reading it would lock again
+    def add_request(self, request: TestJobRequest, state: JobState | None = None) -> None:
+        state = request.get_state() if state is None else state
+
         Logger().log_info(
             f"Adding request to queue with id: {request.get_id()} from task: {request.get_task_id()}"
             f" and task gen num: {request.get_task_gen_num()}",
             LogLevel.HIGH_FREQ)
 
-        if request.get_state() not in self._job_queues:
-            raise ValueError(f"Invalid job state: {request.get_state()}")
+        if state not in self._job_queues:
+            raise ValueError(f"Invalid job state: {state}")
+
+        with self.get_lock().write():
+            self._job_queues[state].append(request)
+            self._jobs_by_id[request.get_id()] = request
+            should_scale = self._get_workable_depth_unlocked() > \
+                self._get_active_thread_count_unlocked() * SettingsLoader().get_settings().job_autoscale_jobs_per_thread
+
+        self.signal_threads()
+
+        if should_scale:
+            self._wake_autoscaler()
+
+    def get_job(self, job_id: int) -> TestJobRequest | None:
+        with self.get_lock().read():
+            return self._jobs_by_id.get(job_id)
+
+    def get_inflight_jobs(self) -> list[TestJobRequest]:
+        with self.get_lock().read():
+            return list(self._job_queues[JobState.INFLIGHT])
+
+    # Moves a whole batch of in-flight jobs out of the queue under a single lock and wakes the threads once
+    def finish_inflight_jobs(self, completed: list[TestJobRequest], failed: list[tuple[TestJobRequest, str]]) -> None:
+        if len(completed) == 0 and len(failed) == 0:
+            return
+
+        winners = []
+        to_cancel = []
+        for job in completed:
+            group = job.get_group()
+
+            if group is None:
+                winners.append(job)
+            elif group.try_win(job):
+                winners.append(job)
+                to_cancel.extend(group.get_others(job))
+            else:
+                to_cancel.append(job)
+
+        # A failed copy is simply dropped while another copy of the job is still alive
+        to_fail = []
+        for job, reason in failed:
+            group = job.get_group()
+
+            if group is not None and (group.is_resolved() or any(
+                    other.get_state() not in (JobState.CANCELLED, JobState.FAILED) for other in group.get_others(job))):
+                to_cancel.append(job)
+            else:
+                to_fail.append((job, reason))
+
+        # Job locks are never taken under the manager lock
+        winners = [job for job in winners if job.try_mark_completed()]
+        finished_ids = {job.get_id() for job in winners} | {job.get_id() for job, _ in to_fail}
 
         with self.get_lock().write():
-            self._job_queues[request.get_state()].append(request)
+            inflight = self._job_queues[JobState.INFLIGHT]
+            self._job_queues[JobState.INFLIGHT] = deque(job for job in inflight if job.get_id() not in finished_ids)
+            self._job_queues[JobState.COMPLETED].extend(winners)
+
+        for job, reason in to_fail:
+            job.try_to_fail(reason)
+
+        self.cancel_jobs(to_cancel)
         self.signal_threads()
 
+    def on_job_deadline(self, job: TestJobRequest, dispatch_count: int) -> None:
+        worker = job.get_worker()
+
+        # Deadline of an earlier dispatch, the job has been finished or requeued since
+        if worker is None or job.get_dispatch_count() != dispatch_count or not job.is_inflight_on(worker):
+            return
+
+        Logger().log_warning(f"Job: {job.get_id()} exceeded its deadline on worker: {worker.get_model().name}",
+                             LogLevel.MEDIUM_FREQ)
+
+        self.finish_inflight_jobs([], [(job, "Deadline exceeded")])
+        self._notify_cancelled(worker, [job.get_id()])
+
+    # Jobs of a lost worker would otherwise wait for results that never come
+    def requeue_worker_jobs(self, worker: Worker, reason: str) -> None:
+        orphaned = [job for job in self.get_inflight_jobs() if job.is_inflight_on(worker)]
+
+        if len(orphaned) == 0:
+            return
+
+        Logger().log_info(f"Requeueing {len(orphaned)} jobs of worker: {worker.get_model().name}: {reason}",
+                          LogLevel.MEDIUM_FREQ)
+        self.finish_inflight_jobs([], [(job, reason) for job in orphaned])
+
+    def cancel_jobs(self, jobs: list[TestJobRequest]) -> None:
+        if len(jobs) == 0:
+            return
+
+        to_notify: dict[int, tuple[Worker, list[int]]] = {}
+        for job in jobs:
+            worker = job.cancel()
+
+            if worker is not None:
+                to_notify.setdefault(worker.get_session_token(), (worker, []))[1].append(job.get_id())
+
+        cancelled_ids = {job.get_id() for job in jobs}
+
+        with self.get_lock().write():
+            for state in QUEUEABLE_STATES:
+                self._job_queues[state] = deque(job for job in self._job_queues[state]
+                                                if job.get_id() not in cancelled_ids)
+
+            for job_id in cancelled_ids:
+                self._jobs_by_id.pop(job_id, None)
+
+        if ManagerComponents().get_job_assigner() is not None:
+            ManagerComponents().get_job_assigner().drop_jobs(cancelled_ids)
+
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().delete_jobs(list(cancelled_ids))
+
+        for worker, job_ids in to_notify.values():
+            self._notify_cancelled(worker, job_ids)
+
+        Logger().log_info(f"Cancelled jobs: {sorted(cancelled_ids)}", LogLevel.MEDIUM_FREQ)
+
     def signal_threads(self) -> None:
         with self._cv:
             self._cv.notify_all()
 
+    # Jobs bound to a worker before the restart are dispatched again, only their missing games are played
+    def restore_jobs(self) -> None:
+        store = ManagerComponents().get_state_store()
+        records, results = store.load_jobs()
+
+        if len(records) == 0:
+            return
+
+        stored_job_ids = ManagerComponents().get_result_store().get_job_ids()
+        to_submit = []
+        stale_ids = []
+        played_games = 0
+        hardened_jobs = 0
+        rebuilt_jobs = 0
+        for record in records:
+            # Hardened jobs are never run again, only games missing in the result store are appended
+            if record.state == JobState.HARDENED:
+                hardened_jobs += 1
+                if record.job_id not in stored_job_ids:
+                    ModuleTestJobRequest.from_record(record, results.get(record.job_id, {})).restore_hardened_results()
+                    rebuilt_jobs += 1
+                continue
+
+            if not ManagerComponents().get_test_task_mgr().is_task_running(record.task_id, record.task_gen_num):
+                stale_ids.append(record.job_id)
+                continue
+
+            job = ModuleTestJobRequest.from_record(record, results.get(record.job_id, {}))
+            played_games += len(job.get_results())
+
+            if job.get_state() == JobState.CREATED:
+                to_submit.append(job)
+            else:
+                self.add_request(job)
+
+        # Jobs of tasks stopped or reconfigured in the meantime
+        store.delete_jobs(stale_ids)
+        ManagerComponents().get_job_assigner().submit_jobs(to_submit)
+
+        Logger().log_info(f"Restored jobs: {len(records) - len(stale_ids) - hardened_jobs}, games already played: "
+                          f"{played_games}, dropped stale jobs: {len(stale_ids)}, "
+                          f"hardened jobs added to results: {rebuilt_jobs}", LogLevel.LOW_FREQ)
+
     # ------------------------------
     # Private methods
     # ------------------------------
 
+    @staticmethod
+    def _notify_cancelled(worker: Worker, job_ids: list[int]) -> None:
+        try:
+            worker.send_msg_threadsafe(SocketMsg(type=SocketMsgType.CANCEL,
+                                                 payload=JobCancelPayload(job_ids=job_ids).model_dump()))
+        except Exception as e:
+            Logger().log_info(f"Not able to cancel jobs on worker: {worker.get_model().name}: {e}",
+                              LogLevel.MEDIUM_FREQ)
+
     def _startup_worker_threads(self, thread_count: int) -> None:
         Logger().log_info(f"Starting {thread_count} worker threads", LogLevel.LOW_FREQ)
 
@@ -183,33 +405,77 @@ class TestJobMgr(MgrModel):
 
         thread.start()
 
-    def _mark_for_stop_unlocked(self, tid: int) -> None:
-        self._threads[tid].cond = False
+    def _get_active_thread_count_unlocked(self) -> int:
+        return sum(1 for thread_data in self._threads.values() if thread_data.cond)
 
-    def _unregister_thread_unlocked(self, tid: int) -> None:
-        self._threads[tid].thread.join()
-        self._threads.pop(tid)
+    def _get_workable_depth_unlocked(self) -> int:
+        return sum(len(self._job_queues[state]) for state in WORKABLE_STATES)
 
-    def _stop_worker_threads(self, thread_count: int) -> None:
-        Logger().log_info(f"Stopping {thread_count} worker threads from {len(self._threads)}", LogLevel.LOW_FREQ)
+    def _mark_for_stop_unlocked(self, thread_count: int) -> list[int]:
+        threads_to_stop = [tid for tid, thread_data in self._threads.items() if thread_data.cond][:thread_count]
 
+        for tid in threads_to_stop:
+            self._threads[tid].cond = False
+
+        return threads_to_stop
+
+    # Stopped threads finish their current request and deregister themselves, nothing is joined here
+    def _resize_pool(self, target_thread_count: int) -> None:
         with self.get_lock().write():
-            threads_to_stop = list(self._threads.keys())[:thread_count]
+            active_threads = self._get_active_thread_count_unlocked()
 
-            for tid in threads_to_stop:
-                self._mark_for_stop_unlocked(tid)
+            if target_thread_count > active_threads:
+                for _ in range(target_thread_count - active_threads):
+                    self._register_thread_unlocked()
+            elif target_thread_count < active_threads:
+                self._mark_for_stop_unlocked(active_threads - target_thread_count)
 
+        if target_thread_count != active_threads:
+            Logger().log_info(f"Job thread pool resized: {active_threads} -> {target_thread_count}",
+                              LogLevel.MEDIUM_FREQ)
             self.signal_threads()
 
-            for tid in threads_to_stop:
-                self._unregister_thread_unlocked(tid)
+    def _wake_autoscaler(self) -> None:
+        with self._autoscaler_cv:
+            self._autoscaler_cv.notify_all()
+
+    def _autoscaler_thread(self) -> None:
+        while True:
+            settings = SettingsLoader().get_settings()
+
+            with self.get_lock().read():
+                depth = self._get_workable_depth_unlocked()
+                active_threads = self._get_active_thread_count_unlocked()
+                base_threads = self._base_thread_count
+
+            if settings.job_autoscale:
+                max_threads = max(base_threads, settings.job_threads_max)
+                desired = min(max_threads, max(base_threads, -(-depth // settings.job_autoscale_jobs_per_thread)))
+
+                # Grow at once to follow bursts, shrink one thread per tick to drain gently
+                if desired > active_threads:
+                    self._resize_pool(desired)
+                elif desired < active_threads:
+                    self._resize_pool(active_threads - 1)
+                    active_threads -= 1
+
+            # Sleep until a new burst arrives, only tick while above the base size
+            with self._autoscaler_cv:
+                if not self._should_autoscaler_work:
+                    break
+
+                self._autoscaler_cv.wait(settings.job_autoscale_interval if active_threads > base_threads else None)
+
+                if not self._should_autoscaler_work:
+                    break
+
+    def _has_workable_requests(self) -> bool:
+        with self.get_lock().read():
+            return self._get_workable_depth_unlocked() > 0
 
     def _get_next_request(self) -> TestJobRequest | None:
         # Start from completed jobs and go back to prepared jobs
-        reverse = WORKABLE_STATES
-        reverse.reverse()
-
-        for state in reverse:
+        for state in reversed(WORKABLE_STATES):
             with self.get_lock().write():
                 if len(self._job_queues[state]) > 0:
                     return self._job_queues[state].popleft()
@@ -219,6 +485,9 @@ class TestJobMgr(MgrModel):
     def _worker_thread_func_starter(self, tid: int) -> None:
         Logger().log_info(f"Worker thread {tid} started", LogLevel.MEDIUM_FREQ)
         asyncio.run(self._worker_thread_func(tid))
+
+        with self.get_lock().write():
+            self._threads.pop(tid, None)
         Logger().log_info(f"Worker thread {tid} stopped", LogLevel.MEDIUM_FREQ)
 
     async def _worker_thread_func(self, tid: int) -> None:
@@ -236,6 +505,10 @@ class TestJobMgr(MgrModel):
                     Logger().log_error(f"Error in job execution: {e}", LogLevel.LOW_FREQ)
                     request.try_to_fail(str(e))
 
+                if request.get_state() == JobState.HARDENED:
+                    with self.get_lock().write():
+                        self._jobs_by_id.pop(request.get_id(), None)
+
                 if not thread_info.cond:
                     break
 
@@ -245,4 +518,4 @@ class TestJobMgr(MgrModel):
                 break
 
             with self._cv:
-                self._cv.wait()
+                self._cv.wait_for(lambda: not thread_info.cond or self._has_workable_requests())
@@ -1,23 +1,46 @@
+import bisect
 import json
 from collections.abc import Callable
+from dataclasses import dataclass
 from threading import Lock
 
 from Manager.ManagerLib.ManagerComponents import ManagerComponents
 from Models.GlobalModels import CommandResult
 from Models.OrchestratorModels import TaskCreateRequest, TaskOperationRequest, TaskOpRequestWithConfig, \
     ConfigSpecElement, TaskInitResponse, TaskState, TaskMinimalQueryAllResponse, TestTaskMinimalQuery, \
-    TaskConfigSpecResponse, TestTaskFullQuery, TaskCreateResult, TaskInitRequest
+    TaskConfigSpecResponse, TestTaskFullQuery, TaskCreateResult, TaskInitRequest, TaskPageRequest, TaskPageResponse
+from Models.WorkerModels import TaskSetupPayload
 from Modules.ManagerTestModule.BaseManagerTestModule import BaseManagerTestModule
 from Modules.ModuleBuilder import ModuleBuilder
 from Modules.ModuleMgr import ModuleMgr
 from Modules.WorkerTestModule.BaseWorkerTestModule import BaseWorkerTestModule
 from Utils.Helpers import validate_dict_str_list_str, validate_dict_str
 from Utils.Logger import Logger, LogLevel
-from Utils.RWLock import ObjectModel, MgrModel
+from Utils.RWLock import MgrModel, SnapshotObjectModel
 from Utils.SettingsLoader import SettingsLoader
 
 
-class TestTask(ObjectModel):
+# Published configs are never mutated in place, new dicts are always swapped in
+@dataclass(frozen=True, slots=True)
+class TestTaskSnapshot:
+    task_id: int
+    task_name: str
+    task_description: str
+    module_name: str
+    state: TaskState
+    gen_num: int
+
+    worker_init: dict[str, list[str]] | None = None
+    manager_init: dict[str, list[str]] | None = None
+
+    worker_build_config: dict[str, any] | None = None
+    manager_build_config: dict[str, any] | None = None
+
+    worker_config: dict[str, any] | None = None
+    manager_config: dict[str, any] | None = None
+
+
+class TestTask(SnapshotObjectModel[TestTaskSnapshot]):
     # ------------------------------
     # Class fields
     # ------------------------------
@@ -26,59 +49,52 @@ class TestTask(ObjectModel):
     _obj_counter_lock: Lock = Lock()
 
     _module_name: str
-    _state: TaskState
     _task_id: int
 
-    _worker_init: dict[str, list[str]] | None
-    _manager_init: dict[str, list[str]] | None
-
-    _worker_build_config: dict[str, any] | None
-    _manager_build_config: dict[str, any] | None
-
-    _worker_config: dict[str, any] | None
-    _manager_config: dict[str, any] | None
-
     _task_module: BaseManagerTestModule | None
     _worker_task_module: BaseWorkerTestModule | None
 
     _worker_module_builder: ModuleBuilder
     _manager_module_builder: ModuleBuilder
 
-    _task_name: str
-    _task_description: str
+    # Stored copy of a restored task is only replaced once its replay succeeded
+    _is_restoring: bool
+
+    # Queries built from the snapshot they are stored with, a newly published snapshot invalidates them
+    _minimal_query_cache: tuple[TestTaskSnapshot, TestTaskMinimalQuery] | None
+    _full_query_cache: tuple[TestTaskSnapshot, TestTaskFullQuery] | None
 
     # ------------------------------
     # Class creation
     # ------------------------------
 
-    def __init__(self, module_name: str, task_name: str, task_description: str) -> None:
-        super().__init__()
+    # Restored tasks keep their id, so their stored jobs still point to them
+    def __init__(self, module_name: str, task_name: str, task_description: str, task_id: int | None = None) -> None:
         self._module_name = module_name
-        self._state = TaskState.UNINITIATED
 
         ModuleMgr().validate_module(module_name)
 
-        self._worker_init = None
-        self._manager_init = None
-
-        self._worker_build_config = None
-        self._manager_build_config = None
-
-        self._worker_config = None
-        self._manager_config = None
-
         self._task_module = None
         self._worker_task_module = None
+        self._minimal_query_cache = None
+        self._full_query_cache = None
+        self._is_restoring = task_id is not None
 
         self._worker_module_builder = ModuleMgr().get_module_worker_part(module_name)
         self._manager_module_builder = ModuleMgr().get_module_manager_part(module_name)
 
-        self._task_name = task_name
-        self._task_description = task_description
-
         with TestTask._obj_counter_lock:
-            self._task_id = TestTask._obj_counter
-            TestTask._obj_counter += 1
+            self._task_id = TestTask._obj_counter if task_id is None else task_id
+            TestTask._obj_counter = max(TestTask._obj_counter, self._task_id + 1)
+
+        super().__init__(TestTaskSnapshot(task_id=self._task_id,
+                                          task_name=task_name,
+                                          task_description=task_description,
+                                          module_name=module_name,
+                                          state=TaskState.UNINITIATED,
+                                          gen_num=0))
+        self._save_snapshot()
+        self._publish_progress()
 
         Logger().log_info(f"Test Task object with {module_name} correctly created", LogLevel.MEDIUM_FREQ)
 
@@ -91,16 +107,15 @@ class TestTask(ObjectModel):
         manager_init = config.manager_init
 
         with self.perform_operation_non_blocking():
-            with self.get_lock().read():
-                if self._state != TaskState.UNINITIATED:
-                    raise ValueError(f"Task {self._task_id} already initiated")
+            if self._snapshot.state != TaskState.UNINITIATED:
+                raise ValueError(f"Task {self._task_id} already initiated")
 
             lacking_manager_module = self._manager_module_builder.get_next_submodule_needed(manager_init)
             lacking_worker_module = self._worker_module_builder.get_next_submodule_needed(worker_init)
 
             with self.get_lock().write():
-                self._manager_init = manager_init
-                self._worker_init = worker_init
+                self._publish_snapshot_unlocked(manager_init=manager_init, worker_init=worker_init)
+            self._save_snapshot()
 
             if lacking_manager_module is None and lacking_worker_module is None:
                 self._try_to_init_modules()
@@ -110,72 +125,118 @@ class TestTask(ObjectModel):
 
     def try_to_build(self, config_json: str) -> None:
         with self.perform_operation_non_blocking():
-            with self.get_lock().read():
-                if self._state != TaskState.INITIATED:
-                    raise ValueError(f"Task {self._task_id} not initiated")
+            if self._snapshot.state != TaskState.INITIATED:
+                raise ValueError(f"Task {self._task_id} not initiated")
 
             self._build_submodules(config_json)
             self._change_state(TaskState.BUILT)
 
     def try_to_config(self, config_json: str) -> None:
         with self.perform_operation_non_blocking():
-            with self.get_lock().read():
-                if self._state != TaskState.BUILT:
-                    raise ValueError(f"Task {self._task_id} not built")
+            if self._snapshot.state != TaskState.BUILT:
+                raise ValueError(f"Task {self._task_id} not built")
 
             self._config_submodules(config_json)
             self._change_state(TaskState.READY)
 
     def try_to_reconfig_task(self) -> None:
         with self._op_lock:
-            with self.get_lock().read():
-                state = self._state
-                if state != TaskState.READY or state != TaskState.SCHEDULED:
-                    raise ValueError(f"Task {self._task_id} not ready or scheduled to reconfig")
+            snapshot = self._snapshot
+            if snapshot.state != TaskState.READY and snapshot.state != TaskState.SCHEDULED:
+                raise ValueError(f"Task {self._task_id} not ready or scheduled to reconfig")
 
-            if state == TaskState.SCHEDULED:
-                ManagerComponents().get_test_job_mgr().stop_task_jobs(self._task_id, self.get_gen_num_locked())
+            if snapshot.state == TaskState.SCHEDULED:
+                ManagerComponents().get_test_job_mgr().stop_task_jobs(self._task_id, snapshot.gen_num)
 
             self._change_state(TaskState.BUILT)
 
     def try_to_schedule_task(self) -> None:
         with self.perform_operation_non_blocking():
-            with self.get_lock().read():
-                if self._state != TaskState.READY:
-                    raise ValueError(f"Task {self._task_id} not ready")
+            if self._snapshot.state != TaskState.READY:
+                raise ValueError(f"Task {self._task_id} not ready")
 
             self._change_state(TaskState.SCHEDULED)
 
     def try_to_stop_task(self) -> None:
         with self._op_lock:
-            with self.get_lock().read():
-                if self._state != TaskState.SCHEDULED:
-                    raise ValueError(f"Task {self._task_id} not scheduled")
+            snapshot = self._snapshot
+            if snapshot.state != TaskState.SCHEDULED:
+                raise ValueError(f"Task {self._task_id} not scheduled")
 
-            ManagerComponents().get_test_job_mgr().stop_task_jobs(self._task_id, self.get_gen_num_locked())
+            ManagerComponents().get_test_job_mgr().stop_task_jobs(self._task_id, snapshot.gen_num)
             self._change_state(TaskState.READY)
 
+    # Modules live only in memory, so the stored configs are replayed through the usual steps.
+    # Steps save nothing meanwhile, a failed replay leaves the stored task intact for the next restart.
+    def restore(self, snapshot: dict[str, any]) -> None:
+        state = TaskState(snapshot["state"])
+
+        try:
+            if state >= TaskState.INITIATED:
+                self.try_to_init(TaskInitRequest(task_id=self._task_id, worker_init=snapshot["worker_init"],
+                                                 manager_init=snapshot["manager_init"]))
+            if state >= TaskState.BUILT:
+                self.try_to_build(json.dumps({"worker_build_config": snapshot["worker_build_config"],
+                                              "manager_build_config": snapshot["manager_build_config"]}))
+            if state >= TaskState.READY:
+                self.try_to_config(json.dumps({"worker_config": snapshot["worker_config"],
+                                               "manager_config": snapshot["manager_config"]}))
+            if state == TaskState.SCHEDULED:
+                self.try_to_schedule_task()
+
+            # Stored jobs are bound to the generation from before the restart
+            with self.get_lock().write():
+                self._gen_num = snapshot["gen_num"]
+                self._publish_snapshot_unlocked(gen_num=snapshot["gen_num"])
+        finally:
+            self._is_restoring = False
+
+        self._save_snapshot()
+        self._publish_progress()
+
+    # Cache entries are swapped as whole tuples, so readers stay lock free like with the snapshot itself
+    def get_minimal_query(self) -> TestTaskMinimalQuery:
+        snapshot = self._snapshot
+        cached = self._minimal_query_cache
+
+        if cached is None or cached[0] is not snapshot:
+            cached = (snapshot, TestTask.prepare_minimal_query(snapshot))
+            self._minimal_query_cache = cached
+
+        return cached[1]
+
     def get_full_task_query(self) -> TestTaskFullQuery:
-        with self._op_lock:
-            with self.get_lock().read():
-                return TestTaskFullQuery(
-                    result="",
-                    minimal_query=TestTaskMinimalQuery(task_id=self._task_id,
-                                                                            name=self._task_name,
-                                                                            description=self._task_description,
-                                                                            module_name=self._module_name,
-                                                                            task_state=self._state),
-                                         worker_init_config=self._worker_init,
-                                         manager_init_config=self._manager_init,
-                                         worker_build_config="" if self._worker_build_config is None else json.dumps(
-                                             self._worker_build_config),
-                                         manager_build_config="" if self._manager_build_config is None else json.dumps(
-                                             self._manager_build_config),
-                                         worker_config="" if self._worker_config is None else json.dumps(
-                                             self._worker_config),
-                                         manager_config="" if self._manager_config is None else json.dumps(
-                                             self._manager_config)
-                                         )
+        snapshot = self._snapshot
+        cached = self._full_query_cache
+
+        if cached is None or cached[0] is not snapshot:
+            cached = (snapshot, TestTask._prepare_full_query(snapshot, self.get_minimal_query()))
+            self._full_query_cache = cached
+
+        return cached[1]
+
+    @staticmethod
+    def _prepare_full_query(snapshot: TestTaskSnapshot, minimal_query: TestTaskMinimalQuery) -> TestTaskFullQuery:
+        return TestTaskFullQuery(
+            result="",
+            minimal_query=minimal_query,
+            worker_init_config=snapshot.worker_init,
+            manager_init_config=snapshot.manager_init,
+            worker_build_config="" if snapshot.worker_build_config is None else json.dumps(
+                snapshot.worker_build_config),
+            manager_build_config="" if snapshot.manager_build_config is None else json.dumps(
+                snapshot.manager_build_config),
+            worker_config="" if snapshot.worker_config is None else json.dumps(snapshot.worker_config),
+            manager_config="" if snapshot.manager_config is None else json.dumps(snapshot.manager_config)
+        )
+
+    @staticmethod
+    def prepare_minimal_query(snapshot: TestTaskSnapshot) -> TestTaskMinimalQuery:
+        return TestTaskMinimalQuery(task_id=snapshot.task_id,
+                                    name=snapshot.task_name,
+                                    description=snapshot.task_description,
+                                    module_name=snapshot.module_name,
+                                    task_state=snapshot.state)
 
     # ------------------------------
     # getters and setters
@@ -185,62 +246,68 @@ class TestTask(ObjectModel):
         return self._task_id
 
     def get_task_state(self) -> TaskState:
-        with self.get_lock().read():
-            return self._state
+        return self._snapshot.state
+
+    def get_gen_num(self) -> int:
+        return self._snapshot.gen_num
 
     def get_module_name(self) -> str:
         return self._module_name
 
     def get_worker_build_config(self) -> dict[str, any]:
-        with self.get_lock().read():
-            return self._worker_build_config
+        return self._snapshot.worker_build_config
 
     def get_manager_build_config(self) -> dict[str, any]:
-        with self.get_lock().read():
-            return self._manager_build_config
+        return self._snapshot.manager_build_config
 
     def get_worker_config(self) -> dict[str, any]:
-        with self.get_lock().read():
-            return self._worker_config
+        return self._snapshot.worker_config
 
     def get_manager_config(self) -> dict[str, any]:
-        with self.get_lock().read():
-            return self._manager_config
+        return self._snapshot.manager_config
 
     def get_worker_init(self) -> dict[str, list[str]]:
-        with self.get_lock().read():
-            return self._worker_init
+        return self._snapshot.worker_init
 
     def get_manager_init(self) -> dict[str, list[str]]:
-        with self.get_lock().read():
-            return self._manager_init
+        return self._snapshot.manager_init
 
     def get_task_name(self) -> str:
-        return self._task_name
+        return self._snapshot.task_name
+
+    # None until the worker part of the task is fully configured
+    def get_worker_setup(self) -> TaskSetupPayload | None:
+        snapshot = self._snapshot
+
+        if snapshot.worker_init is None or snapshot.worker_build_config is None or snapshot.worker_config is None:
+            return None
+
+        return TaskSetupPayload(task_id=self._task_id, module_name=self._module_name,
+                                worker_init=snapshot.worker_init, worker_build_config=snapshot.worker_build_config,
+                                worker_config=snapshot.worker_config)
 
     def get_task_description(self) -> str:
-        return self._task_description
+        return self._snapshot.task_description
 
     def get_worker_config_spec_unguarded(self) -> list[ConfigSpecElement]:
-        return self._worker_module_builder.get_config_spec(self._worker_init)
+        return self._worker_module_builder.get_config_spec(self._snapshot.worker_init)
 
     def get_manager_config_spec_unguarded(self) -> list[ConfigSpecElement]:
-        return self._manager_module_builder.get_config_spec(self._manager_init)
+        return self._manager_module_builder.get_config_spec(self._snapshot.manager_init)
 
     def get_worker_build_spec_unguarded(self) -> list[ConfigSpecElement]:
-        return self._worker_module_builder.get_build_spec(self._worker_init)
+        return self._worker_module_builder.get_build_spec(self._snapshot.worker_init)
 
     def get_manager_build_spec_unguarded(self) -> list[ConfigSpecElement]:
-        return self._manager_module_builder.get_build_spec(self._manager_init)
+        return self._manager_module_builder.get_build_spec(self._snapshot.manager_init)
 
     # ------------------------------
     # Other methods
     # ------------------------------
 
     def prepare_config_options(self) -> str:
-        with self.get_lock().read():
-            if self._state != TaskState.BUILT:
-                raise ValueError(f"Task {self._task_id} must be in BUILT state")
+        if self._snapshot.state != TaskState.BUILT:
+            raise ValueError(f"Task {self._task_id} must be in BUILT state")
 
         return ""
 
@@ -249,18 +316,18 @@ class TestTask(ObjectModel):
     # ------------------------------
 
     def _validate_init_state_unlocked(self) -> None:
-        if self._state == TaskState.UNINITIATED:
+        if self._snapshot.state == TaskState.UNINITIATED:
             raise ValueError(f"Task {self._task_id} not initiated")
 
     def _try_to_init_modules(self) -> None:
         try:
-            self._worker_task_module = self._worker_module_builder.build(self._worker_init)
+            self._worker_task_module = self._worker_module_builder.build(self._snapshot.worker_init)
         except Exception as e:
             Logger().log_error(f"Error while initializing worker module: {e}", LogLevel.LOW_FREQ)
             raise e
 
         try:
-            self._task_module = self._manager_module_builder.build(self._manager_init)
+            self._task_module = self._manager_module_builder.build(self._snapshot.manager_init)
         except Exception as e:
             Logger().log_error(f"Error while initializing manager module: {e}", LogLevel.LOW_FREQ)
             raise e
@@ -296,8 +363,9 @@ class TestTask(ObjectModel):
             raise e
 
         with self.get_lock().write():
-            self._worker_build_config = worker_build_config
-            self._manager_build_config = manager_build_config
+            self._publish_snapshot_unlocked(worker_build_config=worker_build_config,
+                                            manager_build_config=manager_build_config)
+        self._save_snapshot()
 
     def _config_submodules(self, config_json: str) -> None:
         parsed_json: dict[str, dict[str, any]] = json.loads(config_json)
@@ -326,25 +394,43 @@ class TestTask(ObjectModel):
             raise e
 
         with self.get_lock().write():
-            self._worker_config = worker_config
-            self._manager_config = manager_config
+            self._publish_snapshot_unlocked(worker_config=worker_config, manager_config=manager_config)
+        self._save_snapshot()
 
     def _change_state(self, new_state: TaskState) -> None:
         with self.get_lock().write():
-            old_state = self._state
-            self._state = new_state
+            old_state = self._snapshot.state
 
             self.increment_gen_num_unlocked()
+            self._publish_snapshot_unlocked(state=new_state, gen_num=self.get_gen_num_unlocked())
+        self._save_snapshot()
+        self._publish_progress()
 
         Logger().log_info(f"Task {self._task_id} state changed: {old_state} -> {new_state}", LogLevel.MEDIUM_FREQ)
 
+    def _save_snapshot(self) -> None:
+        if self._is_restoring:
+            return
+
+        if ManagerComponents().get_state_store() is not None:
+            ManagerComponents().get_state_store().save_task(self._task_id, self._snapshot)
+
+    def _publish_progress(self) -> None:
+        snapshot = self._snapshot
+        if ManagerComponents().get_progress_broadcaster() is not None:
+            ManagerComponents().get_progress_broadcaster().on_task_state(self._task_id, snapshot.state,
+                                                                         snapshot.gen_num)
+
 
 class TestTaskMgr(MgrModel):
     # ------------------------------
     # Class fields
     # ------------------------------
 
+    MAX_PAGE_SIZE: int = 500
+
     _task_container: dict[int, TestTask]
+    _task_ids: list[int]
     _name_set: set[str]
 
     # ------------------------------
@@ -354,6 +440,7 @@ class TestTaskMgr(MgrModel):
     def __init__(self) -> None:
         super().__init__()
         self._task_container = dict[int, TestTask]()
+        self._task_ids = list[int]()
         self._name_set = set[str]()
 
         Logger().log_info("Test Task Manager correctly initialized", LogLevel.LOW_FREQ)
@@ -372,11 +459,39 @@ class TestTaskMgr(MgrModel):
         new_task = TestTask(module_name, name, description)
         self._name_set.add(name)
 
-        with new_task.get_lock().write():
-            self._task_container[new_task.get_task_id()] = new_task
+        with self.get_lock().write():
+            self._add_task_unlocked(new_task)
 
         return new_task.get_task_id()
 
+    def restore_tasks(self) -> None:
+        snapshots = ManagerComponents().get_state_store().load_tasks()
+
+        for snapshot in snapshots:
+            try:
+                task = TestTask(snapshot["module_name"], snapshot["task_name"], snapshot["task_description"],
+                                snapshot["task_id"])
+                self._name_set.add(snapshot["task_name"])
+
+                with self.get_lock().write():
+                    self._add_task_unlocked(task)
+
+                task.restore(snapshot)
+            except Exception as e:
+                Logger().save_error_to_journal(e)
+                Logger().log_error(f"Task {snapshot["task_id"]} not fully restored: {e}", LogLevel.LOW_FREQ)
+
+        if len(snapshots) != 0:
+            Logger().log_info(f"Restored tasks: {len(snapshots)}", LogLevel.LOW_FREQ)
+
+    # Unknown tasks are not running, their jobs are simply stale
+    def is_task_running(self, task_id: int, task_gen_num: int) -> bool:
+        with self.get_lock().read():
+            task = self._task_container.get(task_id)
+
+        return task is not None and task.get_task_state() == TaskState.SCHEDULED and \
+            task.get_gen_num() == task_gen_num
+
     def init_task(self, init_request: TaskInitRequest) -> [ConfigSpecElement | None, ConfigSpecElement | None]:
         task = self._validate_and_get_task(init_request.task_id)
         return task.try_to_init(init_request)
@@ -405,9 +520,16 @@ class TestTaskMgr(MgrModel):
         task = self._validate_and_get_task(task_id)
         return task.get_full_task_query()
 
+    # Unknown tasks have nothing to set up
+    def get_worker_setup(self, task_id: int) -> TaskSetupPayload | None:
+        with self.get_lock().read():
+            task = self._task_container.get(task_id)
+
+        return task.get_worker_setup() if task is not None else None
+
     def should_abort_jobs(self, task_id: int, task_gen_num: int) -> bool:
         task = self._validate_and_get_task(task_id)
-        return task.get_gen_num_locked() != task_gen_num
+        return task.get_gen_num() != task_gen_num
 
     # ------------------------------
     # API methods
@@ -461,15 +583,27 @@ class TestTaskMgr(MgrModel):
 
     def api_minimal_query_all_tasks(self) -> TaskMinimalQueryAllResponse:
         with self.get_lock().read():
-            queries = [TestTaskMinimalQuery(task_id=task_id,
-                                            name=task.get_task_name(),
-                                            description=task.get_task_description(),
-                                            module_name=task.get_module_name(),
-                                            task_state=task.get_task_state())
-                       for task_id, task in self._task_container.items()]
+            tasks = list(self._task_container.values())
+
+        queries = [task.get_minimal_query() for task in tasks]
 
         return TaskMinimalQueryAllResponse(queries=queries)
 
+    # Tasks are listed by id, the cursor is the last id of the previous page
+    def api_query_task_page(self, page_request: TaskPageRequest) -> TaskPageResponse:
+        try:
+            if not 0 < page_request.limit <= TestTaskMgr.MAX_PAGE_SIZE:
+                raise ValueError(f"Page limit must be in range [1, {TestTaskMgr.MAX_PAGE_SIZE}]")
+
+            queries, next_cursor = self._query_page(page_request.cursor, page_request.limit, page_request.states)
+            return TaskPageResponse(result="", queries=queries, next_cursor=next_cursor)
+        except Exception as e:
+
+            Logger().save_error_to_journal(e)
+            Logger().log_error(f"Error while querying task page: {e}", LogLevel.LOW_FREQ)
+
+            return TaskPageResponse(result=f"Error while querying task page: {e}", queries=[], next_cursor=None)
+
     def api_get_task_config_spec(self, op_request: TaskOperationRequest) -> TaskConfigSpecResponse:
         try:
             task = self._validate_and_get_task(op_request.task_id)
@@ -478,9 +612,8 @@ class TestTaskMgr(MgrModel):
                 return TaskConfigSpecResponse(worker_config_spec=None, manager_config_spec=None,
                                               result="Task not initiated")
 
-            with task.get_lock().read():
-                worker_config_spec = task.get_worker_config_spec_unguarded()
-                manager_config_spec = task.get_manager_config_spec_unguarded()
+            worker_config_spec = task.get_worker_config_spec_unguarded()
+            manager_config_spec = task.get_manager_config_spec_unguarded()
 
             return TaskConfigSpecResponse(worker_config_spec=worker_config_spec,
                                           manager_config_spec=manager_config_spec,
@@ -501,9 +634,8 @@ class TestTaskMgr(MgrModel):
                 return TaskConfigSpecResponse(worker_config_spec=None, manager_config_spec=None,
                                               result="Task not initiated")
 
-            with task.get_lock().read():
-                worker_build_spec = task.get_worker_build_spec_unguarded()
-                manager_build_spec = task.get_manager_build_spec_unguarded()
+            worker_build_spec = task.get_worker_build_spec_unguarded()
+            manager_build_spec = task.get_manager_build_spec_unguarded()
 
             return TaskConfigSpecResponse(worker_config_spec=worker_build_spec, manager_config_spec=manager_build_spec,
                                           result="")
@@ -547,6 +679,28 @@ class TestTaskMgr(MgrModel):
 
             return CommandResult(result=f"Error while performing action: {e}")
 
+    # Ids only grow, except for restored tasks which are added in id order before anything else
+    def _add_task_unlocked(self, task: TestTask) -> None:
+        self._task_container[task.get_task_id()] = task
+        bisect.insort(self._task_ids, task.get_task_id())
+
+    def _query_page(self, cursor: int, limit: int,
+                    states: list[TaskState] | None) -> tuple[list[TestTaskMinimalQuery], int | None]:
+        queries = []
+
+        # Minimal queries are cached and read lock free, so the page is built under the read lock without a copy
+        with self.get_lock().read():
+            for i in range(bisect.bisect_right(self._task_ids, cursor), len(self._task_ids)):
+                query = self._task_container[self._task_ids[i]].get_minimal_query()
+
+                if states is None or query.task_state in states:
+                    queries.append(query)
+
+                if len(queries) == limit:
+                    return queries, query.task_id if i + 1 < len(self._task_ids) else None
+
+        return queries, None
+
     def _validate_task_exists_unlocked(self, task_id: int) -> None:
         if task_id not in self._task_container:
             raise ValueError(f"Task {task_id} not found")
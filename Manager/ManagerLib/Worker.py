@@ -1,16 +1,41 @@
+import asyncio
 import secrets
 import time
+from dataclasses import dataclass
 from threading import Lock
 
 from fastapi import WebSocket
 
 from Manager.ManagerLib.ErrorTable import ErrorTable
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
 from Models.OrchestratorModels import WorkerState
-from Models.WorkerModels import WorkerModel, WorkerAuth
-from Utils.RWLock import ObjectModel
-
-
-class Worker(ObjectModel):
+from Models.WorkerModels import WorkerModel, WorkerAuth, JobProgress, SocketMsg, WorkerResources, SocketMsgType, \
+    TaskSetupPayload
+from Utils.RWLock import SnapshotObjectModel
+from Utils.WireCodec import WireCodec, JsonCodec
+
+
+@dataclass(frozen=True, slots=True)
+class WorkerSnapshot:
+    model: WorkerModel
+    session_token: int
+    state: WorkerState
+    activity_timestamp: float
+    conn_socket: WebSocket | None
+    job_progress: tuple[JobProgress, ...] = ()
+    resources: WorkerResources | None = None
+    codec: WireCodec = JsonCodec()
+    # Socket may only be used from the loop that accepted it
+    socket_loop: asyncio.AbstractEventLoop | None = None
+    # Games of jobs assigned to the worker and not yet finished, with the measured rate of finishing them
+    inflight_games: int = 0
+    games_per_s: float = 0
+    rate_timestamp: float = 0
+    rate_window_games: int = 0
+    idle_timestamp: float = 0
+
+
+class Worker(SnapshotObjectModel[WorkerSnapshot]):
     # ------------------------------
     # Class fields
     # ------------------------------
@@ -18,110 +43,236 @@ class Worker(ObjectModel):
     _counter_lock: Lock = Lock()
     _instance_count: int = 0
 
-    _model: WorkerModel
-    _activity_timestamp: float
-    _session_token: int
-    _is_marked_for_deletion: bool
+    # Games finishing together would give absurd rates, so samples cover at least a window
+    RATE_EWMA_ALPHA: float = 0.3
+    RATE_WINDOW_S: float = 1.0
 
-    _conn_socket: WebSocket | None
-    _state: WorkerState
+    _inflight_jobs: dict[int, int]
+    # Setups sent over the current connection, a reconnected worker may have been restarted in between
+    _task_setups: dict[int, TaskSetupPayload]
 
     # ------------------------------
     # Class creation
     # ------------------------------
 
     def __init__(self, model: WorkerModel):
-        super().__init__()
-
-        self._model = model
-        self._activity_timestamp = time.perf_counter()
-
         with Worker._counter_lock:
             counter = Worker._instance_count
 
         random_bits = secrets.randbits(32)
-        self._session_token = (counter << 32) + random_bits
+        session_token = (counter << 32) + random_bits
 
         with Worker._counter_lock:
             Worker._instance_count += 1
 
-        self._conn_socket = None
-        self._state = WorkerState.REGISTERED
+        self._inflight_jobs = dict[int, int]()
+        self._task_setups = dict[int, TaskSetupPayload]()
 
+        super().__init__(WorkerSnapshot(model=model,
+                                        session_token=session_token,
+                                        state=WorkerState.REGISTERED,
+                                        activity_timestamp=time.perf_counter(),
+                                        conn_socket=None))
 
     # ------------------------------
     # Class interaction
     # ------------------------------
 
-    def bump_activity(self) -> None:
+    def bump_activity(self, job_progress: list[JobProgress] | None = None,
+                      resources: WorkerResources | None = None) -> None:
+        changes = {"activity_timestamp": time.perf_counter()}
+        if job_progress is not None:
+            changes["job_progress"] = tuple(job_progress)
+        if resources is not None:
+            changes["resources"] = resources
+
         with self.get_lock().write():
-            self._activity_timestamp = time.perf_counter()
+            self._publish_snapshot_unlocked(**changes)
+
+    def get_job_progress(self) -> tuple[JobProgress, ...]:
+        return self._snapshot.job_progress
+
+    # None until the worker reports its first sample
+    def get_resources(self) -> WorkerResources | None:
+        return self._snapshot.resources
 
     def get_last_activity(self) -> float:
-        with self.get_lock().read():
-            return self._activity_timestamp
+        return self._snapshot.activity_timestamp
 
     def get_model(self) -> WorkerModel:
-        with self.get_lock().read():
-            return self._model
+        return self._snapshot.model
 
     def get_session_token(self) -> int:
-        with self.get_lock().read():
-            return self._session_token
+        return self._snapshot.session_token
 
     def is_marked_for_deletion(self) -> bool:
-        with self.get_lock().read():
-            return self._state == WorkerState.MARKED_FOR_DELETE
+        return self._snapshot.state == WorkerState.MARKED_FOR_DELETE
 
     def mark_for_deletion(self) -> None:
         with self.get_lock().write():
-            self._state = WorkerState.MARKED_FOR_DELETE
+            snapshot = self._snapshot
+            self._publish_snapshot_unlocked(state=WorkerState.MARKED_FOR_DELETE)
 
-            if self._conn_socket is not None:
-                self._conn_socket.close()
+        if snapshot.conn_socket is not None and snapshot.socket_loop is not None:
+            asyncio.run_coroutine_threadsafe(snapshot.conn_socket.close(), snapshot.socket_loop)
 
     def is_same(self, worker_name: str) -> bool:
-        with self.get_lock().read():
-            return self._model.name == worker_name and self._is_marked_for_deletion == False
+        snapshot = self._snapshot
+        return snapshot.model.name == worker_name and snapshot.state != WorkerState.MARKED_FOR_DELETE
 
     def is_same_auth(self, worker: WorkerAuth) -> bool:
-        with self.get_lock().read():
-            return self._model.name == worker.name and \
-                self._session_token == worker.session_token and \
-                self._is_marked_for_deletion == False
+        snapshot = self._snapshot
+        return snapshot.model.name == worker.name and \
+            snapshot.session_token == worker.session_token and \
+            snapshot.state != WorkerState.MARKED_FOR_DELETE
 
-    def set_conn_socket(self, socket: WebSocket) -> ErrorTable:
+    def set_conn_socket(self, socket: WebSocket, codec: WireCodec, loop: asyncio.AbstractEventLoop) -> ErrorTable:
         with self.get_lock().write():
-            if self._conn_socket is not None:
+            snapshot = self._snapshot
+
+            if snapshot.conn_socket is not None:
                 return ErrorTable.WORKER_ALREADY_CONNECTED
 
-            if self._is_marked_for_deletion:
+            if snapshot.state == WorkerState.MARKED_FOR_DELETE:
                 return ErrorTable.WORKER_MARKED_FOR_DELETE
 
-            if self._state != WorkerState.REGISTERED:
+            if snapshot.state != WorkerState.REGISTERED:
                 return ErrorTable.WORKER_WRONG_STATE
 
-            self._conn_socket = socket
-            self._state = WorkerState.CONNECTED
+            self._task_setups.clear()
+            self._publish_snapshot_unlocked(conn_socket=socket, codec=codec, socket_loop=loop,
+                                            state=WorkerState.CONNECTED)
             return ErrorTable.SUCCESS
 
     def unset_conn_socket(self) -> None:
         with self.get_lock().write():
-            self._conn_socket = None
+            # Worker stays registered and is allowed to reconnect
+            if self._snapshot.state == WorkerState.MARKED_FOR_DELETE:
+                self._publish_snapshot_unlocked(conn_socket=None, socket_loop=None)
+            else:
+                self._publish_snapshot_unlocked(conn_socket=None, socket_loop=None, state=WorkerState.REGISTERED)
 
     def get_conn_socket(self) -> WebSocket | None:
-        with self.get_lock().read():
-            return self._conn_socket
+        return self._snapshot.conn_socket
+
+    # Safe to call from any thread and any event loop
+    async def send_msg(self, msg: SocketMsg) -> None:
+        snapshot = self._snapshot
+
+        if snapshot.conn_socket is None or snapshot.socket_loop is None:
+            raise Exception("Worker is not connected!")
+
+        data = snapshot.codec.encode(msg)
+        send = snapshot.conn_socket.send_bytes(data) if isinstance(data, bytes) else snapshot.conn_socket.send_text(data)
+
+        if asyncio.get_running_loop() is snapshot.socket_loop:
+            await send
+        else:
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(send, snapshot.socket_loop))
+
+    # Fire and forget version for plain threads
+    def send_msg_threadsafe(self, msg: SocketMsg) -> None:
+        snapshot = self._snapshot
+
+        if snapshot.conn_socket is None or snapshot.socket_loop is None:
+            raise Exception("Worker is not connected!")
+
+        data = snapshot.codec.encode(msg)
+        send = snapshot.conn_socket.send_bytes(data) if isinstance(data, bytes) else snapshot.conn_socket.send_text(data)
+        asyncio.run_coroutine_threadsafe(send, snapshot.socket_loop)
 
     def get_state(self) -> WorkerState:
-        with self.get_lock().read():
-            return self._state
+        return self._snapshot.state
+
+    # Sends are queued on the socket loop in call order, so jobs sent after this never overtake the setup
+    def ensure_task_setup(self, setup: TaskSetupPayload) -> None:
+        with self.get_lock().write():
+            if self._task_setups.get(setup.task_id) == setup:
+                return
+
+            self.send_msg_threadsafe(SocketMsg(type=SocketMsgType.SETUP, payload=setup.model_dump()))
+            self._task_setups[setup.task_id] = setup
+
+    def get_cpus(self) -> int:
+        return max(1, self._snapshot.model.cpus)
+
+    # Cores busy with processes not started by the worker are not offered to jobs, so shared machines are never
+    # oversubscribed. At least one core is always offered, so a busy machine still makes progress.
+    def get_available_cpus(self) -> int:
+        snapshot = self._snapshot
+        cpus = max(1, snapshot.model.cpus)
+
+        if snapshot.resources is None:
+            return cpus
+
+        foreign_cpus = max(0.0, snapshot.resources.system_cpu_percent - snapshot.resources.cpu_percent) / 100
+        return max(1, min(cpus, round(snapshot.resources.host_cpus - foreign_cpus)))
+
+    def get_inflight_games(self) -> int:
+        return self._snapshot.inflight_games
+
+    # 0 until the first games are finished
+    def get_games_per_s(self) -> float:
+        return self._snapshot.games_per_s
+
+    def on_job_started(self, job_id: int, games: int) -> None:
+        with self.get_lock().write():
+            snapshot = self._snapshot
+            self._inflight_jobs[job_id] = games
+
+            # Time spent idle must not count as a slow game
+            if snapshot.inflight_games == 0:
+                now = time.perf_counter()
+                rate_timestamp = now if snapshot.idle_timestamp == 0 else \
+                    snapshot.rate_timestamp + now - snapshot.idle_timestamp
+                self._publish_snapshot_unlocked(inflight_games=games, rate_timestamp=rate_timestamp)
+            else:
+                self._publish_snapshot_unlocked(inflight_games=snapshot.inflight_games + games)
+
+    def on_games_finished(self, games: int) -> None:
+        if games == 0:
+            return
+
+        with self.get_lock().write():
+            snapshot = self._snapshot
+            now = time.perf_counter()
+            window_games = snapshot.rate_window_games + games
+
+            if now - snapshot.rate_timestamp < Worker.RATE_WINDOW_S:
+                self._publish_snapshot_unlocked(rate_window_games=window_games)
+                return
+
+            sample = window_games / (now - snapshot.rate_timestamp)
+            rate = sample if snapshot.games_per_s == 0 else \
+                Worker.RATE_EWMA_ALPHA * sample + (1 - Worker.RATE_EWMA_ALPHA) * snapshot.games_per_s
+
+            self._publish_snapshot_unlocked(games_per_s=rate, rate_timestamp=now, rate_window_games=0)
+
+    def on_job_completed(self, job_id: int) -> None:
+        self._release_job(job_id)
+
+    # Also used when a job is detached before being sent
+    def on_job_failed(self, job_id: int) -> None:
+        self._release_job(job_id)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _release_job(self, job_id: int) -> None:
+        with self.get_lock().write():
+            games = self._inflight_jobs.pop(job_id, None)
 
-    def on_job_started(self) -> None:
-        pass
+            if games is None:
+                return
 
-    def on_job_completed(self) -> None:
-        pass
+            inflight_games = self._snapshot.inflight_games - games
+            if inflight_games == 0:
+                self._publish_snapshot_unlocked(inflight_games=0, idle_timestamp=time.perf_counter())
+            else:
+                self._publish_snapshot_unlocked(inflight_games=inflight_games)
 
-    def on_job_failed(self) -> None:
-        pass
+        # Freed capacity may be refilled at once
+        assigner = ManagerComponents().get_job_assigner()
+        if assigner is not None:
+            assigner.wake()
@@ -1,19 +1,21 @@
+import asyncio
 import time
-from threading import Thread, Lock, Condition
+from typing import Callable, Awaitable
 
-from fastapi import WebSocket
-from pydantic import BaseModel
+from fastapi import WebSocket, WebSocketDisconnect
 
 from Manager.ManagerLib.ErrorTable import ErrorTable
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
 from Manager.ManagerLib.Worker import Worker
-from Models.GlobalModels import CommandResult
-from Models.WorkerModels import WorkerAuth
+from Manager.ManagerLib.WorkerRegistry import WorkerRegistry
+from Models.WorkerModels import WorkerAuth, SocketMsg, SocketMsgType, KeepAlivePayload, SocketAuthResult
+from Models.WorkerModels import JobResultPayload, JobAckPayload
 from Models.WorkerModels import WorkerModel
 from ProjectInfo.ProjectInfo import ProjectInfoInstance
-from Utils.Helpers import convert_ns_to_s, convert_s_to_ns
 from Utils.Logger import Logger, LogLevel
 from Utils.RWLock import MgrModel
 from Utils.SettingsLoader import SettingsLoader
+from Utils.WireCodec import WireCodec, negotiate_protocol, create_codec
 
 MIN_WORKER_VERSION = ProjectInfoInstance.get_version(ProjectInfoInstance.get_build_config("MIN_WORKER_VERSION"))
 
@@ -23,15 +25,8 @@ class WorkerMgr(MgrModel):
     # Class fields
     # ------------------------------
 
-    _workers: dict[str, Worker]
-
-    _workersAuditor: Thread
-    _shouldWork: bool
-
-    _workers_lock: Lock
-    _workers_queue_lock: Lock
-    _workers_queue: list[Worker]
-    _move_cv: Condition
+    _workers: WorkerRegistry
+    _socket_msg_handlers: dict[SocketMsgType, Callable[[Worker, SocketMsg], Awaitable[None]]]
 
     # ------------------------------
     # Class creation
@@ -39,22 +34,17 @@ class WorkerMgr(MgrModel):
 
     def __init__(self):
         super().__init__()
-        self._shouldWork = True
-        self._workers = dict[str, Worker]()
-
-        self._workers_lock = Lock()
-        self._workers_queue_lock = Lock()
-        self._move_cv = Condition()
-        self._workers_queue = list[Worker]()
-
-        self._workersAuditor = Thread(target=self._worker_audit_thread)
-        self._workersAuditor.start()
+        self._workers = WorkerRegistry()
+        self._socket_msg_handlers = {
+            SocketMsgType.KA: self._on_ka_msg,
+            SocketMsgType.RESULT: self._on_result_msg,
+        }
 
         Logger().log_info("WorkerMgr created", LogLevel.LOW_FREQ)
 
     def destroy(self) -> None:
-        self._shouldWork = False
-        self._workersAuditor.join()
+        for worker in self._workers.get_all():
+            ManagerComponents().get_deadline_scheduler().cancel(WorkerMgr._get_deadline_key(worker))
 
         Logger().log_info("WorkerMgr destroyed", LogLevel.LOW_FREQ)
 
@@ -63,33 +53,30 @@ class WorkerMgr(MgrModel):
     # ------------------------------
 
     def register(self, worker: WorkerModel) -> [ErrorTable, int]:
-        with self._workers_queue_lock:
-            for queue_worker in self._workers_queue:
-                if queue_worker.is_same(worker.name):
-                    Logger().log_info(f"Not able to register worker with name: {worker.name}: Already registered",
-                                      LogLevel.LOW_FREQ)
-                    return [ErrorTable.WORKER_ALREADY_REGISTERED, 0]
+        new_worker = Worker(worker)
+
+        if not self._workers.try_add(new_worker):
+            Logger().log_info(f"Not able to register worker with name: {worker.name}: Already registered",
+                              LogLevel.LOW_FREQ)
+            return [ErrorTable.WORKER_ALREADY_REGISTERED, 0]
 
-            with self._workers_lock:
-                if worker.name in self._workers.keys() and not self._workers[worker.name].is_marked_for_deletion():
-                    Logger().log_info(f"Not able to register worker with name: {worker.name}: Already registered",
-                                      LogLevel.LOW_FREQ)
-                    return [ErrorTable.WORKER_ALREADY_REGISTERED, 0]
+        self._schedule_liveness_check(new_worker, time.perf_counter())
 
-            token = self._register_worker_unlocked(worker)
+        token = new_worker.get_session_token()
+        Logger().log_info(f"Registered worker with name: {worker.name} and session token: {token}",
+                          LogLevel.MEDIUM_FREQ)
 
         return [ErrorTable.SUCCESS, token]
 
     def unregister(self, unregister_request: WorkerAuth) -> ErrorTable:
-        with self._workers_queue_lock:
-            for queue_worker in self._workers_queue:
-                if queue_worker.is_same(unregister_request.name):
-                    return WorkerMgr.unregister_unlocked(queue_worker, unregister_request)
+        worker = self._workers.get_by_name(unregister_request.name)
 
-            with self._workers_lock:
-                if unregister_request.name in self._workers.keys() and \
-                        self._workers[unregister_request.name].is_same(unregister_request.name):
-                    return WorkerMgr.unregister_unlocked(self._workers[unregister_request.name], unregister_request)
+        if worker is not None and not worker.is_marked_for_deletion():
+            result = WorkerMgr.unregister_unlocked(worker, unregister_request)
+
+            if result == ErrorTable.SUCCESS:
+                self._remove_worker(worker, "Worker unregistered")
+            return result
 
         Logger().log_info(f"Worker with name: {unregister_request.name} not able to be unregister"
                           f" because was not found", LogLevel.LOW_FREQ)
@@ -104,43 +91,55 @@ class WorkerMgr(MgrModel):
         return ErrorTable.INVALID_TOKEN
 
     async def worker_socket_accept(self, websocket: WebSocket) -> None:
-        self._wait_for_registration_move()
-
-        auth = await websocket.receive_json()
+        auth = await websocket.receive_text()
         worker_auth = WorkerAuth.model_validate_json(auth)
 
-        with self._workers_lock:
-            if worker_auth.name not in self._workers.keys():
-                await websocket.send_json(CommandResult(result=ErrorTable.WORKER_NOT_FOUND.name).model_dump_json())
-                raise Exception("Worker not found")
+        worker = self._workers.get_by_name(worker_auth.name)
 
-            worker = self._workers[worker_auth.name]
+        if worker is None or worker.is_marked_for_deletion():
+            await websocket.send_text(SocketAuthResult(result=ErrorTable.WORKER_NOT_FOUND.name).model_dump_json())
+            raise Exception("Worker not found")
 
-            if worker.get_session_token() != worker_auth.session_token:
-                await websocket.send_json(CommandResult(result=ErrorTable.INVALID_TOKEN.name).model_dump_json())
-                raise Exception("Session token not match")
+        if worker.get_session_token() != worker_auth.session_token:
+            await websocket.send_text(SocketAuthResult(result=ErrorTable.INVALID_TOKEN.name).model_dump_json())
+            raise Exception("Session token not match")
 
         Logger().log_info(f"Correctly authenticated worker: {worker.get_model().name}", LogLevel.MEDIUM_FREQ)
 
-        status = worker.set_conn_socket(websocket)
-        await websocket.send_json(CommandResult(result=status.name).model_dump_json())
+        # Auth exchange itself is always JSON, the negotiated protocol applies to the frames after it
+        protocol = negotiate_protocol(worker_auth.protocols)
+        status = worker.set_conn_socket(websocket, create_codec(protocol), asyncio.get_running_loop())
+        await websocket.send_text(SocketAuthResult(result=status.name, protocol=protocol).model_dump_json())
 
         if status != ErrorTable.SUCCESS:
             raise Exception(f"Failed to bond worker: {worker.get_model().name} with socket: {status.name}")
 
-        Logger().log_info(f"Worker: {worker.get_model().name} correctly bonded with loop socket", LogLevel.MEDIUM_FREQ)
+        Logger().log_info(f"Worker: {worker.get_model().name} correctly bonded with loop socket"
+                          f" using protocol: {protocol}", LogLevel.MEDIUM_FREQ)
 
+        ManagerComponents().get_job_assigner().wake()
+
+        try:
+            await self._worker_socket_loop(worker, websocket)
+        finally:
+            worker.unset_conn_socket()
+            ManagerComponents().get_job_assigner().wake()
+
+    def get_workers(self) -> list[Worker]:
+        return self._workers.get_all()
 
     def bump_ka(self, worker_auth: WorkerAuth) -> ErrorTable:
-        with self._workers_queue_lock:
-            for queue_worker in self._workers_queue:
-                if queue_worker.is_same(worker_auth.name):
-                    return self._bump_ka_internal(queue_worker, worker_auth)
+        # Hot path: a single token lookup, the name only has to match
+        worker = self._workers.get_by_token(worker_auth.session_token)
+
+        if worker is not None and worker.is_same_auth(worker_auth):
+            worker.bump_activity()
+            Logger().log_info(f"KA for {worker_auth.name} correctly bumped", LogLevel.HIGH_FREQ)
+            return ErrorTable.SUCCESS
 
-            with self._workers_lock:
-                if worker_auth.name in self._workers.keys() and \
-                        not self._workers[worker_auth.name].is_marked_for_deletion():
-                    return self._bump_ka_internal(self._workers[worker_auth.name], worker_auth)
+        if worker is None and self._workers.get_by_name(worker_auth.name) is not None:
+            Logger().log_info(f"KA for {worker_auth.name} not bumped due to: Invalid token", LogLevel.LOW_FREQ)
+            return ErrorTable.INVALID_TOKEN
 
         Logger().log_info(f"KA for {worker_auth.name} not bumped due to: Worker not found", LogLevel.LOW_FREQ)
         return ErrorTable.WORKER_NOT_FOUND
@@ -150,115 +149,120 @@ class WorkerMgr(MgrModel):
     # ------------------------------
 
     @staticmethod
-    async def _worker_loop_send_msg(worker: Worker, websocket: WebSocket, msg: BaseModel) -> None:
-        msg_str = msg.model_dump_json()
-
-        Logger().log_info(f"Sending msg: {msg_str} to worker: {worker.get_model().name}", LogLevel.HIGH_FREQ)
-
-        try:
-            await websocket.send_json(msg_str)
-        except Exception as e:
-            if worker.is_marked_for_deletion():
-                raise Exception("Worker is marked for deletion. Aborting worker loop...")
-            else:
-                raise e
-
-        Logger().log_info(f"Msg: {msg_str} sent to worker with name: {worker.get_model().name}", LogLevel.HIGH_FREQ)
-
-    @staticmethod
-    async def _worker_loop_rcv_msg(worker: Worker, websocket: WebSocket) -> str:
+    async def _worker_loop_rcv_msg(worker: Worker, websocket: WebSocket) -> SocketMsg:
         Logger().log_info(f"Receiving msg for worker: {worker.get_model().name}", LogLevel.HIGH_FREQ)
 
         try:
-            msg = await websocket.receive_json()
+            frame = await websocket.receive()
         except Exception as e:
             if worker.is_marked_for_deletion():
                 raise Exception("Worker is being deleted. Aborting...")
             else:
                 raise e
 
-        Logger().log_info(f"Received msg: {msg} for worker: {worker.get_model().name}", LogLevel.HIGH_FREQ)
+        if frame["type"] == "websocket.disconnect":
+            raise WebSocketDisconnect(frame.get("code", 1000))
+
+        msg = WireCodec.decode(frame["text"] if frame.get("text") is not None else frame["bytes"])
+        Logger().log_info(f"Received msg: {msg.type.name} for worker: {worker.get_model().name}", LogLevel.HIGH_FREQ)
 
         return msg
 
+    async def _worker_socket_loop(self, worker: Worker, websocket: WebSocket) -> None:
+        while True:
+            try:
+                msg = await WorkerMgr._worker_loop_rcv_msg(worker, websocket)
+            except WebSocketDisconnect:
+                Logger().log_info(f"Worker: {worker.get_model().name} closed loop socket", LogLevel.MEDIUM_FREQ)
+                return
+
+            # Any frame proves that the worker is alive, KA frames exist only to keep idle sockets busy
+            handler = self._socket_msg_handlers.get(msg.type)
+            if handler is None:
+                worker.bump_activity()
+                Logger().log_warning(f"Unhandled socket msg type: {msg.type.name} from worker: "
+                                     f"{worker.get_model().name}", LogLevel.MEDIUM_FREQ)
+                continue
+
+            # A single bad message must not cost the worker its connection
+            try:
+                await handler(worker, msg)
+            except Exception as e:
+                Logger().save_error_to_journal(e)
+                Logger().log_error(f"Error while handling socket msg: {msg.type.name} from worker: "
+                                   f"{worker.get_model().name}: {e}", LogLevel.MEDIUM_FREQ)
+
     @staticmethod
-    def _bump_ka_internal(worker: Worker, worker_auth: WorkerAuth) -> ErrorTable:
-        if worker.get_session_token() != worker_auth.session_token:
-            Logger().log_info(f"KA for {worker_auth.name} not bumped due to: Invalid token", LogLevel.LOW_FREQ)
-            return ErrorTable.INVALID_TOKEN
+    async def _on_ka_msg(worker: Worker, msg: SocketMsg) -> None:
+        payload = KeepAlivePayload.model_validate(msg.payload)
+        worker.bump_activity(payload.progress, payload.resources)
 
+    # Every chunk is acknowledged, even unknown or already merged ones, so the worker can always drop it
+    @staticmethod
+    async def _on_result_msg(worker: Worker, msg: SocketMsg) -> None:
         worker.bump_activity()
-        Logger().log_info(f"KA for {worker_auth.name} correctly bumped", LogLevel.LOW_FREQ)
-
-    def _register_worker_unlocked(self, worker_model: WorkerModel) -> int:
-        worker = Worker(worker_model)
-        token = worker.get_session_token()
-        self._workers_queue.append(worker)
-
-        Logger().log_info(f"Registered worker with name: {worker_model.name} and session token: {token}",
-                          LogLevel.MEDIUM_FREQ)
-
-        return token
+        payload = JobResultPayload.model_validate(msg.payload)
 
-    def _audit_workers(self) -> None:
-        Logger().log_info("Audit started", LogLevel.HIGH_FREQ)
-        to_kick_workers_list = []
+        # Job threads hold job locks while waiting on this loop to send, so merging must not block the loop
+        await asyncio.to_thread(WorkerMgr._merge_result_chunks, worker, payload)
 
-        for [name, worker] in self._workers:
-            time_now = time.perf_counter()
-            inactivity = time_now - worker.activity_timestamp
+        await worker.send_msg(SocketMsg(type=SocketMsgType.ACK, payload=JobAckPayload(
+            job_ids=[chunk.job_id for chunk in payload.chunks],
+            seqs=[chunk.seq for chunk in payload.chunks]).model_dump()))
 
-            if inactivity > SettingsLoader().get_settings().worker_timeout:
-                Logger().log_info(f"Worker: {name} timeout, inactivity: {inactivity}s", LogLevel.MEDIUM_FREQ)
-                worker.mark_for_deletion()
-                to_kick_workers_list.append(name)
-            elif worker.is_marked_for_deletion():
-                Logger().log_info(f"Worker: {name} marked for deletion is being removed", LogLevel.MEDIUM_FREQ)
-                to_kick_workers_list.append(name)
-
-        with self._workers_lock:
-            for inactive_worker in to_kick_workers_list:
-                del self._workers[inactive_worker]
-
-        Logger().log_info("Audit finished", LogLevel.HIGH_FREQ)
+    @staticmethod
+    def _merge_result_chunks(worker: Worker, payload: JobResultPayload) -> None:
+        job_mgr = ManagerComponents().get_test_job_mgr()
 
-    def _move_workers(self) -> None:
-        Logger().log_info("Registrations hardening started", LogLevel.HIGH_FREQ)
-        with self._workers_queue_lock:
-            while len(self._workers_queue) != 0:
-                worker = self._workers_queue.pop()
+        completed = []
+        failed = []
+        for chunk in payload.chunks:
+            job = job_mgr.get_job(chunk.job_id)
 
-                if worker.is_marked_for_deletion():
-                    continue
+            if job is None:
+                Logger().log_info(f"Dropping result chunk: {chunk.seq} of unknown job: {chunk.job_id}",
+                                  LogLevel.MEDIUM_FREQ)
+            elif chunk.error != "" and chunk.done:
+                if job.is_inflight_on(worker):
+                    failed.append((job, chunk.error))
+            elif job.merge_result_chunk(worker, chunk):
+                completed.append(job)
 
-                with self._workers_lock:
-                    self._workers[worker.get_model().name] = worker
-                Logger().log_info(f"Worker: {worker.get_model().name} moved from queue to db", LogLevel.HIGH_FREQ)
+        job_mgr.finish_inflight_jobs(completed, failed)
 
-        with self._move_cv:
-            self._move_cv.notify_all()
+    @staticmethod
+    def _get_deadline_key(worker: Worker) -> tuple[str, int]:
+        return "worker", worker.get_session_token()
 
-        Logger().log_info("Registrations hardening finished", LogLevel.HIGH_FREQ)
+    def _schedule_liveness_check(self, worker: Worker, last_activity: float) -> None:
+        ManagerComponents().get_deadline_scheduler().schedule(
+            WorkerMgr._get_deadline_key(worker),
+            last_activity + SettingsLoader().get_settings().worker_timeout,
+            lambda: self._check_worker_liveness(worker))
 
-    def _worker_audit_thread(self) -> None:
-        BASE_SLEEP_TIME_NS = convert_s_to_ns(0.1)
-        execution_time = 0
+    def _remove_worker(self, worker: Worker, reason: str) -> None:
+        ManagerComponents().get_deadline_scheduler().cancel(WorkerMgr._get_deadline_key(worker))
+        self._workers.remove(worker)
 
-        while self._shouldWork:
-            sleep_time = convert_ns_to_s(max(0, BASE_SLEEP_TIME_NS - execution_time))
-            execution_time = max(0, execution_time - BASE_SLEEP_TIME_NS)
+        ManagerComponents().get_test_job_mgr().requeue_worker_jobs(worker, reason)
+        ManagerComponents().get_job_assigner().wake()
 
-            time.sleep(sleep_time)
+    # KAs only store a timestamp, the deadline is moved lazily when it expires
+    def _check_worker_liveness(self, worker: Worker) -> None:
+        name = worker.get_model().name
 
-            Logger().log_info("Audit thread woke up", LogLevel.HIGH_FREQ)
+        if worker.is_marked_for_deletion():
+            Logger().log_info(f"Worker: {name} marked for deletion is being removed", LogLevel.MEDIUM_FREQ)
+            self._remove_worker(worker, "Worker deleted")
+            return
 
-            time_before = time.perf_counter_ns()
-            self._move_workers()
-            self._audit_workers()
-            time_after = time.perf_counter_ns()
+        last_activity = worker.get_last_activity()
+        inactivity = time.perf_counter() - last_activity
 
-            execution_time += time_after - time_before
+        if inactivity > SettingsLoader().get_settings().worker_timeout:
+            Logger().log_info(f"Worker: {name} timeout, inactivity: {inactivity}s", LogLevel.MEDIUM_FREQ)
+            worker.mark_for_deletion()
+            self._remove_worker(worker, "Worker timed out")
+            return
 
-    def _wait_for_registration_move(self) -> None:
-        with self._move_cv:
-            self._move_cv.wait()
+        self._schedule_liveness_check(worker, last_activity)
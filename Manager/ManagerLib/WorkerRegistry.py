@@ -0,0 +1,113 @@
+from threading import Lock
+
+from Manager.ManagerLib.Worker import Worker
+
+
+class WorkerRegistry:
+    # ------------------------------
+    # Internal objects
+    # ------------------------------
+
+    class Shard:
+        lock: Lock
+        by_name: dict[str, Worker]
+        by_token: dict[int, Worker]
+
+        def __init__(self):
+            self.lock = Lock()
+            self.by_name = dict[str, Worker]()
+            self.by_token = dict[int, Worker]()
+
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    SHARD_COUNT: int = 16
+
+    _shards: list[Shard]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        self._shards = [WorkerRegistry.Shard() for _ in range(WorkerRegistry.SHARD_COUNT)]
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Returns False when an alive worker with the same name is already present
+    def try_add(self, worker: Worker) -> bool:
+        name = worker.get_model().name
+        name_shard = self._get_name_shard(name)
+
+        with name_shard.lock:
+            old_worker = name_shard.by_name.get(name)
+
+            if old_worker is not None and not old_worker.is_marked_for_deletion():
+                return False
+
+            name_shard.by_name[name] = worker
+
+        if old_worker is not None:
+            self._remove_token(old_worker)
+
+        token_shard = self._get_token_shard(worker.get_session_token())
+        with token_shard.lock:
+            token_shard.by_token[worker.get_session_token()] = worker
+
+        return True
+
+    def remove(self, worker: Worker) -> None:
+        name = worker.get_model().name
+        name_shard = self._get_name_shard(name)
+
+        with name_shard.lock:
+            # Name may be already taken by a newer registration
+            if name_shard.by_name.get(name) is worker:
+                del name_shard.by_name[name]
+
+        self._remove_token(worker)
+
+    def get_by_name(self, name: str) -> Worker | None:
+        name_shard = self._get_name_shard(name)
+
+        with name_shard.lock:
+            return name_shard.by_name.get(name)
+
+    def get_by_token(self, session_token: int) -> Worker | None:
+        token_shard = self._get_token_shard(session_token)
+
+        with token_shard.lock:
+            return token_shard.by_token.get(session_token)
+
+    def get_all(self) -> list[Worker]:
+        workers = []
+
+        for shard in self._shards:
+            with shard.lock:
+                workers.extend(shard.by_name.values())
+
+        return workers
+
+    def __len__(self) -> int:
+        return sum(len(shard.by_name) for shard in self._shards)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _remove_token(self, worker: Worker) -> None:
+        token_shard = self._get_token_shard(worker.get_session_token())
+
+        with token_shard.lock:
+            if token_shard.by_token.get(worker.get_session_token()) is worker:
+                del token_shard.by_token[worker.get_session_token()]
+
+    def _get_name_shard(self, name: str) -> Shard:
+        return self._shards[hash(name) % WorkerRegistry.SHARD_COUNT]
+
+    def _get_token_shard(self, session_token: int) -> Shard:
+        # Low bits of the token are random
+        return self._shards[session_token % WorkerRegistry.SHARD_COUNT]
@@ -1,9 +1,15 @@
 from contextlib import asynccontextmanager
 
+from Utils.StartupProfiler import start_startup_profiler
+
+# Manager is started by the fastapi runner, so profiling is enabled with the environment variable only.
+# Started before the api is imported, so its import cost is measured too.
+start_startup_profiler()
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from Manager.Api import Orchestrator, Worker
+from Manager.Api import Orchestrator, Worker, Metrics
 from Manager.ManagerLib.StartupProcedures import startup, cleanup
 
 
@@ -21,6 +27,7 @@ async def lifespan(app: FastAPI):
 Manager = FastAPI(lifespan=lifespan)
 Manager.include_router(Orchestrator.router)
 Manager.include_router(Worker.router)
+Manager.include_router(Metrics.router)
 
 Manager.add_middleware(
     CORSMiddleware,
@@ -1,6 +1,8 @@
 from enum import Enum, IntEnum
 from typing import List, Dict
 
+from pydantic import ConfigDict
+
 from Models.GlobalModels import *
 
 class UiType(Enum):
@@ -35,15 +37,19 @@ class JobState(IntEnum):
     COMPLETED = 3
     FAILED = 4
     HARDENED = 5
+    CANCELLED = 6
 
 WORKABLE_STATES = [JobState.PREPARED, JobState.COMPLETED]
 QUEUEABLE_STATES = [JobState.PREPARED, JobState.INFLIGHT, JobState.COMPLETED, JobState.FAILED]
 
+# Frozen, so spec elements can be cached and shared between requests
 class ConfigSpecElement(BaseModel):
     # ------------------------------
     # Class fields
     # ------------------------------
 
+    model_config = ConfigDict(frozen=True)
+
     name: str
     ui_type: str
     description: str
@@ -92,6 +98,17 @@ class TestTaskMinimalQuery(BaseModel):
 class TaskMinimalQueryAllResponse(BaseModel):
     queries: List[TestTaskMinimalQuery]
 
+# Cursor is the last task id of the previous page, -1 starts from the beginning
+class TaskPageRequest(BaseModel):
+    cursor: int = -1
+    limit: int = 50
+    states: List[TaskState] | None = None
+
+class TaskPageResponse(BaseModel):
+    result: str
+    queries: List[TestTaskMinimalQuery]
+    next_cursor: int | None
+
 class TaskConfigSpecResponse(BaseModel):
     result: str
     worker_config_spec: List[ConfigSpecElement]
@@ -112,3 +129,59 @@ class ModuleQueryResponse(BaseModel):
 
 class SubModuleQueryResponse(BaseModel):
     submodules: Dict[str, List[str]]
+
+
+class ResultStatsRequest(BaseModel):
+    task_id: int | None = None
+    gen_num: int | None = None
+    group_by: str = "params"
+    opponent: str | None = None
+
+# Errors are half widths of 95% confidence intervals, undefined values are serialized as null
+class StrengthEstimate(BaseModel):
+    key: int | str
+    wins: int
+    draws: int
+    losses: int
+    score: float | None
+    elo: float | None
+    elo_error: float | None
+    nelo: float | None
+    nelo_error: float | None
+    los: float | None
+    pentanomial: List[int]
+    pentanomial_elo: float | None
+    pentanomial_elo_error: float | None
+    mean_duration_s: float | None
+
+class ResultStatsResponse(BaseModel):
+    result: str
+    stats: List[StrengthEstimate]
+
+class RatingsRequest(BaseModel):
+    task_id: int | None = None
+    gen_num: int | None = None
+
+class PlayerRating(BaseModel):
+    name: str
+    is_opponent: bool
+    games: int
+    elo: float | None
+    elo_error: float | None
+
+class RatingsResponse(BaseModel):
+    result: str
+    ratings: List[PlayerRating]
+
+class TaskProgress(BaseModel):
+    task_id: int
+    state: TaskState
+    gen_num: int
+    games_played: int = 0
+    games_per_s: float = 0.0
+    best_params: str | None = None
+    best_score: float | None = None
+
+class ProgressEvent(BaseModel):
+    version: int
+    tasks: List[TaskProgress]
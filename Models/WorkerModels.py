@@ -1,3 +1,6 @@
+from enum import IntEnum
+from typing import Any
+
 from pydantic import BaseModel
 
 from Models.GlobalModels import CommandResult
@@ -17,4 +20,87 @@ class WorkerRegistration(BaseModel):
 
 class WorkerAuth(BaseModel):
     name: str
-    session_token: str
+    session_token: int
+    protocols: list[str] = []
+
+
+class SocketAuthResult(BaseModel):
+    result: str
+    protocol: str = "json"
+
+
+class SocketMsgType(IntEnum):
+    KA = 0
+    JOB = 1
+    RESULT = 2
+    ACK = 3
+    CANCEL = 4
+    SETUP = 5
+
+
+class SocketMsg(BaseModel):
+    type: SocketMsgType
+    payload: dict[str, Any] = {}
+
+
+class JobProgress(BaseModel):
+    job_id: int
+    games_done: int
+    games_total: int
+
+
+# Averages over the last KA interval of the worker process with its engines, cpu usage is in percent of a single core
+class WorkerResources(BaseModel):
+    cpu_percent: float
+    rss_mb: float
+    engine_processes: int
+    system_cpu_percent: float
+    system_available_mb: float
+    load_avg: float
+    host_cpus: int
+
+
+class KeepAlivePayload(BaseModel):
+    progress: list[JobProgress] = []
+    resources: WorkerResources | None = None
+
+
+# Everything the worker needs to build and configure the test module of a task on its own
+class TaskSetupPayload(BaseModel):
+    task_id: int
+    module_name: str
+    worker_init: dict[str, list[str]]
+    worker_build_config: dict[str, Any]
+    worker_config: dict[str, Any]
+
+
+class JobRequestPayload(BaseModel):
+    job_id: int
+    task_id: int
+    arg_str: str
+    seeds: list[int]
+
+
+# Results of games finished since the previous chunk of the same job, seeds and results are parallel lists
+class JobResultChunk(BaseModel):
+    job_id: int
+    seq: int
+    seeds: list[int] = []
+    results: list[str] = []
+    # Wall time of each game in seconds, parallel to seeds
+    durations: list[float] = []
+    error: str = ""
+    done: bool = False
+
+
+class JobResultPayload(BaseModel):
+    chunks: list[JobResultChunk]
+
+
+class JobAckPayload(BaseModel):
+    job_ids: list[int]
+    seqs: list[int]
+
+
+class JobCancelPayload(BaseModel):
+    job_ids: list[int]
@@ -1,5 +1,5 @@
 from Models.OrchestratorModels import ConfigSpecElement, UiType
-from Modules.ManagerTestModule.BaseManagerTestModule import BaseManagerTestModule, append_test_module_builder
+from Modules.ManagerTestModule.BaseManagerTestModule import BaseManagerTestModule
 from Modules.ModuleBuilder import ModuleBuilder
 from Modules.ModuleHelpers import build_submodule_spec_element
 from Modules.SubModuleMgr import SubModuleMgr
@@ -83,6 +83,3 @@ class BaseManagerChessModuleBuilder(ModuleBuilder):
         return BaseManagerChessModule(
             **self._build_submodules(json_config, name_prefix)
         )
-
-
-append_test_module_builder("BaseChessModule", lambda: BaseManagerChessModuleBuilder())
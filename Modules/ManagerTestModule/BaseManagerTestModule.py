@@ -1,7 +1,6 @@
 from abc import abstractmethod, ABC
 
 from Modules.Module import Module
-from Modules.ModuleBuilder import ModuleBuilderFactory
 
 
 class BaseManagerTestModule(Module, ABC):
@@ -29,11 +28,3 @@ class BaseManagerTestModule(Module, ABC):
     @abstractmethod
     async def sync_test_results(self, response: str) -> None:
         pass
-
-
-ManagerTestModuleBuilders: dict[str, ModuleBuilderFactory] = {}
-
-
-def append_test_module_builder(module: str, builder: ModuleBuilderFactory) -> None:
-    if module not in ManagerTestModuleBuilders:
-        ManagerTestModuleBuilders[module] = builder
@@ -1,4 +1 @@
 __all__ = ['BaseManagerTestModule', 'BaseManagerChessModule']
-
-from . import BaseManagerTestModule
-from . import BaseManagerChessModule
\ No newline at end of file
@@ -1,5 +1,8 @@
+import json
 from abc import abstractmethod, ABC
+from collections import OrderedDict
 from collections.abc import Callable
+from threading import Lock
 
 from Models.OrchestratorModels import ConfigSpecElement, UiType
 from Modules.ModuleHelpers import extract_submodule_type, validate_submodule_spec_args, \
@@ -14,6 +17,13 @@ class ModuleBuilder(ABC):
     # Class fields
     # ------------------------------
 
+    # Specs depend only on the builder class, the init config and the prefix, so they are shared by all tasks.
+    # Elements are frozen and only copies of the cached lists are handed out.
+    SPEC_CACHE_SIZE: int = 256
+
+    _spec_cache: OrderedDict[tuple, tuple[ConfigSpecElement, ...] | ConfigSpecElement | None] = OrderedDict()
+    _spec_cache_lock: Lock = Lock()
+
     # Names should be simple manner: {submodule_type}.{variable_name}
     _submodules: list[ConfigSpecElement]
     _submodule_name: str
@@ -32,16 +42,66 @@ class ModuleBuilder(ABC):
 
     def get_next_submodule_needed(self, json_config: dict[str, list[str]], name_prefix: str = ""
                                   ) -> ConfigSpecElement | None:
-        return self._iter_submodules(
+        return self._get_cached_spec("init", json_config, name_prefix, lambda: self._iter_submodules(
             json_config,
             name_prefix,
             lambda prefix, builder, _: builder.get_next_submodule_needed(json_config, prefix),
             ModuleBuilder._prepare_init_spec
-        )
+        ))
 
+    def get_build_spec(self, json_config: dict[str, list[str]], name_prefix: str = "") -> list[ConfigSpecElement]:
+        return list(self._get_cached_spec("build", json_config, name_prefix,
+                                          lambda: tuple(self._collect_build_spec(json_config, name_prefix))))
 
+    def get_config_spec(self, json_config: dict[str, list[str]], name_prefix: str = "") -> list[ConfigSpecElement]:
+        return list(self._get_cached_spec("config", json_config, name_prefix,
+                                          lambda: tuple(self._collect_config_spec(json_config, name_prefix))))
 
-    def get_build_spec(self, json_config: dict[str, list[str]], name_prefix: str = "") -> list[ConfigSpecElement]:
+    @staticmethod
+    def clear_spec_cache() -> None:
+        with ModuleBuilder._spec_cache_lock:
+            ModuleBuilder._spec_cache.clear()
+
+    # ------------------------------
+    # Abstract methods
+    # ------------------------------
+
+    @abstractmethod
+    def build(self, json_config: dict[str, list[str]], name_prefix: str = "") -> any:
+        pass
+
+    @abstractmethod
+    def _get_config_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
+        pass
+
+    @abstractmethod
+    def _get_build_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
+        pass
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    # Invalid configs raise on every call, only successful walks are cached
+    def _get_cached_spec(self, kind: str, json_config: dict[str, list[str]], name_prefix: str,
+                         compute: Callable[[], any]) -> any:
+        key = (type(self), self._submodule_name, kind, name_prefix, json.dumps(json_config, sort_keys=True))
+
+        with ModuleBuilder._spec_cache_lock:
+            if key in ModuleBuilder._spec_cache:
+                ModuleBuilder._spec_cache.move_to_end(key)
+                return ModuleBuilder._spec_cache[key]
+
+        spec = compute()
+
+        with ModuleBuilder._spec_cache_lock:
+            ModuleBuilder._spec_cache[key] = spec
+            if len(ModuleBuilder._spec_cache) > ModuleBuilder.SPEC_CACHE_SIZE:
+                ModuleBuilder._spec_cache.popitem(last=False)
+
+        return spec
+
+    def _collect_build_spec(self, json_config: dict[str, list[str]], name_prefix: str) -> list[ConfigSpecElement]:
         full_spec: list[ConfigSpecElement] = []
 
         full_spec.extend(self._get_build_spec_internal(name_prefix))
@@ -54,7 +114,7 @@ class ModuleBuilder(ABC):
 
         return full_spec
 
-    def get_config_spec(self, json_config: dict[str, list[str]], name_prefix: str = "") -> list[ConfigSpecElement]:
+    def _collect_config_spec(self, json_config: dict[str, list[str]], name_prefix: str) -> list[ConfigSpecElement]:
         full_spec: list[ConfigSpecElement] = []
 
         full_spec.extend(self._get_config_spec_internal(name_prefix))
@@ -67,26 +127,6 @@ class ModuleBuilder(ABC):
 
         return full_spec
 
-    # ------------------------------
-    # Abstract methods
-    # ------------------------------
-
-    @abstractmethod
-    def build(self, json_config: dict[str, list[str]], name_prefix: str = "") -> any:
-        pass
-
-    @abstractmethod
-    def _get_config_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
-        pass
-
-    @abstractmethod
-    def _get_build_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
-        pass
-
-    # ------------------------------
-    # Private methods
-    # ------------------------------
-
     def _iter_submodules(self,
                          json_config: dict[str, list[str]],
                          name_prefix: str,
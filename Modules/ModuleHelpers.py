@@ -41,8 +41,10 @@ def build_config_spec_element(
         is_optional: bool
 ) -> ConfigSpecElement:
     if default_value is not None:
-        validate_obj_by_ui_type(ui_type, default_value)
-        raise ValueError(f"Default value type must be {ui_type.value}, got {type(default_value)}")
+        try:
+            validate_obj_by_ui_type(ui_type, default_value)
+        except ValueError:
+            raise ValueError(f"Default value type must be {ui_type.value}, got {type(default_value)}")
 
     return ConfigSpecElement(name=get_typed_name(submodule_name, variable_name),
                              description=description,
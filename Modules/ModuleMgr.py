@@ -1,7 +1,10 @@
-from Modules.ManagerTestModule import *
-from Modules.ModuleBuilder import ModuleBuilder
-from Modules.WorkerTestModule import *
+from typing import TYPE_CHECKING
+
+from Modules.ModuleRegistry import ModuleRegistry
 from Utils.GlobalObj import GlobalObj
+
+if TYPE_CHECKING:
+    from Modules.ModuleBuilder import ModuleBuilder
 from Utils.Logger import Logger, LogLevel
 
 
@@ -10,12 +13,17 @@ class ModuleMgr(metaclass=GlobalObj):
     # Class fields
     # ------------------------------
 
+    # Builders keep no state between builds, so a single instance per module part is shared
+    _worker_builders: dict[str, 'ModuleBuilder']
+    _manager_builders: dict[str, 'ModuleBuilder']
+
     # ------------------------------
     # Class creation
     # ------------------------------
 
     def __init__(self) -> None:
-        pass
+        self._worker_builders = {}
+        self._manager_builders = {}
 
     def destroy(self) -> None:
         pass
@@ -27,24 +35,31 @@ class ModuleMgr(metaclass=GlobalObj):
     def get_all_modules(self) -> list[str]:
         rv: list[str] = []
 
-        for module in BaseWorkerTestModule.WorkerTestModuleBuilders.keys():
-            if module not in BaseManagerTestModule.ManagerTestModuleBuilders.keys():
-                Logger().log_error(f"WorkerTestModule: {module} not found in ManagerTestModuleFactoryMethods",
-                                   LogLevel.LOW_FREQ)
-            else:
+        for module in ModuleRegistry().get_test_module_names():
+            if ModuleRegistry().has_test_module_part(module, "worker") and \
+                    ModuleRegistry().has_test_module_part(module, "manager"):
                 rv.append(module)
+            else:
+                Logger().log_error(f"Module: {module} misses its worker or manager part in the manifest",
+                                   LogLevel.LOW_FREQ)
 
         return rv
 
-    def get_module_worker_part(self, module_name: str) -> ModuleBuilder:
-        if module_name not in BaseWorkerTestModule.WorkerTestModuleBuilders:
-            raise ValueError(f"Module {module_name} not found in WorkerTestModuleFactoryMethods")
-        return BaseWorkerTestModule.WorkerTestModuleBuilders[module_name]()
+    def get_module_worker_part(self, module_name: str) -> 'ModuleBuilder':
+        if not ModuleRegistry().has_test_module_part(module_name, "worker"):
+            raise ValueError(f"Module {module_name} worker part not found in the module manifest")
+
+        if module_name not in self._worker_builders:
+            self._worker_builders[module_name] = ModuleRegistry().get_test_module_factory(module_name, "worker")()
+        return self._worker_builders[module_name]
+
+    def get_module_manager_part(self, module_name: str) -> 'ModuleBuilder':
+        if not ModuleRegistry().has_test_module_part(module_name, "manager"):
+            raise ValueError(f"Module {module_name} manager part not found in the module manifest")
 
-    def get_module_manager_part(self, module_name: str) -> ModuleBuilder:
-        if module_name not in BaseManagerTestModule.ManagerTestModuleBuilders:
-            raise ValueError(f"Module {module_name} not found in ManagerTestModuleFactoryMethods")
-        return BaseManagerTestModule.ManagerTestModuleBuilders[module_name]()
+        if module_name not in self._manager_builders:
+            self._manager_builders[module_name] = ModuleRegistry().get_test_module_factory(module_name, "manager")()
+        return self._manager_builders[module_name]
 
     def validate_module(self, module_name: str) -> None:
         if module_name not in self.get_all_modules():
@@ -0,0 +1,98 @@
+import importlib
+import json
+import os
+from threading import Lock
+from typing import TYPE_CHECKING
+
+from Utils.GlobalObj import GlobalObj
+
+# Builder base pulls in the pydantic models, listing modules must not pay for it
+if TYPE_CHECKING:
+    from Modules.ModuleBuilder import ModuleBuilderFactory
+
+MANIFEST_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "modules_manifest.json")
+
+
+# Module names and builder locations are read from the manifest, implementation code is imported only
+# when a builder of the module is first requested
+class ModuleRegistry(metaclass=GlobalObj):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    # Builder locations are given as "package.module:BuilderClass"
+    _test_modules: dict[str, dict[str, str]]
+    _submodules: dict[str, dict[str, str]]
+
+    _factories: dict[str, 'ModuleBuilderFactory']
+    _factories_lock: Lock
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, manifest_path: str = MANIFEST_PATH) -> None:
+        with open(manifest_path, "r") as file:
+            manifest = json.load(file)
+
+        self._test_modules = manifest["test_modules"]
+        self._submodules = manifest["submodules"]
+
+        self._factories = {}
+        self._factories_lock = Lock()
+
+    def destroy(self) -> None:
+        pass
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def get_test_module_names(self) -> list[str]:
+        return list(self._test_modules.keys())
+
+    def has_test_module_part(self, module_name: str, part: str) -> bool:
+        return module_name in self._test_modules and part in self._test_modules[module_name]
+
+    def get_submodule_types(self) -> list[str]:
+        return list(self._submodules.keys())
+
+    def has_submodule_type(self, submodule_type_name: str) -> bool:
+        return submodule_type_name in self._submodules
+
+    def get_submodule_names(self, submodule_type_name: str) -> list[str]:
+        return list(self._submodules[submodule_type_name].keys())
+
+    def has_submodule(self, submodule_type_name: str, submodule_name: str) -> bool:
+        return submodule_type_name in self._submodules and submodule_name in self._submodules[submodule_type_name]
+
+    # Part is either "worker" or "manager"
+    def get_test_module_factory(self, module_name: str, part: str) -> 'ModuleBuilderFactory':
+        return self._load_factory(self._test_modules[module_name][part])
+
+    def get_submodule_factory(self, submodule_type_name: str, submodule_name: str) -> 'ModuleBuilderFactory':
+        return self._load_factory(self._submodules[submodule_type_name][submodule_name])
+
+    # Modules outside the manifest, e.g. plugins or test doubles, can be added at runtime
+    def register_test_module(self, module_name: str, worker_target: str, manager_target: str) -> None:
+        self._test_modules[module_name] = {"worker": worker_target, "manager": manager_target}
+
+    def register_submodule(self, submodule_type_name: str, submodule_name: str, target: str) -> None:
+        self._submodules.setdefault(submodule_type_name, {})[submodule_name] = target
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _load_factory(self, target: str) -> 'ModuleBuilderFactory':
+        with self._factories_lock:
+            if target not in self._factories:
+                module_path, _, attr_name = target.partition(":")
+
+                factory = getattr(importlib.import_module(module_path), attr_name, None)
+                if factory is None:
+                    raise ValueError(f"Builder {attr_name} not found in module {module_path}")
+
+                self._factories[target] = factory
+
+            return self._factories[target]
@@ -1,19 +1,26 @@
-from Modules.ModuleBuilder import ModuleBuilder
-from Modules.Submodules import *
+from typing import TYPE_CHECKING
+
+from Modules.ModuleRegistry import ModuleRegistry
 from Utils.GlobalObj import GlobalObj
 
+if TYPE_CHECKING:
+    from Modules.ModuleBuilder import ModuleBuilder
+
 
 class SubModuleMgr(metaclass=GlobalObj):
     # ------------------------------
     # Class fields
     # ------------------------------
 
+    # Builders keep no state between builds, so a single instance per submodule is shared
+    _builders: dict[tuple[str, str], 'ModuleBuilder']
+
     # ------------------------------
     # Class creation
     # ------------------------------
 
     def __init__(self) -> None:
-        pass
+        self._builders = {}
 
     def destroy(self) -> None:
         pass
@@ -25,28 +32,29 @@ class SubModuleMgr(metaclass=GlobalObj):
     def get_all_submodules(self) -> dict[str, list[str]]:
         rv: dict[str, list[str]] = {}
 
-        for submodule_type_name in SubModulesRegistry.SubModulesBuilders.keys():
-            rv[submodule_type_name] = list(SubModulesRegistry.SubModulesBuilders[submodule_type_name].keys())
+        for submodule_type_name in ModuleRegistry().get_submodule_types():
+            rv[submodule_type_name] = ModuleRegistry().get_submodule_names(submodule_type_name)
 
         return rv
 
     def get_all_submodules_by_type(self, submodule_type_name: str) -> list[str]:
-        if submodule_type_name not in SubModulesRegistry.SubModulesBuilders:
-            raise ValueError(f"Submodule type {submodule_type_name} not found in SubModulesBuilders")
-        return list(SubModulesRegistry.SubModulesBuilders[submodule_type_name].keys())
+        if not ModuleRegistry().has_submodule_type(submodule_type_name):
+            raise ValueError(f"Submodule type {submodule_type_name} not found in the module manifest")
+        return ModuleRegistry().get_submodule_names(submodule_type_name)
+
+    def get_submodule(self, submodule_type_name: str, submodule_name: str) -> 'ModuleBuilder':
+        self.validate_submodule(submodule_type_name, submodule_name)
 
-    def get_submodule(self, submodule_type_name: str, submodule_name: str) -> ModuleBuilder:
-        if submodule_type_name not in SubModulesRegistry.SubModulesBuilders:
-            raise ValueError(f"Submodule type {submodule_type_name} not found in SubModulesBuilders")
-        if submodule_name not in SubModulesRegistry.SubModulesBuilders[submodule_type_name]:
-            raise ValueError(f"Submodule {submodule_name} not found in SubModulesBuilders[{submodule_type_name}]")
-        return SubModulesRegistry.SubModulesBuilders[submodule_type_name][submodule_name]()
+        key = (submodule_type_name, submodule_name)
+        if key not in self._builders:
+            self._builders[key] = ModuleRegistry().get_submodule_factory(submodule_type_name, submodule_name)()
+        return self._builders[key]
 
     def validate_submodule(self, submodule_type_name: str, submodule_name: str) -> None:
-        if submodule_type_name not in SubModulesRegistry.SubModulesBuilders:
+        if not ModuleRegistry().has_submodule_type(submodule_type_name):
             raise ValueError(f"Submodule type {submodule_type_name} not found")
-        if submodule_name not in SubModulesRegistry.SubModulesBuilders[submodule_type_name]:
-            raise ValueError(f"Submodule {submodule_name} not found in SubModulesBuilders[{submodule_type_name}]")
+        if not ModuleRegistry().has_submodule(submodule_type_name, submodule_name):
+            raise ValueError(f"Submodule {submodule_name} not found in the module manifest for {submodule_type_name}")
 
     # ------------------------------
     # Private methods
@@ -2,12 +2,12 @@ from abc import abstractmethod, ABC
 
 from Models.OrchestratorModels import ConfigSpecElement, UiType
 from Modules.BuildableModule import BuildableModule
-from Modules.ModuleBuilder import ModuleBuilderFactory, ModuleBuilder
+from Modules.ModuleBuilder import ModuleBuilder
 from Modules.ModuleHelpers import build_config_spec_element, get_config_prefixed_name, \
     build_submodule_spec_element
 from Modules.Submodules.EngineModule.BaseEngineModule import BaseEngineModule
-from Modules.Submodules.SubModulesRegistry import append_submodule_builders
 from Utils.Logger import Logger, LogLevel
+from Utils.ProcessLimits import ProcessLimits
 
 
 # ------------------------------
@@ -17,6 +17,8 @@ from Utils.Logger import Logger, LogLevel
 
 class BaseChessTournamentModule(BuildableModule, ABC):
     SUBMODULE_TYPE: str = "BaseChessTournamentModule"
+    # Starting time is given again every TC_MOVES moves
+    TC_MOVES: int = 40
 
     # ------------------------------
     # Class fields
@@ -69,6 +71,11 @@ class BaseChessTournamentModule(BuildableModule, ABC):
 
         Logger().log_info(f"Config correctly loaded for tournament: {self._module_name}", LogLevel.MEDIUM_FREQ)
 
+    # Upper bound of a game lasting at most max_moves moves, used to derive job deadlines
+    def get_max_game_time_s(self, max_moves: int) -> float:
+        periods = -(-max_moves // BaseChessTournamentModule.TC_MOVES)
+        return 2 * (periods * self._starting_total_time_s + max_moves * self._increment_time)
+
     async def _build_internal(self) -> None:
         await self._build_internal_chess_tournament()
 
@@ -98,7 +105,8 @@ class BaseChessTournamentModule(BuildableModule, ABC):
         pass
 
     @abstractmethod
-    async def play_game(self, args: dict[str, str], enemy_engine: str, game_seed: int) -> str:
+    async def play_game(self, args: dict[str, str], enemy_engine: str, game_seed: int,
+                        limits: ProcessLimits | None = None) -> str:
         pass
 
     # ------------------------------
@@ -305,17 +313,3 @@ class BaseChessTournamentModuleBuilder(ModuleBuilder, ABC):
     @abstractmethod
     def _get_config_spec_internal_chess_tournament(self, prefix: str) -> list[ConfigSpecElement]:
         pass
-
-
-# ------------------------------
-# Builders Map
-# ------------------------------
-
-TournamentFactoryMethods: dict[str, ModuleBuilderFactory] = {}
-append_submodule_builders(BaseChessTournamentModule.SUBMODULE_TYPE, TournamentFactoryMethods)
-
-
-def append_tournament_builder(tournament: str,
-                              builder: ModuleBuilderFactory) -> None:
-    if tournament not in TournamentFactoryMethods:
-        TournamentFactoryMethods[tournament] = builder
@@ -1,15 +1,14 @@
 import json
 import os.path
-from subprocess import Popen, PIPE
 
 from Models.OrchestratorModels import ConfigSpecElement
 from Modules.ModuleHelpers import get_config_prefixed_name
 from Modules.Submodules.ChessTournamentModules.BaseChessTournamentModule import BaseChessTournamentModule, \
-    append_tournament_builder, \
     BaseChessTournamentModuleBuilder
 from Modules.Submodules.EngineModule.BaseEngineModule import BaseEngineModule
 from Utils.Helpers import run_shell_command, dump_content_to_file_on_crash
 from Utils.Logger import Logger, LogLevel
+from Utils.ProcessLimits import ProcessLimits, run_limited
 
 
 # ------------------------------
@@ -27,9 +26,14 @@ class CuteChessModule(BaseChessTournamentModule):
     EXEC_NAME: str = "cutechess-cli"
     CONFIG_FILE: str = "engines.json"
 
+    # Memory of a game left for cutechess itself and the engine binaries, the rest is split between the hashes
+    GAME_OVERHEAD_MB: int = 64
+    MIN_HASH_SIZE_MB: int = 1
+
     _config_file_path: str
 
     _tested_engine: str
+    _each_arguments: str
     _start_arguments: str
     _engines: dict[str, BaseEngineModule]
 
@@ -43,6 +47,7 @@ class CuteChessModule(BaseChessTournamentModule):
 
         self._config_file_path = ""
         self._tested_engine = ""
+        self._each_arguments = ""
         self._start_arguments = ""
         self._engines = {}
 
@@ -72,7 +77,8 @@ class CuteChessModule(BaseChessTournamentModule):
         await self._prepare_config_for_engines(config, prefix)
         self._prepare_config_for_tournament()
 
-    async def play_game(self, args: dict[str, str], enemy_engine: str, game_seed: int) -> str:
+    async def play_game(self, args: dict[str, str], enemy_engine: str, game_seed: int,
+                        limits: ProcessLimits | None = None) -> str:
         Logger().log_info(f"Starting game (seed: {game_seed}) with args: {args}"
                           f" and enemy engine: {enemy_engine}", LogLevel.HIGH_FREQ)
         seed = game_seed % 2
@@ -93,8 +99,9 @@ class CuteChessModule(BaseChessTournamentModule):
         [first_engine, second_engine] = [tested_engine_args, enemy_engine_args] if seed == 0 else [enemy_engine_args,
                                                                                                    tested_engine_args]
 
-        full_start_args = f"-engine conf={first_engine} -engine conf={second_engine} {self._start_arguments}"
-        result = self._start_cute_chess_and_extract_result(full_start_args, seed)
+        full_start_args = (f"-engine conf={first_engine} -engine conf={second_engine} {self._each_arguments}"
+                           f"option.Hash={self._get_hash_size_mb(limits)} {self._start_arguments}")
+        result = await self._start_cute_chess_and_extract_result(full_start_args, seed, limits)
         Logger().log_info(f"Game (with seed: {game_seed}) finished with result: {result}", LogLevel.HIGH_FREQ)
 
         return result
@@ -136,29 +143,44 @@ class CuteChessModule(BaseChessTournamentModule):
         with open(self._config_file_path, 'w') as json_file:
             json.dump(engines_config, json_file, indent=2)
 
-    def _prepare_config_for_tournament(self) -> None:
-        args = "--each "
+    # Both engines of a game share its memory budget, the configured hash size is the upper bound
+    def _get_hash_size_mb(self, limits: ProcessLimits | None) -> int:
+        if limits is None or limits.memory_mb == 0:
+            return self._hash_size_mb
+
+        budget_mb = (limits.memory_mb - CuteChessModule.GAME_OVERHEAD_MB) // 2
+        if budget_mb < CuteChessModule.MIN_HASH_SIZE_MB:
+            raise Exception(f"Memory of {limits.memory_mb} MB per game is not enough to run the engines, "
+                            f"at least {CuteChessModule.GAME_OVERHEAD_MB + 2 * CuteChessModule.MIN_HASH_SIZE_MB} MB "
+                            f"is needed")
+
+        return min(self._hash_size_mb, budget_mb)
 
+    def _prepare_config_for_tournament(self) -> None:
         minutes = self._starting_total_time_s // 60
         seconds = self._starting_total_time_s % 60
         tc_time = f"{minutes}:{seconds}"
 
-        args += f"tc=40/{tc_time}+{self._increment_time} "
-        args += f"option.Hash={self._hash_size_mb}"
-        args += (f"-draw movenumber={self._draw_move_silent_moves} "
-                 f"movecount={self._draw_move_count_within_points_range} score={self._draw_zero_point_range} ")
+        # Hash size depends on the memory of the game slot, so it is added per game
+        self._each_arguments = f"--each tc={BaseChessTournamentModule.TC_MOVES}/{tc_time}+{self._increment_time} "
+
+        args = (f"-draw movenumber={self._draw_move_silent_moves} "
+                f"movecount={self._draw_move_count_within_points_range} score={self._draw_zero_point_range} ")
         args += f"-resign movecount={self._resign_minimal_moves_above_range} score={self._resign_diff_point_range} "
 
         self._start_arguments = args
 
-    def _start_cute_chess_and_extract_result(self, start_args: str, seed: int) -> str:
+    async def _start_cute_chess_and_extract_result(self, start_args: str, seed: int,
+                                                   limits: ProcessLimits | None) -> str:
         result_map = {0: "W", 1: "L", 2: "D"}
 
         command = f"{self.get_exec_path()} {start_args}"
-        process = Popen(command, shell=True, stdout=PIPE)
-        output = process.communicate()[0].decode("utf-8")
+        # Limits are applied to the shell before exec, so cutechess and both engines inherit them.
+        # Cancelled games are killed with their engines before the core slot is given to the next game.
+        returncode, output = await run_limited(["/bin/sh", "-c", command], limits)
+        output = output.decode("utf-8")
 
-        if process.returncode != 0:
+        if returncode != 0:
             dump_content_to_file_on_crash(output)
             raise Exception(f"Failed to run cutechess-cli with command: {command}")
 
@@ -204,6 +226,3 @@ class CuteChessModuleBuilder(BaseChessTournamentModuleBuilder):
 
     def _get_build_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
         return []
-
-
-append_tournament_builder(CuteChessModule.TOURNAMENT_NAME, CuteChessModuleBuilder)
@@ -1,4 +1 @@
 __all__ = ['BaseChessTournamentModule', 'CuteChessModule']
-
-from . import BaseChessTournamentModule
-from . import CuteChessModule
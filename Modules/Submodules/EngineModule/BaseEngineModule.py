@@ -1,8 +1,6 @@
 from abc import ABC, abstractmethod
 
 from Modules.BuildableModule import BuildableModule
-from Modules.ModuleBuilder import ModuleBuilderFactory
-from Modules.Submodules.SubModulesRegistry import append_submodule_builders
 
 
 class BaseEngineModule(BuildableModule, ABC):
@@ -35,11 +33,3 @@ class BaseEngineModule(BuildableModule, ABC):
     async def get_param_command(self, param_name: str, param_value: str) -> str:
         pass
 
-
-EngineModuleBuilders: dict[str, ModuleBuilderFactory] = {}
-append_submodule_builders(BaseEngineModule.SUBMODULE_TYPE, EngineModuleBuilders)
-
-
-def append_engine_builder(engine: str, builder: ModuleBuilderFactory) -> None:
-    if engine not in EngineModuleBuilders:
-        EngineModuleBuilders[engine] = builder
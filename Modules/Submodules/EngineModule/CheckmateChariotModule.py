@@ -5,7 +5,7 @@ from Modules.ModuleBuilder import ModuleBuilder
 from Modules.ModuleHelpers import build_config_spec_element, get_config_prefixed_name
 from Modules.NonConfigurableModule import NonConfigurableModule
 from Utils.Helpers import run_shell_command, validate_string
-from .BaseEngineModule import BaseEngineModule, append_engine_builder
+from .BaseEngineModule import BaseEngineModule
 
 
 # ------------------------------
@@ -109,6 +109,3 @@ class CheckmateChariotModuleBuilder(ModuleBuilder):
 
     def build(self, json_config: dict[str, list[str]], name_prefix: str = "") -> any:
         return CheckmateChariotModule()
-
-
-append_engine_builder(CheckmateChariotModule.ENGINE_NAME, CheckmateChariotModuleBuilder)
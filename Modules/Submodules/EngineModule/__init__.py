@@ -1,4 +1 @@
 __all__ = ['BaseEngineModule', 'CheckmateChariotModule']
-
-from . import BaseEngineModule
-from . import CheckmateChariotModule
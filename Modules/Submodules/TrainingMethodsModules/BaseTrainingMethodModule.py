@@ -1,8 +1,6 @@
 from abc import abstractmethod, ABC
 
 from Modules.Module import Module
-from Modules.ModuleBuilder import ModuleBuilderFactory
-from Modules.Submodules.SubModulesRegistry import append_submodule_builders
 
 
 class BaseTrainingMethodModule(Module, ABC):
@@ -46,11 +44,3 @@ class BaseTrainingMethodModule(Module, ABC):
     @abstractmethod
     async def harden_model(self) -> None:
         pass
-
-
-TrainingMethodModuleBuilders: dict[str, ModuleBuilderFactory] = {}
-append_submodule_builders(BaseTrainingMethodModule.SUBMODULE_TYPE, TrainingMethodModuleBuilders)
-
-def append_test_module_builder(module: str, builder: ModuleBuilderFactory) -> None:
-    if module not in TrainingMethodModuleBuilders:
-        TrainingMethodModuleBuilders[module] = builder
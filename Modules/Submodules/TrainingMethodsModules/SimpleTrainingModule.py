@@ -1,8 +1,7 @@
 from Models.OrchestratorModels import ConfigSpecElement
 from Modules.ModuleBuilder import ModuleBuilder
 from Modules.NonBuildableModule import NonBuildableModule
-from Modules.Submodules.TrainingMethodsModules.BaseTrainingMethodModule import BaseTrainingMethodModule, \
-    append_test_module_builder
+from Modules.Submodules.TrainingMethodsModules.BaseTrainingMethodModule import BaseTrainingMethodModule
 
 
 # ------------------------------
@@ -76,6 +75,3 @@ class SimpleTrainingMethodBuilder(ModuleBuilder):
 
     def _get_build_spec_internal(self, prefix: str) -> list[ConfigSpecElement]:
         return []
-
-
-append_test_module_builder(SimpleTrainingModule.MODULE_NAME, lambda: SimpleTrainingMethodBuilder())
@@ -1,4 +1 @@
 __all__ = ['BaseTrainingMethodModule', 'SimpleTrainingModule']
-
-from . import BaseTrainingMethodModule
-from . import SimpleTrainingModule
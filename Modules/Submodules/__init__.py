@@ -1,6 +1 @@
-__all__ = ['SubModulesRegistry', 'ChessTournamentModules', 'EngineModule', 'TrainingMethodsModules']
-
-from .ChessTournamentModules import *
-from .EngineModule import *
-from .SubModulesRegistry import *
-from .TrainingMethodsModules import *
+__all__ = ['ChessTournamentModules', 'EngineModule', 'TrainingMethodsModules']
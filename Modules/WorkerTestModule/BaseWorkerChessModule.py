@@ -3,7 +3,8 @@ import json
 from Models.OrchestratorModels import ConfigSpecElement, UiType
 from Modules.Submodules.ChessTournamentModules.BaseChessTournamentModule import BaseChessTournamentModule
 from Utils.Helpers import validate_dict_str, validate_string, validate_dict_str_str
-from .BaseWorkerTestModule import BaseWorkerTestModule, append_test_module_builder
+from Utils.ProcessLimits import ProcessLimits
+from .BaseWorkerTestModule import BaseWorkerTestModule
 from ..ModuleBuilder import ModuleBuilder
 from ..ModuleHelpers import build_submodule_spec_element
 from ..SubModuleMgr import SubModuleMgr
@@ -42,7 +43,7 @@ class ChessWorkerTestModule(BaseWorkerTestModule):
     async def build_module(self) -> None:
         await self._chess_tournament_module.build_module()
 
-    async def run_single_test(self, arg_str: str, seed: int) -> str:
+    async def run_single_test(self, arg_str: str, seed: int, limits: ProcessLimits | None = None) -> str:
         parsed_json = json.loads(arg_str)
 
         validate_dict_str(parsed_json)
@@ -59,7 +60,7 @@ class ChessWorkerTestModule(BaseWorkerTestModule):
         validate_dict_str_str(parsed_json["params"])
         params = parsed_json["params"]
 
-        result = await self._chess_tournament_module.play_game(params, opponent, seed)
+        result = await self._chess_tournament_module.play_game(params, opponent, seed, limits)
         return result
 
     # ------------------------------
@@ -103,6 +104,3 @@ class ChessWorkerTestModuleBuilder(ModuleBuilder):
         return ChessWorkerTestModule(
             **self._build_submodules(json_config, name_prefix)
         )
-
-
-append_test_module_builder(ChessWorkerTestModule.MODULE_NAME, lambda: ChessWorkerTestModuleBuilder())
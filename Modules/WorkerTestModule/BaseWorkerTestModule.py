@@ -1,7 +1,7 @@
 from abc import abstractmethod, ABC
 
 from Modules.Module import Module
-from Modules.ModuleBuilder import ModuleBuilderFactory
+from Utils.ProcessLimits import ProcessLimits
 
 
 class BaseWorkerTestModule(Module, ABC):
@@ -20,14 +20,7 @@ class BaseWorkerTestModule(Module, ABC):
     # Abstract methods
     # ------------------------------
 
+    # Limits must be applied to every process started for the test
     @abstractmethod
-    async def run_single_test(self, arg_str: str, seed: int) -> str:
+    async def run_single_test(self, arg_str: str, seed: int, limits: ProcessLimits | None = None) -> str:
         pass
-
-
-WorkerTestModuleBuilders: dict[str, ModuleBuilderFactory] = {}
-
-
-def append_test_module_builder(module: str, builder: ModuleBuilderFactory) -> None:
-    if module not in WorkerTestModuleBuilders:
-        WorkerTestModuleBuilders[module] = builder
@@ -1,4 +1 @@
 __all__ = ['BaseWorkerTestModule', 'BaseWorkerChessModule']
-
-from . import BaseWorkerTestModule
-from . import BaseWorkerChessModule
\ No newline at end of file
@@ -0,0 +1,11 @@
+import pytest
+
+from Utils.Logger import Logger, LogLevel
+
+
+# Files testing components without the manager lifespan opt in with pytestmark, the lifespan starts its own logger
+@pytest.fixture(scope="module")
+def logger(tmp_path_factory):
+    Logger(str(tmp_path_factory.mktemp("logs") / "log.txt"), False, LogLevel.LOW_FREQ)
+    yield
+    Logger().destroy()
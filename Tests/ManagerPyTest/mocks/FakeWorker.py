@@ -0,0 +1,75 @@
+import asyncio
+import time
+from threading import Thread
+from typing import Callable
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.Worker import Worker
+from Models.WorkerModels import SocketMsg, SocketMsgType, WorkerModel
+from Utils.WireCodec import WireCodec, JsonCodec
+
+
+# Records everything the manager sends instead of talking to a real worker process
+class FakeSocket:
+    msgs: list[SocketMsg]
+    frames: asyncio.Queue
+
+    def __init__(self) -> None:
+        self.msgs = []
+        self.frames = asyncio.Queue()
+
+    async def receive(self) -> dict:
+        return await self.frames.get()
+
+    # Frames are pushed by the test thread and read by the worker socket loop
+    def push_frame(self, frame: dict, socket_loop: 'SocketLoop') -> None:
+        socket_loop.loop.call_soon_threadsafe(self.frames.put_nowait, frame)
+
+    async def send_text(self, data: str) -> None:
+        self.msgs.append(WireCodec.decode(data))
+
+    async def send_bytes(self, data: bytes) -> None:
+        self.msgs.append(WireCodec.decode(data))
+
+    async def close(self) -> None:
+        pass
+
+    def get_payloads(self, msg_type: SocketMsgType) -> list[dict]:
+        return [msg.payload for msg in list(self.msgs) if msg.type == msg_type]
+
+
+class SocketLoop:
+    loop: asyncio.AbstractEventLoop
+    thread: Thread
+
+    def __init__(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever)
+        self.thread.start()
+
+    def destroy(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+# Registers a worker in the running manager components and connects it to a fake socket
+def connect_fake_worker(name: str, cpus: int, socket_loop: SocketLoop) -> tuple[Worker, FakeSocket]:
+    worker_mgr = ManagerComponents().get_worker_mgr()
+    worker_mgr.register(WorkerModel(name=name, version=0, cpus=cpus, memoryMB=1024))
+
+    worker = next(worker for worker in worker_mgr.get_workers() if worker.get_model().name == name)
+    socket = FakeSocket()
+    worker.set_conn_socket(socket, JsonCodec(), socket_loop.loop)
+
+    return worker, socket
+
+
+def wait_until(predicate: Callable[[], bool], timeout_s: float = 5.0) -> None:
+    deadline = time.perf_counter() + timeout_s
+
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Condition not met in time")
+
+        time.sleep(0.01)
@@ -0,0 +1,44 @@
+import asyncio
+
+from Modules.WorkerTestModule.BaseWorkerTestModule import BaseWorkerTestModule
+from Utils.ProcessLimits import ProcessLimits
+
+
+# Worker test module playing instant games, every step it went through is recorded on the class
+class StubWorkerModule(BaseWorkerTestModule):
+    builds: list[dict[str, list[str]]] = []
+    configs: list[dict[str, any]] = []
+
+    def __init__(self, init: dict[str, list[str]]) -> None:
+        super().__init__("StubModule")
+        self._init = init
+        self._result = "D"
+        self._fail_seed = None
+        self._game_time_s = 0.0
+
+    async def configure_build(self, json_parsed: any, prefix: str = "") -> None:
+        # Modules add keys to the build config, a reused one would fail here
+        if "exec_path" in json_parsed:
+            raise Exception("Duplicate key: exec_path found in json config!")
+        json_parsed["exec_path"] = json_parsed["build_dir"]
+
+    async def build_module(self) -> None:
+        StubWorkerModule.builds.append(self._init)
+
+    async def configure_module(self, json_parsed: any, prefix: str = "") -> None:
+        StubWorkerModule.configs.append(json_parsed)
+        self._result = json_parsed.get("result", "D")
+        self._fail_seed = json_parsed.get("fail_seed")
+        self._game_time_s = json_parsed.get("game_time_s", 0.0)
+
+    async def run_single_test(self, arg_str: str, seed: int, limits: ProcessLimits | None = None) -> str:
+        if seed == self._fail_seed:
+            raise Exception(f"Game with seed: {seed} crashed")
+
+        await asyncio.sleep(self._game_time_s)
+        return self._result
+
+
+class StubWorkerModuleBuilder:
+    def build(self, json_config: dict[str, list[str]], name_prefix: str = "") -> StubWorkerModule:
+        return StubWorkerModule(json_config)
@@ -0,0 +1,88 @@
+import time
+from threading import Lock
+
+import pytest
+
+from Tests.ManagerPyTest.mocks.FakeWorker import wait_until
+from Utils.DeadlineScheduler import DeadlineScheduler
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+class FiredLog:
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.fired = []
+
+    def callback(self, name: str):
+        def fire() -> None:
+            with self._lock:
+                self.fired.append((name, time.perf_counter()))
+        return fire
+
+    def get_names(self) -> list[str]:
+        with self._lock:
+            return [name for name, _ in self.fired]
+
+
+def test_rescheduled_key_fires_latest_deadline_only() -> None:
+    scheduler = DeadlineScheduler()
+    log = FiredLog()
+
+    try:
+        start = time.perf_counter()
+
+        # Pushed back, the first deadline passes silently
+        scheduler.schedule_in("later", 0.1, log.callback("later-first"))
+        scheduler.schedule_in("later", 0.4, log.callback("later-second"))
+
+        # Pulled in, the scheduler wakes up earlier than it planned to
+        scheduler.schedule_in("sooner", 5.0, log.callback("sooner-first"))
+        scheduler.schedule_in("sooner", 0.2, log.callback("sooner-second"))
+
+        wait_until(lambda: len(log.get_names()) == 2)
+        time.sleep(0.2)
+    finally:
+        scheduler.destroy()
+
+    assert log.get_names() == ["sooner-second", "later-second"]
+    assert log.fired[1][1] - start >= 0.4
+    assert scheduler.get_num_scheduled() == 0
+
+
+def test_cancel_suppresses_deadline() -> None:
+    scheduler = DeadlineScheduler()
+    log = FiredLog()
+
+    try:
+        scheduler.schedule_in("cancelled", 0.1, log.callback("cancelled"))
+        scheduler.schedule_in("kept", 0.2, log.callback("kept"))
+
+        assert scheduler.cancel("cancelled")
+        assert not scheduler.cancel("cancelled")
+
+        wait_until(lambda: len(log.get_names()) == 1)
+        time.sleep(0.1)
+    finally:
+        scheduler.destroy()
+
+    assert log.get_names() == ["kept"]
+    assert not scheduler.cancel("kept")
+
+
+def test_stale_entries_are_compacted() -> None:
+    scheduler = DeadlineScheduler()
+    log = FiredLog()
+
+    try:
+        for i in range(1000):
+            scheduler.schedule_in("key", 60.0, log.callback(f"stale-{i}"))
+
+        assert len(scheduler._heap) <= 2 + DeadlineScheduler.COMPACTION_MIN_STALE + 1
+
+        scheduler.schedule_in("key", 0.0, log.callback("latest"))
+        wait_until(lambda: len(log.get_names()) == 1)
+    finally:
+        scheduler.destroy()
+
+    assert log.get_names() == ["latest"]
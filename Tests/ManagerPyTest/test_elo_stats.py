@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from Utils.EloStats import trinomial_estimate, pentanomial_estimate, pair_games, bayes_elo, score_to_elo
+
+
+def test_trinomial_and_pentanomial_estimates() -> None:
+    estimate = trinomial_estimate(np.array([60, 0]), np.array([20, 0]), np.array([20, 0]))
+
+    assert estimate.score[0] == pytest.approx(0.7)
+    assert estimate.elo[0] == pytest.approx(147.19, abs=0.01)
+    assert 0 < estimate.elo_error[0] < estimate.elo[0]
+    assert estimate.los[0] > 0.99
+    assert np.isnan(estimate.score[1])
+
+    paired = pentanomial_estimate(np.array([[5, 10, 50, 20, 15]]))
+    assert paired.score[0] == pytest.approx(0.575)
+    assert paired.elo[0] == pytest.approx(score_to_elo(np.array([0.575]))[0])
+
+
+def test_pairs_split_on_job_and_seed() -> None:
+    job_ids = np.array([1, 1, 1, 2, 2, 2])
+    seeds = np.array([0, 1, 2, 2, 3, 5])
+    scores = np.array([2, 1, 0, 1, 1, 2])
+
+    starts, pair_scores = pair_games(job_ids, seeds, scores)
+    assert starts.tolist() == [0, 3]
+    assert pair_scores.tolist() == [3, 2]
+
+
+def test_bayes_elo_recovers_ratings() -> None:
+    rng = np.random.default_rng(7)
+    true_ratings = np.array([0.0, 100.0, 200.0])
+    first = rng.integers(0, 3, 60000)
+    second = (first + rng.integers(1, 3, 60000)) % 3
+    first_is_white = rng.integers(0, 2, 60000) == 1
+
+    diff = true_ratings[first] - true_ratings[second] + np.where(first_is_white, 32.8, -32.8)
+    p_win = 1 / (1 + 10 ** (-(diff - 97.3) / 400))
+    p_loss = 1 / (1 + 10 ** (-(-diff - 97.3) / 400))
+    draw = rng.random(60000)
+    scores = np.where(draw < p_win, 2, np.where(draw < p_win + p_loss, 0, 1))
+
+    ratings, errors = bayes_elo(first, second, scores, first_is_white, 3)
+    assert ratings == pytest.approx([-100, 0, 100], abs=10)
+    assert (errors < 10).all()
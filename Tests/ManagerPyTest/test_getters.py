@@ -1,7 +1,8 @@
 from fastapi.testclient import TestClient
 
 from Manager.manager_main import Manager
-from Tests.ManagerPyTest.validators import validate_post_getter, validate_get_getter
+from Models.OrchestratorModels import TaskState
+from Tests.ManagerPyTest.validators import validate_post_getter, validate_get_getter, validate_post_payload
 
 
 def test_getters() -> None:
@@ -12,3 +13,27 @@ def test_getters() -> None:
         validate_get_getter(client, "/orchestrator/modules/get/available")
 
         validate_get_getter(client, "/orchestrator/submodules/get/active")
+
+        validate_task_pages(client)
+
+
+def validate_task_pages(client: TestClient) -> None:
+    for i in range(5):
+        validate_post_payload(client, "/orchestrator/task/create",
+                              {"name": f"paged_{i}", "description": "", "module_name": "BaseChessModule"})
+
+    names, cursor = [], -1
+    while cursor is not None:
+        page = validate_post_payload(client, "/orchestrator/task/query/page", {"cursor": cursor, "limit": 2})
+        assert len(page.json()["queries"]) <= 2
+
+        names += [query["name"] for query in page.json()["queries"]]
+        cursor = page.json()["next_cursor"]
+
+    assert names == [f"paged_{i}" for i in range(5)]
+
+    page = validate_post_payload(client, "/orchestrator/task/query/page", {"states": [TaskState.SCHEDULED]})
+    assert page.json()["queries"] == [] and page.json()["next_cursor"] is None
+
+    page = validate_post_payload(client, "/orchestrator/task/query/page", {"limit": 0})
+    assert page.json()["result"] != ""
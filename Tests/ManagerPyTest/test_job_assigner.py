@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+
+import pytest
+
+from Manager.ManagerLib.JobAssigner import JobAssigner, WorkerLane
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.ManagerSettings import ManagerSettings
+from Manager.ManagerLib.TestJob import ModuleTestJobRequest
+from Models.OrchestratorModels import WorkerState
+from Utils.SettingsLoader import SettingsLoader
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+# Exposes only what the assigner reads from a worker
+class StubWorker:
+    def __init__(self, name: str, cpus: int, games_per_s: float = 0.0, inflight_games: int = 0,
+                 state: WorkerState = WorkerState.CONNECTED) -> None:
+        self.name = name
+        self.cpus = cpus
+        self.games_per_s = games_per_s
+        self.inflight_games = inflight_games
+        self.state = state
+
+    def get_cpus(self) -> int:
+        return self.cpus
+
+    def get_available_cpus(self) -> int:
+        return self.cpus
+
+    def get_inflight_games(self) -> int:
+        return self.inflight_games
+
+    def get_games_per_s(self) -> float:
+        return self.games_per_s
+
+    def get_model(self) -> SimpleNamespace:
+        return SimpleNamespace(name=self.name)
+
+    def get_session_token(self) -> str:
+        return self.name
+
+    def get_state(self) -> WorkerState:
+        return self.state
+
+
+@pytest.fixture(scope="module")
+def settings(logger, tmp_path_factory):
+    SettingsLoader(ManagerSettings, str(tmp_path_factory.mktemp("settings") / "settings.json"))
+    yield SettingsLoader().get_settings()
+    SettingsLoader().destroy()
+
+
+# Assigner thread is stopped right away, so the tests drive every step themselves
+@pytest.fixture
+def assigner(settings):
+    assigner = JobAssigner()
+    assigner.destroy()
+    return assigner
+
+
+def _add_lanes(assigner: JobAssigner, *workers: StubWorker) -> dict[str, WorkerLane]:
+    for worker in workers:
+        assigner._lanes[worker.get_session_token()] = WorkerLane(worker)
+    return {worker.name: assigner._lanes[worker.name] for worker in workers}
+
+
+def _create_jobs(count: int, games: int) -> list[ModuleTestJobRequest]:
+    return [ModuleTestJobRequest(1, 0, "{}", list(range(games))) for _ in range(count)]
+
+
+def test_fill_goes_to_most_starved_lane(assigner) -> None:
+    # Busy worker drains its in-flight games in a second, the idle one has nothing to do
+    lanes = _add_lanes(assigner, StubWorker("busy", 2, games_per_s=2, inflight_games=2),
+                       StubWorker("idle", 4, games_per_s=4))
+    jobs = _create_jobs(3, 1)
+    assigner._pending.extend(jobs)
+
+    assigner._fill_lanes_unlocked()
+
+    assert list(lanes["idle"].queue) == jobs
+    assert len(lanes["busy"].queue) == 0
+
+    # Once drain times level out, the busy lane gets its share as well
+    assigner._pending.extend(_create_jobs(4, 1))
+    assigner._fill_lanes_unlocked()
+
+    assert len(lanes["busy"].queue) != 0
+    assert abs(lanes["busy"].get_drain_time() - lanes["idle"].get_drain_time()) <= 0.5
+
+
+def test_fill_stops_at_lane_target(assigner, monkeypatch) -> None:
+    monkeypatch.setattr(SettingsLoader().get_settings(), "job_assign_horizon", 0.0)
+    lanes = _add_lanes(assigner, StubWorker("single", 2))
+    assigner._pending.extend(_create_jobs(10, 1))
+
+    assigner._fill_lanes_unlocked()
+
+    # Target is two games per core when the horizon asks for less
+    assert lanes["single"].queued_games == 4
+    assert len(assigner._pending) == 6
+
+
+def test_thief_steals_only_when_finishing_sooner(assigner) -> None:
+    lanes = _add_lanes(assigner, StubWorker("victim", 2, games_per_s=2, inflight_games=2),
+                       StubWorker("slow", 1, games_per_s=0.1))
+    jobs = _create_jobs(2, 2)
+    for job in jobs:
+        lanes["victim"].push(job)
+
+    # Victim drains in 3s, the slow thief would need 20s for the last job
+    assigner._steal_unlocked()
+    assert list(lanes["victim"].queue) == jobs
+    assert len(lanes["slow"].queue) == 0
+
+    # Fast thief plays it in half a second, it takes the job from the back
+    lanes.update(_add_lanes(assigner, StubWorker("fast", 4, games_per_s=4)))
+    assigner._steal_unlocked()
+
+    assert list(lanes["victim"].queue) == jobs[:1]
+    assert list(lanes["fast"].queue) == jobs[1:]
+
+
+def test_jobs_are_requeued_when_lane_closes(assigner, monkeypatch) -> None:
+    gone = StubWorker("gone", 2, state=WorkerState.REGISTERED)
+    kept = StubWorker("kept", 2)
+    monkeypatch.setattr(ManagerComponents(), "get_worker_mgr",
+                        lambda: SimpleNamespace(get_workers=lambda: [gone, kept]))
+
+    lanes = _add_lanes(assigner, gone, kept)
+    gone_jobs = _create_jobs(2, 1)
+    kept_jobs = _create_jobs(1, 1)
+    pending = _create_jobs(1, 1)
+
+    for job in gone_jobs:
+        lanes["gone"].push(job)
+    lanes["kept"].push(kept_jobs[0])
+    assigner._pending.extend(pending)
+
+    assigner._sync_lanes_unlocked()
+
+    # Requeued jobs keep their order and go before jobs that were never assigned
+    assert list(assigner._lanes.keys()) == ["kept"]
+    assert list(assigner._pending) == gone_jobs + pending
+    assert list(assigner._lanes["kept"].queue) == kept_jobs
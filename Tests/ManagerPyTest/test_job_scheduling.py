@@ -0,0 +1,227 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.ManagerSettings import ManagerSettings
+from Manager.ManagerLib.TestJob import ModuleTestJobRequest
+from Manager.ManagerLib.WorkerMgr import WorkerMgr
+from Models.OrchestratorModels import JobState, TaskState
+from Models.WorkerModels import SocketMsgType, JobResultPayload, JobResultChunk, SocketMsg, JobAckPayload, \
+    TaskSetupPayload
+from Tests.ManagerPyTest.mocks.FakeWorker import SocketLoop, FakeSocket, connect_fake_worker, wait_until
+from Utils.SettingsLoader import SettingsLoader
+from Utils.WireCodec import JsonCodec
+from Worker.WorkerLib.ResultOutbox import ResultOutbox
+from Worker.WorkerLib.WorkerComponents import WorkerComponents
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+# Components are created per test, so workers of one test never pick up jobs of another
+# Worker side of the connection, sends fail while it is down
+class FlakyConnMgr:
+    sent: list[SocketMsg]
+    is_up: bool
+
+    def __init__(self) -> None:
+        self.sent = []
+        self.is_up = True
+
+    async def send_msg(self, msg: SocketMsg) -> None:
+        if not self.is_up:
+            raise ConnectionError("connection lost")
+        self.sent.append(msg)
+
+
+@pytest.fixture
+def socket_loop(logger, tmp_path_factory):
+    SettingsLoader(ManagerSettings, str(tmp_path_factory.mktemp("settings") / "settings.json"))
+    ManagerComponents().init_components()
+    loop = SocketLoop()
+    yield loop
+
+    ManagerComponents().destroy_components()
+    loop.destroy()
+    SettingsLoader().destroy()
+
+
+def test_silent_job_is_requeued_after_deadline(socket_loop, monkeypatch) -> None:
+    # Job carries no game time bound of its own, the manager setting is used
+    settings = SettingsLoader().get_settings()
+    monkeypatch.setattr(settings, "job_max_game_time_s", 0.2)
+    monkeypatch.setattr(settings, "job_deadline_slack", 1.0)
+    monkeypatch.setattr(settings, "job_deadline_grace_s", 0.0)
+
+    worker, socket = connect_fake_worker("silent-worker", 1, socket_loop)
+    job = ModuleTestJobRequest(1, 0, "{}", [1])
+    ManagerComponents().get_job_assigner().submit_jobs([job])
+
+    wait_until(lambda: len(socket.get_payloads(SocketMsgType.JOB)) >= 2)
+
+    assert job.get_failure_reasons()[0] == "Deadline exceeded"
+    assert {"job_ids": [job.get_id()]} in socket.get_payloads(SocketMsgType.CANCEL)
+
+    ManagerComponents().get_test_job_mgr().cancel_jobs([job])
+    assert job.get_state() == JobState.CANCELLED
+
+
+@pytest.mark.parametrize("winner", ["original", "duplicate"])
+def test_straggler_is_duplicated_once(socket_loop, monkeypatch, winner) -> None:
+    settings = SettingsLoader().get_settings()
+    monkeypatch.setattr(settings, "job_max_game_time_s", 0.0)
+    monkeypatch.setattr(settings, "job_assign_interval", 0.05)
+    job_mgr = ManagerComponents().get_test_job_mgr()
+
+    slow_worker, slow_socket = connect_fake_worker("slow-worker", 1, socket_loop)
+    job = ModuleTestJobRequest(1, 0, "{}", [1])
+    ManagerComponents().get_job_assigner().submit_jobs([job])
+    wait_until(lambda: job.get_state() == JobState.INFLIGHT)
+
+    # Fleet plays a game in 10ms, so the job quickly counts as a straggler
+    monkeypatch.setattr(slow_worker, "get_games_per_s", lambda: 100.0)
+    idle = [connect_fake_worker(f"idle-worker-{i}", 1, socket_loop) for i in range(2)]
+    wait_until(lambda: any(len(socket.get_payloads(SocketMsgType.JOB)) != 0 for _, socket in idle))
+
+    # Later assignment rounds must not duplicate the job again
+    time.sleep(0.3)
+    sent = [(worker, socket, payload) for worker, socket in idle for payload in socket.get_payloads(SocketMsgType.JOB)]
+    assert len(sent) == 1
+
+    duplicate_worker, duplicate_socket, payload = sent[0]
+    duplicate = job_mgr.get_job(payload["job_id"])
+    wait_until(lambda: duplicate.get_state() == JobState.INFLIGHT)
+
+    copies = [(slow_worker, slow_socket, job), (duplicate_worker, duplicate_socket, duplicate)]
+    if winner == "duplicate":
+        copies.reverse()
+    (finished_worker, _, finished), (_, other_socket, other) = copies
+
+    WorkerMgr._merge_result_chunks(finished_worker, JobResultPayload(chunks=[
+        JobResultChunk(job_id=finished.get_id(), seq=0, seeds=[1], results=["W"], done=True)]))
+
+    wait_until(lambda: other.get_state() == JobState.CANCELLED)
+    wait_until(lambda: finished.get_state() == JobState.HARDENED)
+    assert {"job_ids": [other.get_id()]} in other_socket.get_payloads(SocketMsgType.CANCEL)
+
+
+def test_deadline_racing_last_chunk_keeps_socket(socket_loop, monkeypatch) -> None:
+    job_mgr = ManagerComponents().get_test_job_mgr()
+    worker, socket = connect_fake_worker("racing-worker", 1, socket_loop)
+    job = ModuleTestJobRequest(1, 0, "{}", [1])
+    ManagerComponents().get_job_assigner().submit_jobs([job])
+    wait_until(lambda: job.get_state() == JobState.INFLIGHT)
+
+    # Deadline fires right after the last chunk is merged, before the job is marked completed
+    merge_result_chunk = job.merge_result_chunk
+    def merge_and_expire(*args) -> bool:
+        is_complete = merge_result_chunk(*args)
+        job_mgr.on_job_deadline(job, job.get_dispatch_count())
+        return is_complete
+    monkeypatch.setattr(job, "merge_result_chunk", merge_and_expire)
+
+    loop = asyncio.run_coroutine_threadsafe(
+        ManagerComponents().get_worker_mgr()._worker_socket_loop(worker, socket), socket_loop.loop)
+
+    # Malformed message is dropped, the next one is still handled on the same socket
+    socket.push_frame({"type": "websocket.receive", "text": SocketMsg(
+        type=SocketMsgType.RESULT, payload={"chunks": "broken"}).model_dump_json()}, socket_loop)
+    socket.push_frame({"type": "websocket.receive", "text": SocketMsg(
+        type=SocketMsgType.RESULT, payload=JobResultPayload(chunks=[JobResultChunk(
+            job_id=job.get_id(), seq=0, seeds=[1], results=["W"], done=True)]).model_dump()).model_dump_json()},
+        socket_loop)
+
+    wait_until(lambda: len(socket.get_payloads(SocketMsgType.ACK)) == 1)
+    assert socket.get_payloads(SocketMsgType.ACK)[0] == {"job_ids": [job.get_id()], "seqs": [0]}
+    assert job.get_failure_reasons() == ["Deadline exceeded"]
+    assert job.get_state() != JobState.COMPLETED
+
+    socket.push_frame({"type": "websocket.disconnect"}, socket_loop)
+    loop.result(5.0)
+
+
+def test_resent_results_are_merged_once(socket_loop, monkeypatch) -> None:
+    settings = SettingsLoader().get_settings()
+    monkeypatch.setattr(settings, "job_max_game_time_s", 0.0)
+
+    broadcaster = ManagerComponents().get_progress_broadcaster()
+    broadcaster.on_task_state(1, TaskState.SCHEDULED, 0)
+
+    worker, socket = connect_fake_worker("flaky-worker", 2, socket_loop)
+    job = ModuleTestJobRequest(1, 0, "{}", [1, 2])
+    ManagerComponents().get_job_assigner().submit_jobs([job])
+    wait_until(lambda: job.get_state() == JobState.INFLIGHT)
+
+    conn_mgr = FlakyConnMgr()
+    monkeypatch.setattr(WorkerComponents(), "_connection_mgr", conn_mgr)
+    outbox = ResultOutbox()
+
+    async def play_games() -> None:
+        # First game reaches the manager, but the connection drops before its ACK arrives
+        outbox.push(job.get_id(), [1], ["W"], [1.0])
+        await asyncio.sleep(0.01)
+        conn_mgr.is_up = False
+
+        outbox.push(job.get_id(), [2], ["D"], [1.0], done=True)
+        await asyncio.sleep(0.01)
+
+        conn_mgr.is_up = True
+        outbox.resend_unacked()
+        await asyncio.sleep(0.01)
+
+    asyncio.run(play_games())
+
+    assert [[chunk["seq"] for chunk in msg.payload["chunks"]] for msg in conn_mgr.sent] == [[0], [0, 1]]
+
+    for msg in conn_mgr.sent:
+        asyncio.run_coroutine_threadsafe(WorkerMgr._on_result_msg(worker, msg), socket_loop.loop).result(5.0)
+
+    wait_until(lambda: job.get_state() == JobState.HARDENED)
+    assert ManagerComponents().get_result_store().get_num_games() == 2
+
+    # Game of the resent chunk is not counted again
+    get_games_played = lambda: sum(task["games_played"] for task in json.loads(broadcaster.get_latest()[1])["tasks"])
+    wait_until(lambda: get_games_played() >= 2)
+    time.sleep(2 * settings.progress_interval_s)
+    assert get_games_played() == 2
+
+    # Duplicate chunk is acknowledged as well, so the worker drops everything
+    for payload in socket.get_payloads(SocketMsgType.ACK):
+        outbox.on_ack(JobAckPayload.model_validate(payload))
+    assert outbox.get_num_unacked() == 0
+
+
+def test_task_setup_is_sent_once_before_jobs(socket_loop, monkeypatch) -> None:
+    monkeypatch.setattr(SettingsLoader().get_settings(), "job_max_game_time_s", 0.0)
+    setup = TaskSetupPayload(task_id=1, module_name="StubModule", worker_init={}, worker_build_config={},
+                             worker_config={})
+    monkeypatch.setattr(ManagerComponents().get_test_task_mgr(), "get_worker_setup",
+                        lambda task_id: setup if task_id == 1 else None)
+
+    def get_sequence(socket: FakeSocket) -> list[tuple[SocketMsgType, int]]:
+        return [(msg.type, msg.payload["task_id"]) for msg in list(socket.msgs)
+                if msg.type in (SocketMsgType.SETUP, SocketMsgType.JOB)]
+
+    # One core stays free for the job sent after the reconnect
+    worker, socket = connect_fake_worker("setup-worker", 5, socket_loop)
+    jobs = [ModuleTestJobRequest(1, 0, "{}", [seed]) for seed in range(3)] + [ModuleTestJobRequest(2, 0, "{}", [0])]
+    ManagerComponents().get_job_assigner().submit_jobs(jobs)
+    wait_until(lambda: len(socket.get_payloads(SocketMsgType.JOB)) == 4)
+
+    # Task without a worker setup, e.g. an unknown one, gets none
+    sequence = get_sequence(socket)
+    assert sequence.count((SocketMsgType.SETUP, 1)) == 1
+    assert sequence.index((SocketMsgType.SETUP, 1)) < sequence.index((SocketMsgType.JOB, 1))
+    assert (SocketMsgType.SETUP, 2) not in sequence
+    assert socket.get_payloads(SocketMsgType.SETUP) == [setup.model_dump()]
+
+    # Reconnected worker may have been restarted in between, so it is set up again
+    worker.unset_conn_socket()
+    new_socket = FakeSocket()
+    worker.set_conn_socket(new_socket, JsonCodec(), socket_loop.loop)
+
+    ManagerComponents().get_job_assigner().submit_jobs([ModuleTestJobRequest(1, 0, "{}", [0])])
+    wait_until(lambda: len(new_socket.get_payloads(SocketMsgType.JOB)) == 1)
+    assert get_sequence(new_socket) == [(SocketMsgType.SETUP, 1), (SocketMsgType.JOB, 1)]
@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from Manager.ManagerLib.ManagerSettings import ManagerSettings
+from Manager.ManagerLib.TestJobMgr import TestJobMgr as JobMgr
+from Tests.ManagerPyTest.mocks.FakeWorker import wait_until
+from Utils.SettingsLoader import SettingsLoader
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+@pytest.fixture
+def job_mgr(logger, tmp_path, monkeypatch):
+    SettingsLoader(ManagerSettings, str(tmp_path / "settings.json"))
+    settings = SettingsLoader().get_settings()
+    monkeypatch.setattr(settings, "job_threads", 2)
+    monkeypatch.setattr(settings, "job_threads_max", 16)
+    monkeypatch.setattr(settings, "job_autoscale_interval", 60.0)
+
+    job_mgr = JobMgr()
+    yield job_mgr
+
+    job_mgr.destroy()
+    SettingsLoader().destroy()
+
+
+def test_unchanged_job_threads_keep_autoscaled_pool(job_mgr) -> None:
+    # Pool grown by the autoscaler during a burst
+    job_mgr._resize_pool(6)
+
+    # Settings reload with the same job_threads leaves the pool alone
+    job_mgr.update_thread_count(2)
+    time.sleep(0.1)
+    assert job_mgr.get_worker_thread_count() == 6
+
+    # Lower base is reached gently, one thread per autoscaler tick
+    job_mgr.update_thread_count(3)
+    wait_until(lambda: job_mgr.get_worker_thread_count() == 5)
+    time.sleep(0.1)
+    assert job_mgr.get_worker_thread_count() == 5
+
+    # Higher base is applied at once
+    job_mgr.update_thread_count(8)
+    wait_until(lambda: job_mgr.get_worker_thread_count() == 8)
+
+
+def test_job_threads_resize_pool_without_autoscale(job_mgr, monkeypatch) -> None:
+    monkeypatch.setattr(SettingsLoader().get_settings(), "job_autoscale", False)
+    job_mgr._resize_pool(6)
+
+    job_mgr.update_thread_count(2)
+    assert job_mgr.get_worker_thread_count() == 6
+
+    job_mgr.update_thread_count(4)
+    assert job_mgr.get_worker_thread_count() == 4
@@ -0,0 +1,44 @@
+import threading
+import time
+
+from Utils.Metrics import Counter, Histogram, Gauge
+from Utils.RWLock import BaseRWLockWrapper, LOCK_WAIT_SECONDS
+
+
+def test_metrics_render_in_text_format() -> None:
+    counter = Counter("jobs_total", "Jobs", ("task",))
+    counter.inc(labels=("1",))
+    counter.inc(2, labels=("1",))
+
+    histogram = Histogram("run_seconds", "Run time", buckets=(1, 10))
+    for value in (0.5, 1, 5, 100):
+        histogram.observe(value)
+
+    gauge = Gauge("depth", "Depth", ("state",), lambda: {("a\"b",): 4})
+
+    assert counter.render() == ["# HELP jobs_total Jobs", "# TYPE jobs_total counter", 'jobs_total{task="1"} 3']
+    assert histogram.render()[2:] == ['run_seconds_bucket{le="1"} 2', 'run_seconds_bucket{le="10"} 3',
+                                      'run_seconds_bucket{le="+Inf"} 4', "run_seconds_sum 106.5", "run_seconds_count 4"]
+    assert gauge.render()[2:] == ['depth{state="a\\"b"} 4']
+
+
+def test_only_contended_locks_are_timed() -> None:
+    lock = BaseRWLockWrapper()
+    waits = LOCK_WAIT_SECONDS.get_count(("write",))
+
+    with lock.write():
+        pass
+    assert LOCK_WAIT_SECONDS.get_count(("write",)) == waits
+
+    def contend() -> None:
+        with lock.write():
+            pass
+
+    with lock.write():
+        thread = threading.Thread(target=contend)
+        thread.start()
+        time.sleep(0.05)
+
+    thread.join()
+    assert LOCK_WAIT_SECONDS.get_count(("write",)) == waits + 1
+    assert LOCK_WAIT_SECONDS.get_sum(("write",)) >= 0.04
@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+
+import pydantic
+import pytest
+
+from Models.OrchestratorModels import UiType
+from Modules.ModuleHelpers import build_config_spec_element
+from Modules.ModuleMgr import ModuleMgr
+
+
+def test_specs_are_cached_and_frozen() -> None:
+    builder = ModuleMgr().get_module_worker_part("BaseChessModule")
+    assert builder is ModuleMgr().get_module_worker_part("BaseChessModule")
+
+    init_config = {}
+    while (needed := builder.get_next_submodule_needed(init_config)) is not None:
+        assert needed is builder.get_next_submodule_needed(dict(init_config))
+        init_config[needed.name] = needed.default_value[:1]
+
+    config_spec = builder.get_config_spec(init_config)
+    assert len(config_spec) > 0
+
+    # Key order does not matter and callers only get copies of the cached lists
+    config_spec.clear()
+    cached_spec = builder.get_config_spec(dict(reversed(init_config.items())))
+    assert len(cached_spec) > 0
+    assert all(a is b for a, b in zip(cached_spec, builder.get_config_spec(init_config)))
+
+    with pytest.raises(pydantic.ValidationError):
+        cached_spec[0].name = "changed"
+
+
+def test_default_value_is_validated() -> None:
+    element = build_config_spec_element("Module", "var", "", UiType.StringList, ["a"], True)
+    assert element.default_value == ["a"]
+
+    with pytest.raises(ValueError):
+        build_config_spec_element("Module", "var", "", UiType.StringList, "a", True)
+
+
+def test_modules_are_imported_lazily() -> None:
+    script = ("import sys\n"
+              "from Modules.SubModuleMgr import SubModuleMgr\n"
+              "name = 'Modules.Submodules.ChessTournamentModules.CuteChessModule'\n"
+              "assert 'CuteChess' in SubModuleMgr().get_all_submodules()['BaseChessTournamentModule']\n"
+              "assert name not in sys.modules and 'Models.OrchestratorModels' not in sys.modules\n"
+              "SubModuleMgr().get_submodule('BaseChessTournamentModule', 'CuteChess')\n"
+              "assert name in sys.modules\n")
+
+    repo_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=repo_root)
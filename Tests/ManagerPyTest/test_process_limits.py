@@ -0,0 +1,115 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+import Utils.ProcessLimits
+from Utils.ProcessLimits import ProcessLimits, get_usable_cores, run_limited, create_memory_cgroups
+from Worker.WorkerLib.CoreAllocator import CoreAllocator
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def test_limits_are_inherited_by_game_processes() -> None:
+    core = get_usable_cores()[-1]
+    limits = ProcessLimits(cores=(core,), memory_mb=256)
+    script = ("import os\n"
+              "print(sorted(os.sched_getaffinity(0)))\n"
+              "try:\n"
+              "    bytearray(512 * 1024 * 1024)\n"
+              "except MemoryError:\n"
+              "    print('limited')\n")
+
+    returncode, output = asyncio.run(run_limited(["/bin/sh", "-c", f"{sys.executable} -c \"{script}\""], limits))
+    assert returncode == 0
+    assert output.decode().split("\n")[:2] == [str([core]), "limited"]
+
+
+def test_cancelled_game_is_killed_with_engines(tmp_path) -> None:
+    pid_file = tmp_path / "engine.pid"
+
+    async def play() -> None:
+        game = asyncio.create_task(run_limited(["/bin/sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], None))
+
+        while not pid_file.exists() or pid_file.read_text() == "":
+            await asyncio.sleep(0.01)
+
+        game.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(game, 5)
+
+        # Orphaned engine is killed as well, at most a zombie waiting for its new parent is left
+        stat_path = f"/proc/{int(pid_file.read_text())}/stat"
+        await asyncio.sleep(0.1)
+        assert not os.path.exists(stat_path) or open(stat_path).read().split(")")[-1].split()[0] == "Z"
+
+    asyncio.run(play())
+
+
+def test_allocator_assigns_dedicated_cores() -> None:
+    async def play() -> list[ProcessLimits]:
+        allocator = CoreAllocator(2, 1024, True, False)
+        assert allocator.is_matching(2, 1024) and not allocator.is_matching(4, 1024)
+
+        async with allocator.acquire() as first, allocator.acquire() as second:
+            # Third game waits until a slot is released
+            with pytest.raises(TimeoutError):
+                async with asyncio.timeout(0.05):
+                    async with allocator.acquire():
+                        pass
+
+        allocator.destroy()
+        return [first, second]
+
+    slots = asyncio.run(play())
+    cores = get_usable_cores()
+
+    assert [slot.memory_mb for slot in slots] == [0, 0]
+
+    # Default memoryMB split between two games is too small to cap, games run without a limit instead of failing
+    async def acquire_small() -> ProcessLimits:
+        allocator = CoreAllocator(2, 128, False, True)
+        async with allocator.acquire() as slot:
+            allocator.destroy()
+            return slot
+
+    assert asyncio.run(acquire_small()).memory_mb == 0
+    if len(cores) >= 2:
+        assert sorted(slot.cores for slot in slots) == [(cores[-2],), (cores[-1],)]
+
+
+# Plain directories stand in for cgroupfs, writes to its control files are only recorded
+@pytest.fixture
+def cgroup_base(tmp_path, monkeypatch):
+    proc_cgroup = tmp_path / "proc_cgroup"
+    proc_cgroup.write_text("0::/worker.service\n")
+    base = tmp_path / "cgroup" / "worker.service"
+    base.mkdir(parents=True)
+    (base / "cgroup.controllers").write_text("cpu memory")
+    (base / "cgroup.subtree_control").write_text("")
+
+    monkeypatch.setattr(Utils.ProcessLimits, "PROC_CGROUP_PATH", str(proc_cgroup))
+    monkeypatch.setattr(Utils.ProcessLimits, "CGROUP_ROOT", str(tmp_path / "cgroup"))
+    return base
+
+
+def test_memory_cgroups_are_created(cgroup_base) -> None:
+    paths = create_memory_cgroups(["game-0", "game-1"], 256)
+
+    assert paths == [str(cgroup_base / "game-0"), str(cgroup_base / "game-1")]
+    assert (cgroup_base / "worker" / "cgroup.procs").read_text() == str(os.getpid())
+    assert (cgroup_base / "cgroup.subtree_control").read_text() == "+memory"
+    assert (cgroup_base / "game-1" / "memory.max").read_text() == str(256 * 1024 * 1024)
+
+
+def test_failed_cgroup_setup_is_rolled_back(cgroup_base) -> None:
+    # Limit of the second game can not be written
+    (cgroup_base / "game-1" / "memory.max").mkdir(parents=True)
+
+    assert create_memory_cgroups(["game-0", "game-1"], 256) == []
+
+    # Controller is disabled again and the worker moved back to where it started
+    assert (cgroup_base / "cgroup.subtree_control").read_text() == "-memory"
+    assert (cgroup_base / "cgroup.procs").read_text() == str(os.getpid())
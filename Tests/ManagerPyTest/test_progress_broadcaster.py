@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from Manager.Api.Orchestrator import _progress_events
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.ProgressBroadcaster import ProgressBroadcaster
+from Models.OrchestratorModels import TaskState
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+# Broadcaster is served through the same SSE generator the endpoint streams
+@pytest.fixture
+def broadcaster(monkeypatch):
+    broadcaster = ProgressBroadcaster(0.05)
+    monkeypatch.setattr(ManagerComponents(), "_progress_broadcaster", broadcaster)
+    yield broadcaster
+    broadcaster.destroy()
+
+
+async def next_event(stream, timeout: float = 5.0) -> dict:
+    chunk = await asyncio.wait_for(anext(stream), timeout)
+    return json.loads(chunk.split("data: ")[1])
+
+
+def test_updates_are_coalesced_into_versions(broadcaster) -> None:
+    async def run() -> None:
+        stream = _progress_events()
+        assert (await next_event(stream))["version"] == 0
+
+        broadcaster.on_task_state(3, TaskState.READY, 4)
+        broadcaster.on_task_state(3, TaskState.SCHEDULED, 5)
+        for _ in range(10):
+            broadcaster.on_games(3, 2)
+
+        event = await next_event(stream)
+        assert event["version"] >= 1
+        assert event["tasks"][0]["state"] == TaskState.SCHEDULED
+        assert event["tasks"][0]["gen_num"] == 5
+        assert event["tasks"][0]["games_played"] == 20
+
+        # Throughput drops back to zero once, then nothing is published without new updates
+        assert (await next_event(stream))["tasks"][0]["games_per_s"] == 0
+        with pytest.raises(asyncio.TimeoutError):
+            await next_event(stream, 0.2)
+
+    asyncio.run(run())
+
+    broadcaster.destroy()
+    assert not broadcaster.is_running()
+
+
+def test_best_params_follow_hardened_results(broadcaster, monkeypatch) -> None:
+    best = {3: ("a", 0.5)}
+    monkeypatch.setattr(ProgressBroadcaster, "_get_best_params", staticmethod(lambda task_id, gen_num: best[task_id]))
+
+    async def run() -> None:
+        stream = _progress_events()
+        await next_event(stream)
+
+        broadcaster.on_task_state(3, TaskState.SCHEDULED, 1)
+        broadcaster.on_games(3, 2)
+        event = await next_event(stream)
+        while event["tasks"][0]["best_params"] is None:
+            event = await next_event(stream)
+        assert event["tasks"][0]["best_params"] == "a"
+
+        # Last batch of the task hardens after all of its games were counted
+        while event["tasks"][0]["games_per_s"] != 0:
+            event = await next_event(stream)
+        best[3] = ("b", 0.75)
+        broadcaster.on_results_hardened(3)
+
+        event = await next_event(stream)
+        assert (event["tasks"][0]["best_params"], event["tasks"][0]["best_score"]) == ("b", 0.75)
+        await stream.aclose()
+
+    asyncio.run(run())
+
+
+def test_loop_subscribers_are_woken_on_publish(broadcaster) -> None:
+    async def wait_for_event() -> tuple[int, str]:
+        update = asyncio.Event()
+        broadcaster.subscribe(asyncio.get_running_loop(), update)
+
+        try:
+            broadcaster.on_task_state(7, TaskState.READY, 1)
+            await asyncio.wait_for(update.wait(), 5.0)
+            return broadcaster.get_latest()
+        finally:
+            broadcaster.unsubscribe(update)
+
+    version, payload = asyncio.run(wait_for_event())
+
+    assert version >= 1
+    assert json.loads(payload)["tasks"][0]["task_id"] == 7
@@ -0,0 +1,49 @@
+import subprocess
+import sys
+
+import pytest
+
+from Manager.ManagerLib.Worker import Worker
+from Models.WorkerModels import WorkerModel, WorkerResources
+from Worker.WorkerLib.ResourceSampler import ResourceSampler
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def test_sampler_counts_engine_processes() -> None:
+    sampler = ResourceSampler(60, 2)
+    engine = subprocess.Popen([sys.executable, "-c", "while True: pass"])
+
+    try:
+        for _ in range(3):
+            sample = sampler.take_sample()
+    finally:
+        engine.kill()
+        engine.wait()
+        sampler.destroy()
+
+    assert sample.engine_processes == 1
+    assert sample.engines_rss_mb > 0 and sample.process_rss_mb > 0
+    assert len(sampler.get_samples()) == 2
+    assert sampler.get_average(60).engine_processes == 1
+
+
+def test_available_cpus_exclude_foreign_load() -> None:
+    worker = Worker(WorkerModel(name="w", version=0, cpus=6, memoryMB=1024))
+    assert worker.get_available_cpus() == 6
+
+    def report(system_cpu_percent: float, cpu_percent: float) -> None:
+        worker.bump_activity(resources=WorkerResources(cpu_percent=cpu_percent, rss_mb=100, engine_processes=2,
+                                                       system_cpu_percent=system_cpu_percent,
+                                                       system_available_mb=1000, load_avg=1, host_cpus=8))
+
+    # Busy cores used by the worker's own engines stay available
+    report(600, 590)
+    assert worker.get_available_cpus() == 6
+
+    report(700, 200)
+    assert worker.get_available_cpus() == 3
+
+    report(800, 0)
+    assert worker.get_available_cpus() == 1
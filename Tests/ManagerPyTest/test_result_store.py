@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from Manager.ManagerLib.ResultStore import ResultStore
+from Manager.ManagerLib.StateStore import GameRecord
+from Tests.ManagerPyTest.mocks.FakeWorker import wait_until
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def games(results: str, worker: str = "w1") -> list[GameRecord]:
+    return [GameRecord(result=result, duration_s=2.0, worker=worker) for result in results]
+
+
+def test_aggregation_by_opponent_and_params(tmp_path) -> None:
+    store = ResultStore()
+    store.append_games(0, 1, 1, '{"a": "1"}', "stockfish", [0, 1, 2, 3], [0, 1, 0, 1], games("WWDL"))
+    store.append_games(0, 1, 2, '{"a": "2"}', "stockfish", [0, 1], [0, 1], games("LL", "w2"))
+    store.append_games(0, 1, 3, '{"a": "1"}', "ethereal", list(range(2000)), [0] * 2000, games("WD" * 1000))
+    store.append_games(1, 1, 4, '{"a": "1"}', "ethereal", [0, 1], [0, 1], games("WW"))
+
+    assert store.get_num_games() == 2008
+
+    by_opponent = {row.key: row for row in store.aggregate("opponent", task_id=0)}
+    assert (by_opponent["stockfish"].wins, by_opponent["stockfish"].draws, by_opponent["stockfish"].losses) == (2, 1, 3)
+    assert by_opponent["ethereal"].score == 0.75
+    assert by_opponent["ethereal"].elo == pytest.approx(190.85, abs=0.01)
+    assert by_opponent["ethereal"].mean_duration_s == 2.0
+    assert by_opponent["ethereal"].pentanomial == [0, 0, 0, 1000, 0]
+    assert by_opponent["stockfish"].pentanomial == [1, 1, 0, 0, 1]
+
+    by_params = {row.key: row.score for row in store.aggregate("params", opponent="stockfish")}
+    assert by_params == {'{"a": "1"}': 0.625, '{"a": "2"}': 0.0}
+
+    with pytest.raises(ValueError):
+        store.aggregate("result")
+
+    path = str(tmp_path / "results.npz")
+    saved = ResultStore(path)
+    saved.append_games(3, 0, 5, "", "stockfish", [0, 1], [0, 1], games("DW", "w3"))
+    saved.destroy()
+
+    loaded = ResultStore(path)
+    assert [(row.key, row.score) for row in loaded.aggregate("worker")] == [("w3", 0.75)]
+    loaded.destroy()
+
+
+def load_num_games(path: str) -> int:
+    loaded = ResultStore(path)
+    loaded.destroy()
+    return loaded.get_num_games()
+
+
+def test_new_games_are_saved_on_interval(tmp_path) -> None:
+    path = str(tmp_path / "results.npz")
+    store = ResultStore(path, 0.05)
+
+    try:
+        store.append_games(0, 1, 1, "", "stockfish", [0, 1], [0, 1], games("WD"))
+        wait_until(lambda: os.path.isfile(path))
+
+        # Saved file is complete without a clean shutdown
+        assert load_num_games(path) == 2
+
+        store.append_games(0, 1, 2, "", "stockfish", [0, 1], [0, 1], games("LL"))
+        wait_until(lambda: load_num_games(path) == 4)
+    finally:
+        store.destroy()
+
+    assert not os.path.exists(f"{path}.tmp")
@@ -0,0 +1,101 @@
+import os
+import time
+from threading import Thread
+
+import pytest
+
+from Manager.ManagerLib.ManagerSettings import ManagerSettings
+from Tests.ManagerPyTest.mocks.FakeWorker import wait_until
+from Utils.FileWatcher import InotifyFileWatcher, PollingFileWatcher, create_file_watcher
+from Utils.SettingsLoader import SettingsLoader
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def _touch(path: str) -> None:
+    with open(path, "a"):
+        pass
+
+    # Polling watchers compare mtimes, so the touch has to move it
+    now = time.time() + 1
+    os.utime(path, (now, now))
+
+
+@pytest.mark.parametrize("make_watcher", [InotifyFileWatcher, lambda path: PollingFileWatcher(path, 0.01)])
+def test_touch_fires_single_change(tmp_path, make_watcher) -> None:
+    path = str(tmp_path / "settings.json")
+    _touch(path)
+    watcher = make_watcher(path)
+
+    try:
+        _touch(path)
+        assert watcher.wait_for_change(5.0)
+
+        # The burst of a single touch is consumed by one wakeup
+        assert not watcher.wait_for_change(0.2)
+    finally:
+        watcher.close()
+
+
+def test_close_wakes_waiter_and_releases_fds(tmp_path) -> None:
+    watcher = InotifyFileWatcher(str(tmp_path / "settings.json"))
+    results = []
+    waiter = Thread(target=lambda: results.append(watcher.wait_for_change(None)))
+    waiter.start()
+
+    time.sleep(0.1)
+    watcher.close()
+    waiter.join(5.0)
+
+    assert results == [False]
+    assert watcher._inotify_fd == watcher._wake_read_fd == watcher._wake_write_fd == -1
+
+    # Closing again or waiting after close touches no descriptor
+    watcher.close()
+    assert not watcher.wait_for_change(0.1)
+
+
+def test_close_without_waiter_releases_fds(tmp_path) -> None:
+    watcher = create_file_watcher(str(tmp_path / "settings.json"), 0.01)
+    watcher.close()
+
+    if isinstance(watcher, InotifyFileWatcher):
+        assert watcher._inotify_fd == watcher._wake_read_fd == watcher._wake_write_fd == -1
+    assert not watcher.wait_for_change(0.1)
+
+
+def test_debounced_reload_fires_single_event(tmp_path) -> None:
+    path = str(tmp_path / "settings.json")
+    content = ManagerSettings(job_threads=5).model_dump_json(indent=2)
+    with open(path, "w") as f:
+        f.write(content)
+    mtime_ns = os.stat(path).st_mtime_ns
+
+    SettingsLoader(ManagerSettings, path, debounce_s=0.2, poll_interval_s=0.01)
+    events = []
+
+    try:
+        # Complete file is not rewritten on load
+        assert os.stat(path).st_mtime_ns == mtime_ns
+        SettingsLoader().add_event(lambda settings: events.append(settings.job_threads))
+
+        # Plain touch or writing the same bytes again does not change the content, so nothing is reloaded
+        _touch(path)
+        with open(path, "w") as f:
+            f.write(content)
+        time.sleep(0.5)
+        assert events == []
+
+        # Editors write in bursts, the loader waits for the file to be quiet
+        settings = ManagerSettings(job_threads=3)
+        for _ in range(5):
+            with open(path, "w") as f:
+                f.write(settings.model_dump_json(indent=2))
+            time.sleep(0.02)
+
+        wait_until(lambda: len(events) > 0)
+        time.sleep(0.5)
+    finally:
+        SettingsLoader().destroy()
+
+    assert events == [3]
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from threading import Thread, Lock
+
+import pytest
+
+from Worker.WorkerLib.ControlProtocol import ControlClient
+from Worker.WorkerLib.ControlServer import ControlServer
+from Worker.WorkerLib.FastCli import is_fast_path_possible, fast_forward_commands
+from Worker.WorkerLib.WorkerProcess import WorkerProcess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def test_fast_path_selection() -> None:
+    assert is_fast_path_possible(["--query_worker_state"])
+    assert is_fast_path_possible(["--connect", "host=localhost", "--set_log_level", "level=1"])
+    assert not is_fast_path_possible([])
+    assert not is_fast_path_possible(["--query_worker_state", "--help"])
+    assert not is_fast_path_possible(["--deploy"])
+    assert not is_fast_path_possible(["--monitor", "interval=2"])
+
+
+def test_control_channel(tmp_path, capsys) -> None:
+    def handler(args: list[str]) -> str:
+        if args[0] == "--fail":
+            raise Exception("failed")
+        return f"{len(args)}:{len(''.join(args))}"
+
+    socket_path = str(tmp_path / "worker.sock")
+    server = ControlServer(socket_path, handler)
+    thread = Thread(target=asyncio.run, args=(server.serve(),))
+    thread.start()
+
+    while not os.path.exists(socket_path):
+        time.sleep(0.01)
+
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(json.dumps({"control_socket_path": socket_path}))
+
+    # Payloads much larger than a single socket read
+    rv = fast_forward_commands(["--connect", "x" * 100000, "--query_worker_state"], str(settings_path))
+    assert rv == 0
+    assert capsys.readouterr().out.count("received response:\n\n") == 2
+
+    with ControlClient(socket_path) as client:
+        with pytest.raises(Exception, match="failed"):
+            client.request(["--fail"])
+
+        stream = client.stream(["--query_worker_state"], 0.01)
+        assert [next(stream) for _ in range(3)] == ["1:20"] * 3
+        stream.close()
+
+        assert client.request(["--a", "b"]) == "2:4"
+
+    server.stop()
+    thread.join()
+    assert not os.path.exists(socket_path)
+
+
+def test_state_changing_commands_are_serialized(monkeypatch) -> None:
+    lock = Lock()
+    running = {"state": 0, "all": 0}
+    peaks = {"state": 0, "all": 0}
+
+    def execute(args: list[str]) -> str:
+        is_state = args[0] != "--query_worker_state"
+
+        with lock:
+            running["state"] += is_state
+            running["all"] += 1
+            peaks["state"] = max(peaks["state"], running["state"])
+            peaks["all"] = max(peaks["all"], running["all"])
+
+        time.sleep(0.1)
+
+        with lock:
+            running["state"] -= is_state
+            running["all"] -= 1
+        return ""
+
+    monkeypatch.setattr(WorkerProcess, "_execute_cli_command", staticmethod(execute))
+
+    commands = [["--connect", "host=localhost"], ["--unregister"], ["--switch_jobs_block"],
+                ["--query_worker_state"], ["--query_worker_state"]]
+    threads = [Thread(target=WorkerProcess._process_cli_command, args=(args,)) for args in commands]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Queries overlap with the state changing command holding the lock
+    assert peaks["state"] == 1
+    assert peaks["all"] >= 2
+
+
+def test_profiled_cli_skips_heavy_imports() -> None:
+    script = ("import sys\n"
+              "from Utils.StartupProfiler import start_startup_profiler, StartupProfiler\n"
+              "args = start_startup_profiler(['--query_worker_state', '--profile-startup'])\n"
+              "assert args == ['--query_worker_state'] and StartupProfiler().is_enabled()\n"
+              "from Worker.main_cli import main_cli\n"
+              "assert 'pydantic' not in sys.modules and 'psutil' not in sys.modules\n"
+              "report = StartupProfiler().get_report()\n"
+              "assert 'Worker.WorkerLib.FastCli' in report\n")
+
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=REPO_ROOT)
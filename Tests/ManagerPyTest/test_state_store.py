@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from Manager.ManagerLib.ManagerComponents import ManagerComponents
+from Manager.ManagerLib.ManagerSettings import ManagerSettings
+from Manager.ManagerLib.ResultStore import ResultStore
+from Manager.ManagerLib.StateStore import StateStore, JobRecord, GameRecord
+from Manager.ManagerLib.TestJob import ModuleTestJobRequest
+from Manager.ManagerLib.TestTaskMgr import TestTaskSnapshot as TaskSnapshot
+from Models.OrchestratorModels import JobState, TaskState
+from Utils.SettingsLoader import SettingsLoader
+
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+def make_record(job_id: int, state: JobState = JobState.CREATED) -> JobRecord:
+    return JobRecord(job_id=job_id, task_id=1, task_gen_num=4, state=state, arg_str="{}", seeds=[10, 11, 12],
+                     max_game_time_s=5.0, failure_reasons=["lost worker"])
+
+
+def test_jobs_and_results_survive_reopen(tmp_path) -> None:
+    path = str(tmp_path / "state.db")
+
+    store = StateStore(path)
+    store.save_jobs([make_record(7), make_record(8), make_record(9)])
+    store.save_results(7, {10: GameRecord("W", 1.5, "w1"), 12: GameRecord("D", 2.0, "w1")})
+    store.save_results(7, {10: GameRecord("L", 1.0, "w2")})
+    store.save_results(8, {seed: GameRecord("W", 1.0, "w2") for seed in [10, 11, 12]})
+    store.delete_jobs([9])
+    store.flush()
+    store.destroy()
+
+    store = StateStore(path)
+    records, results = store.load_jobs()
+    store.destroy()
+
+    assert [record.job_id for record in records] == [7, 8]
+    assert records[0] == make_record(7)
+    assert results[7] == {10: GameRecord("W", 1.5, "w1"), 12: GameRecord("D", 2.0, "w1")}
+    assert len(results[8]) == 3
+
+    # Only the missing game is played again
+    job = ModuleTestJobRequest.from_record(records[0], results[7])
+    assert job.get_id() == 7
+    assert job.get_state() == JobState.CREATED
+    assert job.get_num_games() == 1
+    assert job.get_failure_counter() == 1
+
+    job = ModuleTestJobRequest.from_record(records[1], results[8])
+    assert job.get_state() == JobState.COMPLETED
+    assert ModuleTestJobRequest(1, 4, "{}", [1]).get_id() > 8
+
+
+def test_disabled_store_drops_writes() -> None:
+    store = StateStore("")
+    store.save_jobs([make_record(1)])
+    store.flush()
+
+    assert not store.is_enabled()
+    assert store.load_jobs() == ([], {})
+    store.destroy()
+
+
+def test_failed_task_restore_keeps_stored_snapshot(tmp_path) -> None:
+    path = str(tmp_path / "state.db")
+
+    # Build config the module can not be built with, so the replay stops at the build step
+    store = StateStore(path)
+    store.save_task(5, TaskSnapshot(task_id=5, task_name="broken", task_description="", module_name="BaseChessModule",
+                                    state=TaskState.BUILT, gen_num=3, worker_init={}, manager_init={},
+                                    worker_build_config={"unknown": 1}, manager_build_config={}))
+    store.flush()
+    stored = store.load_tasks()
+    store.destroy()
+
+    settings_path = tmp_path / "settings.json"
+    settings_path.write_text(ManagerSettings(state_store_path=path).model_dump_json())
+    SettingsLoader(ManagerSettings, str(settings_path))
+    ManagerComponents().init_components()
+
+    try:
+        assert ManagerComponents().get_test_task_mgr().get_task_query(5).minimal_query.task_state != TaskState.BUILT
+    finally:
+        ManagerComponents().destroy_components()
+        SettingsLoader().destroy()
+
+    store = StateStore(path)
+    tasks = store.load_tasks()
+    store.destroy()
+
+    assert tasks == stored
+
+
+def test_hardened_games_survive_crash(tmp_path, monkeypatch) -> None:
+    SettingsLoader(ManagerSettings, str(tmp_path / "settings.json"))
+    monkeypatch.setattr(SettingsLoader().get_settings(), "state_store_path", str(tmp_path / "state.db"))
+    monkeypatch.setattr(SettingsLoader().get_settings(), "result_store_path", str(tmp_path / "results.npz"))
+
+    def restart() -> None:
+        ManagerComponents().destroy_components()
+        ManagerComponents().init_components()
+
+    ManagerComponents().init_components()
+    try:
+        games = {seed: GameRecord("W", 1.0, "w1") for seed in [10, 11, 12]}
+        ManagerComponents().get_state_store().save_results(3, games)
+        job = ModuleTestJobRequest.from_record(make_record(3, JobState.COMPLETED), games)
+        asyncio.run(job._process_completed_unlocked())
+        ManagerComponents().get_state_store().flush()
+
+        # Manager dies before the result store is ever saved, even after the task generation is dropped
+        for _ in range(2):
+            with monkeypatch.context() as patch:
+                patch.setattr(ResultStore, "_save", lambda self: None)
+                restart()
+
+            assert ManagerComponents().get_result_store().get_num_games() == 3
+            assert ManagerComponents().get_result_store().get_job_ids() == {3}
+            ManagerComponents().get_state_store().delete_task_jobs(1, 4)
+
+        # Once the snapshot holds the games, the state store lets them go and nothing is appended twice
+        restart()
+        assert ManagerComponents().get_result_store().get_num_games() == 3
+        assert ManagerComponents().get_state_store().load_jobs() == ([], {})
+    finally:
+        ManagerComponents().destroy_components()
+        SettingsLoader().destroy()
@@ -0,0 +1,43 @@
+from Models.WorkerModels import SocketMsg, SocketMsgType
+from Utils.WireCodec import BinaryCodec, JsonCodec, WireCodec, negotiate_protocol, BINARY_PROTOCOL, JSON_PROTOCOL
+
+MSGS = [
+    SocketMsg(type=SocketMsgType.KA, payload={"progress": [{"job_id": 1, "games_done": 2, "games_total": 8}]}),
+    SocketMsg(type=SocketMsgType.KA, payload={"progress": [], "resources": {
+        "cpu_percent": 150.5, "rss_mb": 812.25, "engine_processes": 4, "system_cpu_percent": 375.0,
+        "system_available_mb": 2048.5, "load_avg": 3.5, "host_cpus": 8}}),
+    SocketMsg(type=SocketMsgType.JOB, payload={"job_id": 3, "task_id": 1, "arg_str": "{}", "seeds": [10, 11, 12]}),
+    SocketMsg(type=SocketMsgType.JOB, payload={"job_id": 4, "task_id": 1, "arg_str": "", "seeds": [7, 2]}),
+    SocketMsg(type=SocketMsgType.RESULT, payload={"chunks": [
+        {"job_id": 3, "seq": 0, "seeds": [10, 12], "results": ["W", "D"], "durations": [12.5, 0.25], "error": "",
+         "done": False},
+        {"job_id": 4, "seq": 2, "seeds": [], "results": [], "durations": [], "error": "failed", "done": True},
+    ]}),
+    # Free text results may hold the separators of any joined encoding
+    SocketMsg(type=SocketMsgType.RESULT, payload={"chunks": [
+        {"job_id": 5, "seq": 1, "seeds": [1, 2, 3], "results": ["W", "", "engine crashed\nstack:\n  main"],
+         "durations": [1.0, 2.0, 3.0], "error": "", "done": False},
+        {"job_id": 6, "seq": 0, "seeds": [], "results": [], "durations": [], "error": "build\nfailed", "done": True},
+    ]}),
+    SocketMsg(type=SocketMsgType.ACK, payload={"job_ids": [3, 4], "seqs": [0, 2]}),
+    SocketMsg(type=SocketMsgType.CANCEL, payload={"job_ids": [3, 4]}),
+]
+
+
+def test_codecs_round_trip() -> None:
+    for codec in [BinaryCodec(), JsonCodec()]:
+        for msg in MSGS:
+            decoded = WireCodec.decode(codec.encode(msg))
+            assert decoded.type == msg.type
+            assert decoded.payload == msg.payload
+
+
+def test_binary_frames_are_smaller() -> None:
+    for msg in MSGS:
+        assert len(BinaryCodec().encode(msg)) < len(JsonCodec().encode(msg))
+
+
+def test_protocol_negotiation() -> None:
+    assert negotiate_protocol([JSON_PROTOCOL, BINARY_PROTOCOL]) == BINARY_PROTOCOL
+    assert negotiate_protocol([JSON_PROTOCOL]) == JSON_PROTOCOL
+    assert negotiate_protocol([]) == JSON_PROTOCOL
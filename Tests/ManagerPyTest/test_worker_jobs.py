@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from Models.WorkerModels import SocketMsg, SocketMsgType, TaskSetupPayload, JobRequestPayload
+from Modules.ModuleRegistry import ModuleRegistry
+from Tests.ManagerPyTest.mocks.StubModule import StubWorkerModule
+from Utils.SettingsLoader import SettingsLoader
+from Worker.WorkerLib.TestJobsMgr import TestJobMgr as JobMgr
+from Worker.WorkerLib.WorkerComponents import WorkerComponents, StopType, BlockType
+from Worker.WorkerLib.WorkerSettings import WorkerSettings
+
+pytestmark = pytest.mark.usefixtures("logger")
+
+
+# Network side of the worker, handlers are called directly by the tests
+class FakeConnMgr:
+    def __init__(self) -> None:
+        self.handlers = {}
+        self.sent = []
+
+    def register_socket_msg_handler(self, msg_type: SocketMsgType, handler) -> None:
+        self.handlers[msg_type] = handler
+
+    def register_on_connected(self, callback) -> None:
+        pass
+
+    async def send_msg(self, msg: SocketMsg) -> None:
+        self.sent.append(msg)
+
+    def get_max_cpus(self) -> int:
+        return 2
+
+    def get_max_mem_mb(self) -> int:
+        return 0
+
+    async def deliver(self, msg_type: SocketMsgType, payload: dict) -> None:
+        await self.handlers[msg_type](SocketMsg(type=msg_type, payload=payload))
+
+    def get_chunks(self) -> list[dict]:
+        return [chunk for msg in self.sent if msg.type == SocketMsgType.RESULT for chunk in msg.payload["chunks"]]
+
+
+class FakeWorkerProcess:
+    def get_stop_type(self) -> StopType:
+        return StopType.gentle_stop
+
+
+@pytest.fixture
+def conn_mgr(logger, tmp_path, monkeypatch):
+    SettingsLoader(WorkerSettings, str(tmp_path / "settings.json"))
+    settings = SettingsLoader().get_settings()
+    monkeypatch.setattr(settings, "build_dir", str(tmp_path / "builds"))
+    monkeypatch.setattr(settings, "pin_game_cores", False)
+    monkeypatch.setattr(settings, "limit_game_memory", False)
+
+    ModuleRegistry().register_test_module("StubModule", "Tests.ManagerPyTest.mocks.StubModule:StubWorkerModuleBuilder",
+                                          "Tests.ManagerPyTest.mocks.StubModule:StubWorkerModuleBuilder")
+    StubWorkerModule.builds.clear()
+    StubWorkerModule.configs.clear()
+
+    conn_mgr = FakeConnMgr()
+    monkeypatch.setattr(WorkerComponents(), "_connection_mgr", conn_mgr)
+    monkeypatch.setattr(WorkerComponents(), "_worker_process", FakeWorkerProcess())
+    yield conn_mgr
+
+    SettingsLoader().destroy()
+
+
+def _setup(worker_init: str = "a", result: str = "D") -> dict:
+    return TaskSetupPayload(task_id=7, module_name="StubModule", worker_init={"engine": [worker_init]},
+                            worker_build_config={}, worker_config={"result": result}).model_dump()
+
+
+def _job(job_id: int, task_id: int = 7) -> dict:
+    return JobRequestPayload(job_id=job_id, task_id=task_id, arg_str="{}", seeds=[1, 2]).model_dump()
+
+
+def test_jobs_run_on_module_built_from_setup(conn_mgr) -> None:
+    async def run() -> None:
+        job_mgr = JobMgr()
+        job_mgr.block_new_jobs(BlockType.disable)
+
+        # Job arriving right after the setup waits for the build
+        await conn_mgr.deliver(SocketMsgType.SETUP, _setup())
+        await conn_mgr.deliver(SocketMsgType.JOB, _job(1))
+
+        # Same setup again on the same connection changes nothing, a new config is applied without a rebuild
+        await conn_mgr.deliver(SocketMsgType.SETUP, _setup())
+        await conn_mgr.deliver(SocketMsgType.SETUP, _setup(result="W"))
+        await conn_mgr.deliver(SocketMsgType.JOB, _job(2))
+
+        # Other engine needs a new build
+        await conn_mgr.deliver(SocketMsgType.SETUP, _setup(worker_init="b", result="L"))
+        await conn_mgr.deliver(SocketMsgType.JOB, _job(3))
+
+        await conn_mgr.deliver(SocketMsgType.JOB, _job(4, task_id=8))
+        await asyncio.sleep(0.01)
+
+        job_mgr.destroy()
+
+    asyncio.run(run())
+
+    results = {}
+    errors = {}
+    for chunk in conn_mgr.get_chunks():
+        results.setdefault(chunk["job_id"], []).extend(chunk["results"])
+        if chunk["done"]:
+            errors[chunk["job_id"]] = chunk["error"]
+
+    assert results == {1: ["D", "D"], 2: ["W", "W"], 3: ["L", "L"], 4: []}
+    assert errors == {1: "", 2: "", 3: "", 4: "Task: 8 is not set up on worker"}
+    assert StubWorkerModule.builds == [{"engine": ["a"]}, {"engine": ["b"]}]
+    assert [config["result"] for config in StubWorkerModule.configs] == ["D", "W", "L"]
+
+
+def test_failed_setup_fails_jobs_of_task(conn_mgr) -> None:
+    async def run() -> None:
+        job_mgr = JobMgr()
+        job_mgr.block_new_jobs(BlockType.disable)
+
+        setup = _setup()
+        setup["module_name"] = "MissingModule"
+        await conn_mgr.deliver(SocketMsgType.SETUP, setup)
+        await conn_mgr.deliver(SocketMsgType.JOB, _job(1))
+        await asyncio.sleep(0.01)
+
+        job_mgr.destroy()
+
+    asyncio.run(run())
+
+    chunks = conn_mgr.get_chunks()
+    assert len(chunks) == 1 and chunks[0]["done"]
+    assert "MissingModule" in chunks[0]["error"]
+
+
+def test_failed_game_cancels_rest_of_job(conn_mgr) -> None:
+    async def run() -> None:
+        job_mgr = JobMgr()
+        job_mgr.block_new_jobs(BlockType.disable)
+
+        setup = _setup()
+        setup["worker_config"] |= {"fail_seed": 2, "game_time_s": 0.2}
+        await conn_mgr.deliver(SocketMsgType.SETUP, setup)
+
+        # Two cpus, so the third game waits for a slot when the second one crashes
+        job = _job(1)
+        job["seeds"] = [1, 2, 3]
+        await conn_mgr.deliver(SocketMsgType.JOB, job)
+        await asyncio.sleep(0.01)
+
+        chunks = conn_mgr.get_chunks()
+        assert chunks[-1]["done"] and chunks[-1]["error"] == "Game with seed: 2 crashed"
+
+        # Games of the failed job neither finish later nor keep their slots
+        await asyncio.sleep(0.3)
+        assert conn_mgr.get_chunks() == chunks
+        assert job_mgr._get_core_allocator()._free_slots.qsize() == 2
+
+        job_mgr.destroy()
+
+    asyncio.run(run())
@@ -0,0 +1,37 @@
+from fastapi.testclient import TestClient
+
+from Manager.manager_main import Manager
+from Tests.ManagerPyTest.validators import validate_post_payload
+
+WORKER = {"name": "test-worker", "version": 0, "cpus": 4, "memoryMB": 4096}
+
+
+def test_worker_registration() -> None:
+    with TestClient(Manager) as client:
+        response = validate_post_payload(client, "/worker/register", WORKER)
+        assert response.json()["result"]["result"] == "SUCCESS"
+        token = response.json()["session_token"]
+
+        response = validate_post_payload(client, "/worker/register", WORKER)
+        assert response.json()["result"]["result"] == "WORKER_ALREADY_REGISTERED"
+
+        # Registration is visible at once, without waiting for the audit thread
+        response = validate_post_payload(client, "/worker/bump_ka", {"name": WORKER["name"], "session_token": token})
+        assert response.json()["result"] == "SUCCESS"
+
+        response = validate_post_payload(client, "/worker/bump_ka",
+                                         {"name": WORKER["name"], "session_token": token + 1})
+        assert response.json()["result"] == "INVALID_TOKEN"
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'manager_workers{state="REGISTERED"} 1' in response.text
+        assert f'manager_worker_ka_lag_seconds{{worker="{WORKER["name"]}"}}' in response.text
+
+        response = client.request("DELETE", "/worker/unregister",
+                                  json={"name": WORKER["name"], "session_token": token})
+        assert response.json()["result"] == "SUCCESS"
+
+        response = validate_post_payload(client, "/worker/bump_ka", {"name": WORKER["name"], "session_token": token})
+        assert response.json()["result"] == "WORKER_NOT_FOUND"
@@ -8,4 +8,21 @@ source ../.venv/bin/activate
 pytest ./ManagerPyTest/test_getters.py
 pytest ./ManagerPyTest/test_pytest.py
 pytest ./ManagerPyTest/test_tasks.py
-pytest ./ManagerPyTest/test_checkmate_chariot_task.py
\ No newline at end of file
+pytest ./ManagerPyTest/test_checkmate_chariot_task.py
+pytest ./ManagerPyTest/test_workers.py
+pytest ./ManagerPyTest/test_wire_codec.py
+pytest ./ManagerPyTest/test_state_store.py
+pytest ./ManagerPyTest/test_result_store.py
+pytest ./ManagerPyTest/test_elo_stats.py
+pytest ./ManagerPyTest/test_progress_broadcaster.py
+pytest ./ManagerPyTest/test_module_builder.py
+pytest ./ManagerPyTest/test_startup.py
+pytest ./ManagerPyTest/test_resource_sampler.py
+pytest ./ManagerPyTest/test_process_limits.py
+pytest ./ManagerPyTest/test_metrics.py
+pytest ./ManagerPyTest/test_job_scheduling.py
+pytest ./ManagerPyTest/test_settings_loader.py
+pytest ./ManagerPyTest/test_job_assigner.py
+pytest ./ManagerPyTest/test_deadline_scheduler.py
+pytest ./ManagerPyTest/test_worker_jobs.py
+pytest ./ManagerPyTest/test_job_threads.py
\ No newline at end of file
@@ -0,0 +1,125 @@
+import heapq
+import time
+from threading import Thread, Condition
+from typing import Callable, Hashable
+
+from Utils.Logger import Logger, LogLevel
+
+
+class DeadlineScheduler:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    # Heap entries are never removed in place, outdated ones are skipped on pop and compacted from time to time
+    COMPACTION_MIN_STALE: int = 64
+
+    _heap: list[tuple[float, int, Hashable]]
+    _entries: dict[Hashable, tuple[int, Callable[[], None]]]
+    _seq: int
+
+    _cv: Condition
+    _should_work: bool
+    _thread: Thread
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        self._heap = []
+        self._entries = {}
+        self._seq = 0
+
+        self._cv = Condition()
+        self._should_work = True
+        self._thread = Thread(target=self._scheduler_thread)
+        self._thread.start()
+
+        Logger().log_info("Deadline scheduler started", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        with self._cv:
+            self._should_work = False
+            self._cv.notify_all()
+
+        self._thread.join()
+        Logger().log_info(f"Deadline scheduler destroyed, dropped deadlines: {len(self._entries)}", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Deadlines are perf_counter timestamps, scheduling an existing key replaces its previous deadline
+    def schedule(self, key: Hashable, deadline: float, callback: Callable[[], None]) -> None:
+        with self._cv:
+            self._seq += 1
+            self._entries[key] = (self._seq, callback)
+            heapq.heappush(self._heap, (deadline, self._seq, key))
+
+            if len(self._heap) > 2 * len(self._entries) + DeadlineScheduler.COMPACTION_MIN_STALE:
+                self._compact_unlocked()
+
+            # Only the new earliest deadline changes the sleep time
+            if self._heap[0][1] == self._seq:
+                self._cv.notify()
+
+    def schedule_in(self, key: Hashable, delay: float, callback: Callable[[], None]) -> None:
+        self.schedule(key, time.perf_counter() + delay, callback)
+
+    def cancel(self, key: Hashable) -> bool:
+        with self._cv:
+            return self._entries.pop(key, None) is not None
+
+    def get_num_scheduled(self) -> int:
+        with self._cv:
+            return len(self._entries)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _compact_unlocked(self) -> None:
+        self._heap = [entry for entry in self._heap if self._is_live_unlocked(entry)]
+        heapq.heapify(self._heap)
+
+    def _is_live_unlocked(self, entry: tuple[float, int, Hashable]) -> bool:
+        live = self._entries.get(entry[2])
+        return live is not None and live[0] == entry[1]
+
+    def _pop_expired_unlocked(self, now: float) -> list[tuple[Hashable, Callable[[], None]]]:
+        expired = []
+
+        while self._heap and self._heap[0][0] <= now:
+            entry = heapq.heappop(self._heap)
+
+            if self._is_live_unlocked(entry):
+                expired.append((entry[2], self._entries.pop(entry[2])[1]))
+
+        return expired
+
+    def _scheduler_thread(self) -> None:
+        while True:
+            with self._cv:
+                while self._should_work:
+                    # Drop outdated heads so the sleep time is based on a live deadline
+                    while self._heap and not self._is_live_unlocked(self._heap[0]):
+                        heapq.heappop(self._heap)
+
+                    now = time.perf_counter()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+
+                    self._cv.wait(self._heap[0][0] - now if self._heap else None)
+
+                if not self._should_work:
+                    return
+
+                expired = self._pop_expired_unlocked(time.perf_counter())
+
+            # Callbacks run without the lock, so they are free to schedule again
+            for key, callback in expired:
+                try:
+                    callback()
+                except Exception as e:
+                    Logger().log_error(f"Deadline callback for {key} failed: {e}", LogLevel.LOW_FREQ)
@@ -0,0 +1,151 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Two sided 95% quantile of the normal distribution
+Z_95: float = 1.959963984540054
+
+# Slope of the logistic Elo curve at an even score, scales normalized Elo back to Elo units
+NELO_SCALE: float = 800 / np.log(10)
+
+# Defaults fitted by BayesElo on large engine rating lists
+BAYESELO_ADVANTAGE: float = 32.8
+BAYESELO_DRAW_ELO: float = 97.3
+
+
+# Every field is an array with one entry per group, undefined values (e.g. no games) are nan
+@dataclass(frozen=True, slots=True)
+class EloEstimate:
+    score: np.ndarray
+    elo: np.ndarray
+    elo_error: np.ndarray
+    nelo: np.ndarray
+    nelo_error: np.ndarray
+    los: np.ndarray
+
+
+def score_to_elo(score: np.ndarray) -> np.ndarray:
+    # Sweeps of only wins or only losses are clipped to a finite value
+    clipped = np.clip(score, 1e-3, 1 - 1e-3)
+    return -400 * np.log10(1 / clipped - 1)
+
+
+# Abramowitz and Stegun 7.1.26, absolute error below 1.5e-7, NumPy has no vectorized erf
+def erf(x: np.ndarray) -> np.ndarray:
+    sign = np.sign(x)
+    x = np.abs(x)
+    t = 1 / (1 + 0.3275911 * x)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    return sign * (1 - poly * np.exp(-x * x))
+
+
+def normal_cdf(x: np.ndarray) -> np.ndarray:
+    return 0.5 * (1 + erf(x / np.sqrt(2)))
+
+
+def trinomial_estimate(wins: np.ndarray, draws: np.ndarray, losses: np.ndarray) -> EloEstimate:
+    wins, draws, losses = (np.asarray(counts, dtype=np.float64) for counts in (wins, draws, losses))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        games = wins + draws + losses
+        score = (wins + draws / 2) / games
+        variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+        los = normal_cdf((wins - losses) / np.sqrt(wins + losses))
+
+        return _build_estimate(score, variance, games, los)
+
+
+def pentanomial_estimate(pentanomial: np.ndarray) -> EloEstimate:
+    pentanomial = np.asarray(pentanomial, dtype=np.float64).reshape(-1, 5)
+    pair_scores = np.array([0, 0.25, 0.5, 0.75, 1])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pairs = pentanomial.sum(axis=1)
+        score = pentanomial @ pair_scores / pairs
+        variance = (pentanomial * (pair_scores - score[:, None]) ** 2).sum(axis=1) / pairs
+        los = normal_cdf((score - 0.5) / np.sqrt(variance / pairs))
+
+        # Variance of a pair average is about half of the per game one, which normalized Elo is based on
+        return _build_estimate(score, variance * 2, pairs * 2, los, variance / pairs)
+
+
+# Games of a job with seeds 2k and 2k + 1 share the opening and swap colours, so they form one pair.
+# Scores are in half points of the tested side. Rows of a pair have to be adjacent, which holds for games kept in
+# seed order. Returns the first row of every complete pair and the pair score.
+def pair_games(job_ids: np.ndarray, seeds: np.ndarray, scores: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    if len(job_ids) == 0:
+        return np.zeros(0, np.intp), np.zeros(0, np.intp)
+
+    pair_ids = seeds // 2
+    is_start = (job_ids[1:] != job_ids[:-1]) | (pair_ids[1:] != pair_ids[:-1])
+    starts = np.flatnonzero(np.concatenate(([True], is_start)))
+    sizes = np.diff(np.append(starts, len(job_ids)))
+    pair_scores = np.add.reduceat(scores.astype(np.intp), starts)
+
+    # Pairs with a missing game say nothing about the opening bias, they are left out
+    complete = sizes == 2
+    return starts[complete], pair_scores[complete]
+
+
+# Pentanomial counts per group, columns are pair scores 0, 0.5, 1, 1.5 and 2
+def pentanomial_counts(groups: np.ndarray, pair_scores: np.ndarray, num_groups: int) -> np.ndarray:
+    return np.bincount(groups.astype(np.intp) * 5 + pair_scores, minlength=num_groups * 5).reshape(-1, 5)
+
+
+# BayesElo model: the first player wins with f(d - draw_elo), loses with f(-d - draw_elo) and draws otherwise,
+# where d is the rating difference with the white advantage and f is the logistic Elo curve.
+# Ratings maximize the likelihood with a gaussian prior, using diagonal Newton steps over all games at once.
+def bayes_elo(first: np.ndarray, second: np.ndarray, scores: np.ndarray, first_is_white: np.ndarray,
+              num_players: int, advantage: float = BAYESELO_ADVANTAGE, draw_elo: float = BAYESELO_DRAW_ELO,
+              prior_sigma: float = 400.0, max_iterations: int = 200,
+              tolerance: float = 1e-4) -> tuple[np.ndarray, np.ndarray]:
+    k = np.log(10) / 400
+    first = first.astype(np.intp)
+    second = second.astype(np.intp)
+    colour_advantage = np.where(first_is_white, advantage, -advantage)
+    won = scores == 2
+    lost = scores == 0
+
+    ratings = np.zeros(num_players)
+    information = np.full(num_players, 1 / prior_sigma ** 2)
+
+    for _ in range(max_iterations):
+        diff = ratings[first] - ratings[second] + colour_advantage
+        p_win = 1 / (1 + np.exp(-k * (diff - draw_elo)))
+        p_loss = 1 / (1 + np.exp(-k * (-diff - draw_elo)))
+        p_draw = np.maximum(1 - p_win - p_loss, 1e-12)
+
+        d_win = k * p_win * (1 - p_win)
+        d_loss = -k * p_loss * (1 - p_loss)
+        d_draw = -d_win - d_loss
+
+        gradient = np.where(won, d_win / p_win, np.where(lost, d_loss / p_loss, d_draw / p_draw))
+        fisher = d_win ** 2 / p_win + d_loss ** 2 / p_loss + d_draw ** 2 / p_draw
+
+        player_gradient = np.bincount(first, gradient, num_players) - np.bincount(second, gradient, num_players) \
+            - ratings / prior_sigma ** 2
+        information = np.bincount(first, fisher, num_players) + np.bincount(second, fisher, num_players) \
+            + 1 / prior_sigma ** 2
+
+        step = player_gradient / information
+        ratings += step
+
+        if np.max(np.abs(step), initial=0) < tolerance:
+            break
+
+    # Only rating differences are meaningful, the average player is the reference
+    return ratings - ratings.mean() if num_players != 0 else ratings, Z_95 / np.sqrt(information)
+
+
+def _build_estimate(score: np.ndarray, variance: np.ndarray, games: np.ndarray, los: np.ndarray,
+                    score_variance: np.ndarray | None = None) -> EloEstimate:
+    score_variance = variance / games if score_variance is None else score_variance
+    score_error = Z_95 * np.sqrt(score_variance)
+
+    elo_low = score_to_elo(np.clip(score - score_error, 0, 1))
+    elo_high = score_to_elo(np.clip(score + score_error, 0, 1))
+    # Normalized Elo is undefined for sweeps, there is no spread to normalize by
+    sigma = np.where(variance > 0, np.sqrt(variance), np.nan)
+
+    return EloEstimate(score=score, elo=score_to_elo(score), elo_error=(elo_high - elo_low) / 2,
+                       nelo=(score - 0.5) / sigma * NELO_SCALE, nelo_error=score_error / sigma * NELO_SCALE, los=los)
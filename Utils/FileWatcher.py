@@ -0,0 +1,236 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from abc import ABC, abstractmethod
+from threading import Event, Lock
+
+
+class FileWatcher(ABC):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _path: str
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, path: str) -> None:
+        self._path = os.path.abspath(path)
+
+    # ------------------------------
+    # Abstract methods
+    # ------------------------------
+
+    # Returns True when the file changed, False on timeout or when the watcher was closed
+    @abstractmethod
+    def wait_for_change(self, timeout: float | None) -> bool:
+        pass
+
+    # Wakes up every waiting thread, after that wait_for_change always returns False
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class InotifyFileWatcher(FileWatcher):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    IN_MODIFY: int = 0x00000002
+    IN_CLOSE_WRITE: int = 0x00000008
+    IN_MOVED_TO: int = 0x00000080
+    IN_CREATE: int = 0x00000100
+    IN_NONBLOCK: int = 0o4000
+    IN_CLOEXEC: int = 0o2000000
+
+    EVENT_HEADER: struct.Struct = struct.Struct("iIII")
+    READ_SIZE: int = 64 * 1024
+
+    _inotify_fd: int
+    _wake_read_fd: int
+    _wake_write_fd: int
+    _file_name: bytes
+    _closed: bool
+
+    # Descriptors are released by whoever leaves last: close with no waiters or the last waiter after close
+    _lock: Lock
+    _waiters: int
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, path: str) -> None:
+        super().__init__(path)
+
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise Exception("libc not found")
+
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+
+        self._inotify_fd = libc.inotify_init1(InotifyFileWatcher.IN_NONBLOCK | InotifyFileWatcher.IN_CLOEXEC)
+        if self._inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Editors usually replace the file by rename, so the parent directory is watched instead of the inode
+        mask = InotifyFileWatcher.IN_MODIFY | InotifyFileWatcher.IN_CLOSE_WRITE | InotifyFileWatcher.IN_MOVED_TO | \
+            InotifyFileWatcher.IN_CREATE
+        wd = libc.inotify_add_watch(self._inotify_fd, os.path.dirname(self._path).encode(), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self._inotify_fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self._path}")
+
+        self._file_name = os.path.basename(self._path).encode()
+        self._wake_read_fd, self._wake_write_fd = os.pipe()
+        self._closed = False
+        self._lock = Lock()
+        self._waiters = 0
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+
+            self._closed = True
+
+            if self._waiters == 0:
+                self._release_fds_unlocked()
+                return
+
+            # Byte is never read, so the pipe stays readable for every waiter
+            os.write(self._wake_write_fd, b"\0")
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def wait_for_change(self, timeout: float | None) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+
+            self._waiters += 1
+
+        try:
+            while True:
+                readable, _, _ = select.select([self._inotify_fd, self._wake_read_fd], [], [], timeout)
+
+                if self._closed or self._wake_read_fd in readable or not readable:
+                    return False
+
+                if self._drain_events():
+                    return True
+        finally:
+            with self._lock:
+                self._waiters -= 1
+
+                if self._closed and self._waiters == 0:
+                    self._release_fds_unlocked()
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _drain_events(self) -> bool:
+        try:
+            data = os.read(self._inotify_fd, InotifyFileWatcher.READ_SIZE)
+        except BlockingIOError:
+            return False
+
+        header_size = InotifyFileWatcher.EVENT_HEADER.size
+        offset = 0
+        hit = False
+
+        while offset + header_size <= len(data):
+            _, _, _, name_len = InotifyFileWatcher.EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + header_size:offset + header_size + name_len].rstrip(b"\0")
+            offset += header_size + name_len
+
+            if name == self._file_name:
+                hit = True
+
+        return hit
+
+    def _release_fds_unlocked(self) -> None:
+        for fd in [self._inotify_fd, self._wake_read_fd, self._wake_write_fd]:
+            if fd == -1:
+                continue
+
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+        self._inotify_fd = self._wake_read_fd = self._wake_write_fd = -1
+
+
+class PollingFileWatcher(FileWatcher):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _poll_interval: float
+    _closed: Event
+    _last_stat: tuple[float, int] | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, path: str, poll_interval: float) -> None:
+        super().__init__(path)
+        self._poll_interval = poll_interval
+        self._closed = Event()
+        self._last_stat = self._stat()
+
+    def close(self) -> None:
+        self._closed.set()
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def wait_for_change(self, timeout: float | None) -> bool:
+        remaining = timeout
+
+        while remaining is None or remaining > 0:
+            step = self._poll_interval if remaining is None else min(self._poll_interval, remaining)
+
+            if self._closed.wait(step):
+                return False
+
+            if remaining is not None:
+                remaining -= step
+
+            stat = self._stat()
+            if stat != self._last_stat:
+                self._last_stat = stat
+                return True
+
+        return False
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _stat(self) -> tuple[float, int] | None:
+        try:
+            stat = os.stat(self._path)
+            return stat.st_mtime, stat.st_size
+        except OSError:
+            return None
+
+
+# Note: may be created before Logger is initialized, so the fallback is silent
+def create_file_watcher(path: str, poll_interval: float) -> FileWatcher:
+    try:
+        return InotifyFileWatcher(path)
+    except Exception:
+        return PollingFileWatcher(path, poll_interval)
@@ -95,6 +95,10 @@ class Logger(metaclass=GlobalObj):
         self._log_file.flush()
         self._log_file.close()
 
+    def get_queue_length(self) -> int:
+        with self._log_que_lock:
+            return len(self._log_que)
+
     def set_log_level(self, log_level: LogLevel) -> None:
         self._log_level = log_level
         self.log_info(f"Logger level set to: {log_level}", LogLevel.LOW_FREQ)
@@ -0,0 +1,348 @@
+import math
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable
+
+from .GlobalObj import GlobalObj
+from .Logger import Logger, LogLevel
+
+# Metrics are rendered in the prometheus text exposition format
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from uncontended lock handoffs up to games of a long time control
+DEFAULT_BUCKETS: tuple[float, ...] = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900, 3600)
+
+LabelValues = tuple[str, ...]
+
+
+class Metric:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    TYPE: str = "untyped"
+
+    _name: str
+    _help: str
+    _label_names: tuple[str, ...]
+
+    # Updates are a single dict operation under an uncontended lock, so hot paths pay well below a microsecond
+    _lock: Lock
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, name: str, help_msg: str, label_names: tuple[str, ...] = ()) -> None:
+        self._name = name
+        self._help = help_msg
+        self._label_names = label_names
+        self._lock = Lock()
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def get_name(self) -> str:
+        return self._name
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self._name} {self._help}", f"# TYPE {self._name} {self.TYPE}"]
+        lines.extend(self._render_samples())
+        return lines
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _render_samples(self) -> list[str]:
+        return []
+
+    def _check_labels(self, labels: LabelValues) -> None:
+        if len(labels) != len(self._label_names):
+            raise ValueError(f"Metric: {self._name} expects labels: {self._label_names}, got: {labels}")
+
+    def _format_labels(self, labels: LabelValues, extra: tuple[tuple[str, str], ...] = ()) -> str:
+        pairs = list(zip(self._label_names, labels)) + list(extra)
+
+        if len(pairs) == 0:
+            return ""
+
+        return "{" + ",".join(f'{name}="{_escape_label(str(value))}"' for name, value in pairs) + "}"
+
+
+class Counter(Metric):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    TYPE: str = "counter"
+
+    _values: dict[LabelValues, float]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, name: str, help_msg: str, label_names: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help_msg, label_names)
+        self._values = {}
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def inc(self, amount: float = 1, labels: LabelValues = ()) -> None:
+        with self._lock:
+            value = self._values.get(labels)
+
+            # Labels are validated once per label set only
+            if value is None:
+                self._check_labels(labels)
+                value = 0
+
+            self._values[labels] = value + amount
+
+    def get(self, labels: LabelValues = ()) -> float:
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            values = list(self._values.items())
+
+        return [f"{self._name}{self._format_labels(labels)} {_format_value(value)}" for labels, value in values]
+
+
+class Gauge(Metric):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    TYPE: str = "gauge"
+
+    _values: dict[LabelValues, float]
+    # Values owned by other components are read only when scraped, so they cost nothing in between
+    _collect: Callable[[], dict[LabelValues, float]] | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, name: str, help_msg: str, label_names: tuple[str, ...] = (),
+                 collect: Callable[[], dict[LabelValues, float]] | None = None) -> None:
+        super().__init__(name, help_msg, label_names)
+        self._values = {}
+        self._collect = collect
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def set(self, value: float, labels: LabelValues = ()) -> None:
+        self._check_labels(labels)
+
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, amount: float = 1, labels: LabelValues = ()) -> None:
+        self._check_labels(labels)
+
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set_collector(self, collect: Callable[[], dict[LabelValues, float]] | None) -> None:
+        with self._lock:
+            self._collect = collect
+
+    def get(self, labels: LabelValues = ()) -> float:
+        return self._get_values().get(labels, 0)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _get_values(self) -> dict[LabelValues, float]:
+        with self._lock:
+            collect = self._collect
+            values = dict(self._values)
+
+        if collect is not None:
+            values.update(collect())
+
+        return values
+
+    def _render_samples(self) -> list[str]:
+        try:
+            values = self._get_values()
+        except Exception as e:
+            Logger().log_error(f"Failed to collect metric: {self._name}: {e}", LogLevel.MEDIUM_FREQ)
+            return []
+
+        return [f"{self._name}{self._format_labels(labels)} {_format_value(value)}" for labels, value in values.items()]
+
+
+class Histogram(Metric):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    TYPE: str = "histogram"
+
+    _buckets: tuple[float, ...]
+    # Per label set: non-cumulative bucket counts with the +Inf bucket last, sum of observations
+    _counts: dict[LabelValues, list[int]]
+    _sums: dict[LabelValues, float]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, name: str, help_msg: str, label_names: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        super().__init__(name, help_msg, label_names)
+
+        if list(buckets) != sorted(buckets) or len(buckets) == 0:
+            raise ValueError(f"Histogram: {name} buckets must be sorted and not empty")
+
+        self._buckets = tuple(buckets)
+        self._counts = {}
+        self._sums = {}
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def observe(self, value: float, labels: LabelValues = ()) -> None:
+        # Bucket upper bounds are inclusive
+        index = bisect_left(self._buckets, value)
+
+        with self._lock:
+            counts = self._counts.get(labels)
+
+            if counts is None:
+                self._check_labels(labels)
+                counts = self._counts[labels] = [0] * (len(self._buckets) + 1)
+                self._sums[labels] = 0.0
+
+            counts[index] += 1
+            self._sums[labels] += value
+
+    def get_count(self, labels: LabelValues = ()) -> int:
+        with self._lock:
+            return sum(self._counts.get(labels, ()))
+
+    def get_sum(self, labels: LabelValues = ()) -> float:
+        with self._lock:
+            return self._sums.get(labels, 0.0)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _render_samples(self) -> list[str]:
+        with self._lock:
+            entries = [(labels, list(counts), self._sums[labels]) for labels, counts in self._counts.items()]
+
+        lines = []
+        for labels, counts, total in entries:
+            cumulative = 0
+
+            for bound, count in zip(self._buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self._name}_bucket{self._format_labels(labels, (('le', _format_value(bound)),))} "
+                             f"{cumulative}")
+
+            lines.append(f"{self._name}_sum{self._format_labels(labels)} {_format_value(total)}")
+            lines.append(f"{self._name}_count{self._format_labels(labels)} {cumulative}")
+
+        return lines
+
+
+class Metrics(metaclass=GlobalObj):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _lock: Lock
+    _metrics: dict[str, Metric]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._metrics = {}
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Metrics are created once per name, so modules may declare theirs at import time
+    def counter(self, name: str, help_msg: str, label_names: tuple[str, ...] = ()) -> Counter:
+        return self._get_or_create(Counter, name, lambda: Counter(name, help_msg, label_names))
+
+    def gauge(self, name: str, help_msg: str, label_names: tuple[str, ...] = (),
+              collect: Callable[[], dict[LabelValues, float]] | None = None) -> Gauge:
+        gauge = self._get_or_create(Gauge, name, lambda: Gauge(name, help_msg, label_names, collect))
+
+        # Components created again, e.g. after a restart in tests, take over the collector
+        if collect is not None:
+            gauge.set_collector(collect)
+
+        return gauge
+
+    def histogram(self, name: str, help_msg: str, label_names: tuple[str, ...] = (),
+                  buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, lambda: Histogram(name, help_msg, label_names, buckets))
+
+    def get_metric(self, name: str) -> Metric | None:
+        with self._lock:
+            return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.get_name())
+
+        return "\n".join(line for metric in metrics for line in metric.render()) + "\n"
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _get_or_create(self, metric_type: type, name: str, factory: Callable[[], Metric]):
+        with self._lock:
+            metric = self._metrics.get(name)
+
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            elif not isinstance(metric, metric_type):
+                raise ValueError(f"Metric: {name} already registered as {metric.TYPE}")
+
+            return metric
+
+
+# ------------------------------
+# Private functions
+# ------------------------------
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+
+    if value == math.inf:
+        return "+Inf"
+
+    if value == -math.inf:
+        return "-Inf"
+
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
@@ -0,0 +1,173 @@
+import asyncio
+import os
+import resource
+import signal
+import sys
+from asyncio.subprocess import PIPE
+from dataclasses import dataclass
+
+BYTES_IN_MB: int = 1024 * 1024
+CGROUP_ROOT: str = "/sys/fs/cgroup"
+PROC_CGROUP_PATH: str = "/proc/self/cgroup"
+
+
+# Limits of a single game, inherited by every engine started by the game process.
+# Empty cores and zero memory mean no limit. With a cgroup memory_mb bounds the whole game, without one it is only
+# a per process cap, so the game with its engines may use a multiple of it.
+@dataclass(frozen=True, slots=True)
+class ProcessLimits:
+    cores: tuple[int, ...] = ()
+    memory_mb: int = 0
+    cgroup_path: str = ""
+
+    def is_empty(self) -> bool:
+        return len(self.cores) == 0 and self.memory_mb == 0 and self.cgroup_path == ""
+
+    # Limits are applied by this file run as an exec wrapper, a fork of the threaded worker must not do any work
+    # before exec, so preexec hooks are never used
+    def wrap_command(self, args: list[str]) -> list[str]:
+        if self.is_empty():
+            return args
+
+        return [sys.executable, "-I", "-S", os.path.abspath(__file__), ",".join(str(core) for core in self.cores),
+                str(self.memory_mb), self.cgroup_path, "--", *args]
+
+    # Applies the limits to the current process, so only to a freshly started single threaded one
+    def apply(self) -> None:
+        if self.cgroup_path != "":
+            with open(os.path.join(self.cgroup_path, "cgroup.procs"), "w") as f:
+                f.write(str(os.getpid()))
+
+        if len(self.cores) != 0:
+            os.sched_setaffinity(0, self.cores)
+
+        # Data limit covers heap and anonymous mappings like hash tables, but not shared libraries.
+        # Every process gets it on its own, modules keep the sum within the share by sizing their engines.
+        if self.memory_mb != 0 and self.cgroup_path == "":
+            limit = self.memory_mb * BYTES_IN_MB
+            resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+
+
+def get_usable_cores() -> list[int]:
+    if not hasattr(os, "sched_getaffinity"):
+        return []
+
+    return sorted(os.sched_getaffinity(0))
+
+
+# Creates one cgroup v2 per name under the cgroup of the current process, each limited to memory_mb.
+# Needs a delegated cgroup, returns an empty list when cgroups v2 are not usable.
+def create_memory_cgroups(names: list[str], memory_mb: int) -> list[str]:
+    try:
+        with open(PROC_CGROUP_PATH, "r") as f:
+            lines = [line.strip() for line in f if line.startswith("0::")]
+
+        if len(lines) == 0:
+            return []
+
+        base = os.path.join(CGROUP_ROOT, lines[0].removeprefix("0::").lstrip("/"))
+        with open(os.path.join(base, "cgroup.controllers"), "r") as f:
+            if "memory" not in f.read().split():
+                return []
+
+        with open(os.path.join(base, "cgroup.subtree_control"), "r") as f:
+            was_enabled = "memory" in f.read().split()
+    except OSError:
+        return []
+
+    # Everything done here is undone on failure, so the worker never stays in a half created tree
+    created = []
+    is_moved = False
+    is_enabled = False
+    try:
+        # Processes may only live in leaf cgroups once controllers are enabled for children
+        leaf = os.path.join(base, "worker")
+        if not os.path.isdir(leaf):
+            os.mkdir(leaf)
+            created.append(leaf)
+
+        _write_cgroup_file(leaf, "cgroup.procs", str(os.getpid()))
+        is_moved = True
+
+        if not was_enabled:
+            _write_cgroup_file(base, "cgroup.subtree_control", "+memory")
+            is_enabled = True
+
+        paths = []
+        for name in names:
+            path = os.path.join(base, name)
+            if not os.path.isdir(path):
+                os.mkdir(path)
+                created.append(path)
+
+            _write_cgroup_file(path, "memory.max", str(memory_mb * BYTES_IN_MB))
+            paths.append(path)
+
+        return paths
+    except OSError:
+        remove_cgroups([path for path in reversed(created) if path != leaf])
+
+        try:
+            if is_enabled:
+                _write_cgroup_file(base, "cgroup.subtree_control", "-memory")
+            if is_moved:
+                _write_cgroup_file(base, "cgroup.procs", str(os.getpid()))
+        except OSError:
+            pass
+
+        remove_cgroups([leaf] if leaf in created else [])
+        return []
+
+
+# Cgroups still holding processes can not be removed, names are stable so the next worker reuses them
+def remove_cgroups(paths: list[str]) -> None:
+    for path in paths:
+        try:
+            os.rmdir(path)
+        except OSError:
+            pass
+
+
+# Runs the command in its own session, so the whole game with its engines is killed when the caller is cancelled
+async def run_limited(args: list[str], limits: ProcessLimits | None) -> tuple[int, bytes]:
+    process = await asyncio.create_subprocess_exec(*(limits.wrap_command(args) if limits is not None else args),
+                                                   stdout=PIPE, start_new_session=True)
+
+    try:
+        output, _ = await process.communicate()
+    finally:
+        if process.returncode is None:
+            _kill_process_group(process.pid)
+            await process.wait()
+
+    return process.returncode, output
+
+
+# ------------------------------
+# Private functions
+# ------------------------------
+
+def _write_cgroup_file(path: str, name: str, value: str) -> None:
+    with open(os.path.join(path, name), "w") as f:
+        f.write(value)
+
+
+def _kill_process_group(pgid: int) -> None:
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+# Exec wrapper: cores, memory, cgroup path, "--", command
+def _main(argv: list[str]) -> None:
+    separator = argv.index("--")
+    cores, memory_mb, cgroup_path = argv[:separator]
+
+    ProcessLimits(cores=tuple(int(core) for core in cores.split(",") if core != ""), memory_mb=int(memory_mb),
+                  cgroup_path=cgroup_path).apply()
+    os.execvp(argv[separator + 1], argv[separator + 1:])
+
+
+if __name__ == "__main__":
+    _main(sys.argv[1:])
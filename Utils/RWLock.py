@@ -1,9 +1,15 @@
+import time
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
+from dataclasses import replace
 from threading import Lock
-from typing import Generator
+from typing import Generator, Generic, TypeVar
 
 from Utils.Logger import Logger, LogLevel
+from Utils.Metrics import Metrics
+
+LOCK_WAIT_SECONDS = Metrics().histogram("rwlock_wait_seconds", "Time spent waiting for a contended RW lock",
+                                        ("mode",))
 
 
 class AbstractRWLock(ABC):
@@ -86,10 +92,10 @@ class BaseRWLock(AbstractRWLock):
 
     def get_read(self) -> None:
         if self._increment_read_counter() == 1:
-            self._obj_lock.acquire()
+            _acquire_timed(self._obj_lock, "read")
 
     def get_write(self) -> None:
-        self._obj_lock.acquire()
+        _acquire_timed(self._obj_lock, "write")
 
     def release_write(self) -> None:
         self._obj_lock.release()
@@ -121,13 +127,17 @@ class ExtendedRWLock(AbstractRWLock):
     # ------------------------------
 
     def get_read(self) -> None:
-        with self._write_lock:
+        _acquire_timed(self._write_lock, "read")
+
+        try:
             if self._increment_read_counter() == 1:
-                self._obj_lock.acquire()
+                _acquire_timed(self._obj_lock, "read")
+        finally:
+            self._write_lock.release()
 
     def get_write(self) -> None:
-        self._write_lock.acquire()
-        self._obj_lock.acquire()
+        _acquire_timed(self._write_lock, "write")
+        _acquire_timed(self._obj_lock, "write")
 
     def release_write(self) -> None:
         self._obj_lock.release()
@@ -305,3 +315,53 @@ class ObjectModel(OperableModel):
     def increment_gen_num_locked(self) -> None:
         with self.get_lock().write():
             self.increment_gen_num_unlocked()
+
+
+SnapshotT = TypeVar("SnapshotT")
+
+
+class SnapshotObjectModel(ObjectModel, Generic[SnapshotT]):
+    # Writers still serialize on the object write lock, but every change publishes a new immutable snapshot record.
+    # Readers only load the current reference, which is atomic, so they never touch the lock.
+
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _snapshot: SnapshotT
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, snapshot: SnapshotT) -> None:
+        super().__init__()
+        self._snapshot = snapshot
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def get_snapshot(self) -> SnapshotT:
+        return self._snapshot
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _publish_snapshot_unlocked(self, **changes) -> None:
+        self._snapshot = replace(self._snapshot, **changes)
+
+
+# ------------------------------
+# Private functions
+# ------------------------------
+
+# Only contended acquires are timed, so the common case stays a single non-blocking call
+def _acquire_timed(lock: Lock, mode: str) -> None:
+    if lock.acquire(blocking=False):
+        return
+
+    start = time.perf_counter()
+    lock.acquire()
+    LOCK_WAIT_SECONDS.observe(time.perf_counter() - start, (mode,))
@@ -1,10 +1,10 @@
 import os
 from threading import Thread, Lock
-from time import sleep
 from typing import Type, Callable
 
 from pydantic import BaseModel
 
+from Utils.FileWatcher import FileWatcher, create_file_watcher
 from Utils.GlobalObj import GlobalObj
 from Utils.Logger import Logger, LogLevel
 
@@ -13,7 +13,9 @@ class SettingsLoader(metaclass=GlobalObj):
     _settings_class: Type[BaseModel]
     _settings: BaseModel
     _settings_path: str
-    _last_edit_time: float
+    _last_content: str
+    _debounce_s: float
+    _watcher: FileWatcher
     _thread_should_work: bool
     _thread: Thread
     _lock: Lock
@@ -23,30 +25,41 @@ class SettingsLoader(metaclass=GlobalObj):
     # Class creation
     # ------------------------------
 
-    def __init__(self, settings_class: Type[BaseModel], path: str):
+    def __init__(self, settings_class: Type[BaseModel], path: str, debounce_s: float = 0.25,
+                 poll_interval_s: float = 1.0):
         try:
             self._settings_class = settings_class
             self._settings_path = path
+            content = None
 
             if os.path.exists(path):
-                self._settings = self.parse_settings(path)
-                self.save_settings(path)
+                with open(path, 'r') as f:
+                    content = f.read()
+                self._settings = self._settings_class.model_validate_json(content)
             else:
                 self._settings = self._settings_class()
-                self.save_settings(path)
+
+            # Missing fields are written out with their defaults, a complete file is left as it is
+            if content != self._settings.model_dump_json(indent=2):
+                content = self.save_settings(path)
         except Exception as e:
             raise Exception(f"Error occurred during loading initial settings: {e}")
 
-        self._last_edit_time = os.path.getmtime(self._settings_path)
+        # Bytes on disk, so the first change event is compared against what the file really holds
+        self._last_content = content
+        self._debounce_s = debounce_s
         self._lock = Lock()
         self._events = list[Callable[[BaseModel], None]]()
 
+        self._watcher = create_file_watcher(self._settings_path, poll_interval_s)
+
         self._thread_should_work = True
         self._thread = Thread(target=self._settings_loader_thread)
         self._thread.start()
 
     def destroy(self):
         self._thread_should_work = False
+        self._watcher.close()
         self._thread.join()
 
         Logger().log_info("Settings Loader destroyed", LogLevel.LOW_FREQ)
@@ -65,9 +78,11 @@ class SettingsLoader(metaclass=GlobalObj):
         Logger().log_info("New settings loaded", LogLevel.MEDIUM_FREQ)
         return model
 
-    def save_settings(self, path) -> None:
+    def save_settings(self, path) -> str:
+        content = self._settings.model_dump_json(indent=2)
         with open(path, 'w') as f:
-            f.write(self._settings.model_dump_json(indent=2))
+            f.write(content)
+        return content
 
     def get_settings(self) -> BaseModel:
         with self._lock:
@@ -83,22 +98,51 @@ class SettingsLoader(metaclass=GlobalObj):
 
     def _settings_loader_thread(self):
         while self._thread_should_work:
-            sleep(0.1)
-            self._periodic_settings_reload()
+            if not self._watcher.wait_for_change(None):
+                continue
+
+            # Editors tend to write in bursts, wait until the file is quiet before parsing
+            while self._thread_should_work and self._watcher.wait_for_change(self._debounce_s):
+                pass
+
+            if self._thread_should_work:
+                self._reload_settings_on_change()
+
+    def _run_events(self, settings: BaseModel) -> None:
+        with self._lock:
+            events = list(self._events)
+
+        for event in events:
+            try:
+                event(settings)
+            except Exception as e:
+                Logger().log_error(f"Settings event {event.__name__} failed: {e}", LogLevel.LOW_FREQ)
+
+    def _reload_settings_on_change(self) -> None:
+        try:
+            with open(self._settings_path, 'r') as f:
+                content = f.read()
+        except Exception as e:
+            Logger().log_error(f"Failed to read settings file: {e}", LogLevel.LOW_FREQ)
+            return
 
-    def _run_events_unlocked(self):
-        for event in self._events:
-            event(self._settings)
+        # Own writes and plain touches do not change anything
+        if content == self._last_content:
+            return
 
-    def _periodic_settings_reload(self):
-        mod_time = os.path.getmtime(self._settings_path)
+        try:
+            new_settings = self._settings_class.model_validate_json(content)
+        except Exception as e:
+            Logger().log_error(f"Failed to parse settings after init, restoring previous ones: {e}",
+                               LogLevel.LOW_FREQ)
 
-        if mod_time > self._last_edit_time:
-            self._last_edit_time = mod_time
             with self._lock:
-                try:
-                    self._settings = self.parse_settings_log(self._settings_path)
-                except Exception as e:
-                    Logger().log_error(f"Failed to parse settings after init: {e}", LogLevel.LOW_FREQ)
-                    self.save_settings(self._settings_path)
-                self._run_events_unlocked()
+                self._last_content = self.save_settings(self._settings_path)
+            return
+
+        with self._lock:
+            self._settings = new_settings
+            self._last_content = content
+
+        Logger().log_info("New settings loaded", LogLevel.MEDIUM_FREQ)
+        self._run_events(new_settings)
@@ -0,0 +1,183 @@
+import os
+import sys
+import time
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder, Loader
+from typing import Iterator
+
+from Utils.GlobalObj import GlobalObj
+
+# Stdlib only, so it can be started before anything heavy is imported
+
+PROFILE_FLAG: str = "--profile-startup"
+PROFILE_ENV: str = "CHECKMATE_PROFILE_STARTUP"
+
+
+class _TimingLoader(Loader):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _loader: Loader
+    _profiler: 'StartupProfiler'
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, loader: Loader, profiler: 'StartupProfiler') -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    # Anything else, e.g. get_data or get_resource_reader, goes straight to the wrapped loader
+    def __getattr__(self, name: str) -> any:
+        return getattr(self._loader, name)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def create_module(self, spec) -> any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        self._profiler.on_import_start()
+        start = time.perf_counter()
+
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler.on_import_end(module.__name__, time.perf_counter() - start)
+
+
+class _TimingFinder(MetaPathFinder):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _profiler: 'StartupProfiler'
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, profiler: 'StartupProfiler') -> None:
+        self._profiler = profiler
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Specs are looked up by the remaining finders, only their loaders are wrapped
+    def find_spec(self, fullname: str, path: any, target: any = None) -> any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimingLoader(spec.loader, self._profiler)
+            return spec
+
+        return None
+
+
+class StartupProfiler(metaclass=GlobalObj):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    REPORT_TOP_IMPORTS: int = 15
+
+    _is_enabled: bool
+    _start: float
+    _finder: _TimingFinder | None
+
+    # Import times in seconds, cumulative includes nested imports
+    _imports: list[tuple[str, float, float]]
+    _child_times: list[float]
+    _phases: list[tuple[str, float]]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, is_enabled: bool = False) -> None:
+        self._is_enabled = is_enabled
+        self._start = time.perf_counter()
+        self._finder = None
+
+        self._imports = []
+        self._child_times = [0.0]
+        self._phases = []
+
+        if is_enabled:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def destroy(self) -> None:
+        if self._finder is not None and self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def is_enabled(self) -> bool:
+        return self._is_enabled
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if not self._is_enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases.append((name, time.perf_counter() - start))
+
+    def on_import_start(self) -> None:
+        self._child_times.append(0.0)
+
+    def on_import_end(self, name: str, elapsed: float) -> None:
+        nested = self._child_times.pop()
+        self._child_times[-1] += elapsed
+        self._imports.append((name, elapsed - nested, elapsed))
+
+    def get_report(self) -> str:
+        total = time.perf_counter() - self._start
+        top_imports = sorted(self._imports, key=lambda entry: entry[1], reverse=True)[
+                      :StartupProfiler.REPORT_TOP_IMPORTS]
+
+        lines = [f"Startup profile, total: {total * 1000:.1f} ms, "
+                 f"imports: {self._child_times[0] * 1000:.1f} ms in {len(self._imports)} modules",
+                 "Phases:"]
+        lines += [f"\t{name:<40} {elapsed * 1000:9.1f} ms" for name, elapsed in self._phases]
+        lines += ["Slowest imports (self / cumulative):"]
+        lines += [f"\t{name:<40} {self_time * 1000:9.1f} ms {cumulative * 1000:9.1f} ms"
+                  for name, self_time, cumulative in top_imports]
+
+        return "\n".join(lines)
+
+    # Report goes to stderr, so it never mixes with command output
+    def report(self) -> None:
+        if not self._is_enabled:
+            return
+
+        print(self.get_report(), file=sys.stderr)
+        self.destroy()
+
+
+# Must run before the heavy imports of the entry point, returns the arguments without the profiling flag
+def start_startup_profiler(args: list[str] | None = None) -> list[str]:
+    args = [] if args is None else args
+    is_enabled = PROFILE_FLAG in args or os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+    StartupProfiler(is_enabled)
+    return [arg for arg in args if arg != PROFILE_FLAG]
@@ -0,0 +1,313 @@
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+
+from Models.WorkerModels import SocketMsg, SocketMsgType
+
+WirePayload = dict[str, Any]
+
+JSON_PROTOCOL = "json"
+BINARY_PROTOCOL = "binary-v3"
+
+# Ordered by preference, the manager picks the first one offered by the worker
+SUPPORTED_PROTOCOLS = [BINARY_PROTOCOL, JSON_PROTOCOL]
+
+
+class WireCodec(ABC):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    PROTOCOL: str
+
+    # ------------------------------
+    # Abstract methods
+    # ------------------------------
+
+    @abstractmethod
+    def encode(self, msg: SocketMsg) -> str | bytes:
+        pass
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Text frames are always JSON, so a peer may fall back for single messages without renegotiation
+    @staticmethod
+    def decode(data: str | bytes) -> SocketMsg:
+        if isinstance(data, str):
+            return JsonCodec.decode_json(data)
+        return BinaryCodec.decode_binary(data)
+
+
+class JsonCodec(WireCodec):
+    PROTOCOL = JSON_PROTOCOL
+
+    def encode(self, msg: SocketMsg) -> str:
+        return msg.model_dump_json()
+
+    @staticmethod
+    def decode_json(data: str) -> SocketMsg:
+        return SocketMsg.model_validate_json(data)
+
+
+class BinaryCodec(WireCodec):
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    PROTOCOL = BINARY_PROTOCOL
+    VERSION: int = 3
+
+    # version, msg type, payload length
+    HEADER: struct.Struct = struct.Struct("!BBI")
+    COUNT: struct.Struct = struct.Struct("!I")
+    ID: struct.Struct = struct.Struct("!q")
+    DURATION: struct.Struct = struct.Struct("!f")
+    PROGRESS: struct.Struct = struct.Struct("!qII")
+    FLAG: struct.Struct = struct.Struct("!B")
+    # cpu percent, rss, engine processes, system cpu percent, system available memory, load avg, host cpus
+    RESOURCES: struct.Struct = struct.Struct("!ddIdddI")
+    RESOURCES_FIELDS: tuple[str, ...] = ("cpu_percent", "rss_mb", "engine_processes", "system_cpu_percent",
+                                         "system_available_mb", "load_avg", "host_cpus")
+    # job id, task id, seeds encoding, seeds count
+    JOB_HEADER: struct.Struct = struct.Struct("!qqBI")
+    # job id, seq, done flag
+    CHUNK_HEADER: struct.Struct = struct.Struct("!qIB")
+    SEEDS_LIST: int = 0
+    SEEDS_RANGE: int = 1
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def encode(self, msg: SocketMsg) -> bytes | str:
+        encoder = _ENCODERS.get(msg.type)
+
+        # Types without a binary schema still travel as JSON text frames
+        if encoder is None:
+            return msg.model_dump_json()
+
+        body = encoder(msg.payload)
+        return BinaryCodec.HEADER.pack(BinaryCodec.VERSION, msg.type, len(body)) + body
+
+    @staticmethod
+    def decode_binary(data: bytes) -> SocketMsg:
+        version, msg_type, length = BinaryCodec.HEADER.unpack_from(data, 0)
+
+        if version != BinaryCodec.VERSION:
+            raise Exception(f"Unsupported binary frame version: {version}")
+
+        if length != len(data) - BinaryCodec.HEADER.size:
+            raise Exception(f"Binary frame length mismatch: {length} != {len(data) - BinaryCodec.HEADER.size}")
+
+        msg_type = SocketMsgType(msg_type)
+        decoder = _DECODERS.get(msg_type)
+
+        if decoder is None:
+            raise Exception(f"No binary schema for msg type: {msg_type.name}")
+
+        return SocketMsg(type=msg_type, payload=decoder(memoryview(data)[BinaryCodec.HEADER.size:]))
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    @staticmethod
+    def _pack_str(value: str) -> bytes:
+        encoded = value.encode()
+        return BinaryCodec.COUNT.pack(len(encoded)) + encoded
+
+    @staticmethod
+    def _unpack_str(data: memoryview, offset: int) -> tuple[str, int]:
+        length, = BinaryCodec.COUNT.unpack_from(data, offset)
+        offset += BinaryCodec.COUNT.size
+        return bytes(data[offset:offset + length]).decode(), offset + length
+
+    # Results are free text, so every one carries its own length instead of being joined with a separator
+    @staticmethod
+    def _pack_strs(values: list[str]) -> bytes:
+        return BinaryCodec.COUNT.pack(len(values)) + b"".join(BinaryCodec._pack_str(value) for value in values)
+
+    @staticmethod
+    def _unpack_strs(data: memoryview, offset: int) -> tuple[list[str], int]:
+        count, = BinaryCodec.COUNT.unpack_from(data, offset)
+        offset += BinaryCodec.COUNT.size
+        values = []
+
+        for _ in range(count):
+            value, offset = BinaryCodec._unpack_str(data, offset)
+            values.append(value)
+
+        return values, offset
+
+    @staticmethod
+    def _pack_ids(ids: list[int]) -> bytes:
+        return BinaryCodec.COUNT.pack(len(ids)) + struct.pack(f"!{len(ids)}q", *ids)
+
+    @staticmethod
+    def _unpack_ids(data: memoryview, offset: int) -> tuple[list[int], int]:
+        count, = BinaryCodec.COUNT.unpack_from(data, offset)
+        offset += BinaryCodec.COUNT.size
+        return list(struct.unpack_from(f"!{count}q", data, offset)), offset + count * BinaryCodec.ID.size
+
+    # Game durations do not need more than float32 precision
+    @staticmethod
+    def _pack_durations(durations: list[float]) -> bytes:
+        return BinaryCodec.COUNT.pack(len(durations)) + struct.pack(f"!{len(durations)}f", *durations)
+
+    @staticmethod
+    def _unpack_durations(data: memoryview, offset: int) -> tuple[list[float], int]:
+        count, = BinaryCodec.COUNT.unpack_from(data, offset)
+        offset += BinaryCodec.COUNT.size
+        return list(struct.unpack_from(f"!{count}f", data, offset)), offset + count * BinaryCodec.DURATION.size
+
+    @staticmethod
+    def _encode_ka(payload: WirePayload) -> bytes:
+        progress = payload.get("progress", [])
+        parts = [BinaryCodec.COUNT.pack(len(progress))]
+
+        for entry in progress:
+            parts.append(BinaryCodec.PROGRESS.pack(entry["job_id"], entry["games_done"], entry["games_total"]))
+
+        # Workers without a resource sample yet send only the absent flag
+        resources = payload.get("resources")
+        parts.append(BinaryCodec.FLAG.pack(resources is not None))
+
+        if resources is not None:
+            parts.append(BinaryCodec.RESOURCES.pack(*(resources[field] for field in BinaryCodec.RESOURCES_FIELDS)))
+
+        return b"".join(parts)
+
+    @staticmethod
+    def _decode_ka(data: memoryview) -> WirePayload:
+        count, = BinaryCodec.COUNT.unpack_from(data, 0)
+        offset = BinaryCodec.COUNT.size
+        progress = []
+
+        for _ in range(count):
+            job_id, games_done, games_total = BinaryCodec.PROGRESS.unpack_from(data, offset)
+            offset += BinaryCodec.PROGRESS.size
+            progress.append({"job_id": job_id, "games_done": games_done, "games_total": games_total})
+
+        has_resources, = BinaryCodec.FLAG.unpack_from(data, offset)
+        offset += BinaryCodec.FLAG.size
+
+        if not has_resources:
+            return {"progress": progress}
+
+        values = BinaryCodec.RESOURCES.unpack_from(data, offset)
+        return {"progress": progress, "resources": dict(zip(BinaryCodec.RESOURCES_FIELDS, values))}
+
+    @staticmethod
+    def _encode_job(payload: WirePayload) -> bytes:
+        seeds = payload["seeds"]
+        header = (payload["job_id"], payload["task_id"])
+
+        # Jobs usually get a contiguous block of seeds, which is sent as its first value only
+        if len(seeds) > 1 and seeds[-1] - seeds[0] == len(seeds) - 1 and seeds == list(range(seeds[0], seeds[-1] + 1)):
+            seeds_part = BinaryCodec.JOB_HEADER.pack(*header, BinaryCodec.SEEDS_RANGE, len(seeds)) + \
+                         BinaryCodec.ID.pack(seeds[0])
+        else:
+            seeds_part = BinaryCodec.JOB_HEADER.pack(*header, BinaryCodec.SEEDS_LIST, len(seeds)) + \
+                         struct.pack(f"!{len(seeds)}q", *seeds)
+
+        return seeds_part + BinaryCodec._pack_str(payload["arg_str"])
+
+    @staticmethod
+    def _decode_job(data: memoryview) -> WirePayload:
+        job_id, task_id, seeds_encoding, seeds_count = BinaryCodec.JOB_HEADER.unpack_from(data, 0)
+        offset = BinaryCodec.JOB_HEADER.size
+
+        if seeds_encoding == BinaryCodec.SEEDS_RANGE:
+            first_seed, = BinaryCodec.ID.unpack_from(data, offset)
+            seeds = list(range(first_seed, first_seed + seeds_count))
+            offset += BinaryCodec.ID.size
+        else:
+            seeds = list(struct.unpack_from(f"!{seeds_count}q", data, offset))
+            offset += seeds_count * BinaryCodec.ID.size
+
+        arg_str, _ = BinaryCodec._unpack_str(data, offset)
+        return {"job_id": job_id, "task_id": task_id, "arg_str": arg_str, "seeds": seeds}
+
+    @staticmethod
+    def _encode_result(payload: WirePayload) -> bytes:
+        chunks = payload["chunks"]
+        parts = [BinaryCodec.COUNT.pack(len(chunks))]
+
+        for chunk in chunks:
+            parts.append(BinaryCodec.CHUNK_HEADER.pack(chunk["job_id"], chunk["seq"], chunk.get("done", False)))
+            parts.append(BinaryCodec._pack_ids(chunk.get("seeds", [])))
+            parts.append(BinaryCodec._pack_strs(chunk.get("results", [])))
+            parts.append(BinaryCodec._pack_durations(chunk.get("durations", [])))
+            parts.append(BinaryCodec._pack_str(chunk.get("error", "")))
+
+        return b"".join(parts)
+
+    @staticmethod
+    def _decode_result(data: memoryview) -> WirePayload:
+        count, = BinaryCodec.COUNT.unpack_from(data, 0)
+        offset = BinaryCodec.COUNT.size
+        chunks = []
+
+        for _ in range(count):
+            job_id, seq, done = BinaryCodec.CHUNK_HEADER.unpack_from(data, offset)
+            seeds, offset = BinaryCodec._unpack_ids(data, offset + BinaryCodec.CHUNK_HEADER.size)
+            results, offset = BinaryCodec._unpack_strs(data, offset)
+            durations, offset = BinaryCodec._unpack_durations(data, offset)
+            error, offset = BinaryCodec._unpack_str(data, offset)
+
+            chunks.append({"job_id": job_id, "seq": seq, "seeds": seeds,
+                           "results": results, "durations": durations,
+                           "error": error, "done": bool(done)})
+
+        return {"chunks": chunks}
+
+    @staticmethod
+    def _encode_ack(payload: WirePayload) -> bytes:
+        return BinaryCodec._pack_ids(payload["job_ids"]) + BinaryCodec._pack_ids(payload["seqs"])
+
+    @staticmethod
+    def _decode_ack(data: memoryview) -> WirePayload:
+        job_ids, offset = BinaryCodec._unpack_ids(data, 0)
+        return {"job_ids": job_ids, "seqs": BinaryCodec._unpack_ids(data, offset)[0]}
+
+    @staticmethod
+    def _encode_job_ids(payload: WirePayload) -> bytes:
+        return BinaryCodec._pack_ids(payload["job_ids"])
+
+    @staticmethod
+    def _decode_job_ids(data: memoryview) -> WirePayload:
+        return {"job_ids": BinaryCodec._unpack_ids(data, 0)[0]}
+
+
+_ENCODERS: dict[SocketMsgType, Callable[[WirePayload], bytes]] = {
+    SocketMsgType.KA: BinaryCodec._encode_ka,
+    SocketMsgType.JOB: BinaryCodec._encode_job,
+    SocketMsgType.RESULT: BinaryCodec._encode_result,
+    SocketMsgType.ACK: BinaryCodec._encode_ack,
+    SocketMsgType.CANCEL: BinaryCodec._encode_job_ids,
+}
+
+_DECODERS: dict[SocketMsgType, Callable[[memoryview], WirePayload]] = {
+    SocketMsgType.KA: BinaryCodec._decode_ka,
+    SocketMsgType.JOB: BinaryCodec._decode_job,
+    SocketMsgType.RESULT: BinaryCodec._decode_result,
+    SocketMsgType.ACK: BinaryCodec._decode_ack,
+    SocketMsgType.CANCEL: BinaryCodec._decode_job_ids,
+}
+
+
+def negotiate_protocol(offered: list[str]) -> str:
+    for protocol in SUPPORTED_PROTOCOLS:
+        if protocol in offered:
+            return protocol
+    return JSON_PROTOCOL
+
+
+def create_codec(protocol: str) -> WireCodec:
+    if protocol == BINARY_PROTOCOL:
+        return BinaryCodec()
+    if protocol == JSON_PROTOCOL:
+        return JsonCodec()
+    raise ValueError(f"Unknown wire protocol: {protocol}")
@@ -1,14 +1,15 @@
-import json
 import os
-import socket
-import time
 from pathlib import Path
 from time import sleep
 
 from Worker.WorkerLib.CliTranslator import *
+from Worker.WorkerLib.FastCli import connect_to_worker, print_response
 from Worker.WorkerLib.LockFile import LockFile, LOCK_FILE_PATH
 
 
+MONITOR_DEFAULT_INTERVAL_S: float = 1
+
+
 class Cli(BaseCli):
     # ------------------------------
     # Class fields
@@ -54,57 +55,16 @@ class Cli(BaseCli):
         self._forward_backend_command_send(args_to_send)
         return index
 
-    def _cli_connection_life_cycle(self, client_socket, command_parts: list[str]) -> None:
-        full_command = ' '.join(command_parts)
-
-        Logger().log_info(f"Sending command '{full_command}' to the backend process", LogLevel.MEDIUM_FREQ)
-
-        try:
-            client_socket.connect(('localhost', SettingsLoader().get_settings().process_port))
-        except Exception as e:
-            raise Exception(f"Failed to connect with backend process: {e}")
-
-        try:
-            client_socket.sendall(json.dumps({"args": command_parts}).encode())
-        except Exception as e:
-            raise Exception(f"Failed to send command: {full_command}, error info: {e}")
-
-        try:
-            response = client_socket.recv(512 * 1024).decode()
-            client_socket.close()
-        except Exception as e:
-            raise Exception(f"Failed to receive response: {e}")
-
-        print(
-            f"Command: {full_command}, received response:\n\n{response}"
-            f"\n----------------------------------------------------------------------------------")
-
     def _forward_backend_command_send(self, command_parts: list[str]) -> None:
-        retries = 3
+        full_command = ' '.join(command_parts)
 
         if not Cli._is_worker_deployed():
             raise Exception("Worker is not deployed!")
 
-        client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client_socket.settimeout(5)
-
-        while retries > 0:
-            retries -= 1
-
-            try:
-                self._cli_connection_life_cycle(client_socket, command_parts)
-            except Exception as e:
-                msg = f"Failed sending msg to worker process: {e}"
-
-                if retries == 0:
-                    raise Exception(msg)
-                else:
-                    Logger().log_warning(msg, LogLevel.MEDIUM_FREQ)
-                    time.sleep(1)
-
-                continue
+        Logger().log_info(f"Sending command '{full_command}' to the backend process", LogLevel.MEDIUM_FREQ)
 
-            break
+        with connect_to_worker(SettingsLoader().get_settings().control_socket_path) as client:
+            print_response(full_command, client.request(command_parts))
 
     @staticmethod
     def _format_error_status(status) -> str:
@@ -179,5 +139,30 @@ class Cli(BaseCli):
               )
         return rv
 
+    def _monitor(self, index: int) -> int:
+        [index, options] = self.parse_options(index)
+        interval_s = float(Cli.extract_option_not_guarded(options, "interval") or MONITOR_DEFAULT_INTERVAL_S)
+
+        if not Cli._is_worker_deployed():
+            raise Exception("Worker is not deployed!")
+
+        # Single connection, the worker pushes a fresh state every interval
+        with connect_to_worker(SettingsLoader().get_settings().control_socket_path) as client:
+            try:
+                for response in client.stream(["--query_worker_state"], interval_s):
+                    print_response("--query_worker_state", response)
+            except KeyboardInterrupt:
+                pass
+
+        return index
+
+    @staticmethod
+    def _monitor_help() -> str:
+        rv = ("syntax: --monitor [interval=seconds]\n\t"
+              "Command will display worker state every interval (1 second by default) until interrupted"
+              )
+        return rv
+
     BaseCli.add_command(CommandCli(CommandType.FRONTEND, "deploy", _deploy, _deploy_help))
     BaseCli.add_command(CommandCli(CommandType.FRONTEND, "version", _version, _version_help))
+    BaseCli.add_command(CommandCli(CommandType.FRONTEND, "monitor", _monitor, _monitor_help))
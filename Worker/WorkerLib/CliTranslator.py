@@ -40,6 +40,9 @@ class CliTranslator(BaseCli):
 
         return self._execute_command(cli_cmd, index)
 
+    def _notify_parse_fail(self, arg: any) -> None:
+        self._response = f"{arg}"
+
     # ------------------------------
     # Private methods
     # ------------------------------
@@ -186,9 +189,9 @@ class CliTranslator(BaseCli):
     def _query_worker_state(self, index: int) -> int:
         worker_process_status = ("Worker state: Healthy\n"
                                  f"RAM assigned in MB: {WorkerComponents().get_conn_mgr().get_max_mem_str()}\n"
-                                 f"RAM usage: NOT IMPLEMENTED\n"
+                                 f"RAM usage: {WorkerComponents().get_conn_mgr().get_mem_usage_str()}\n"
                                  f"CPUs assigned: {WorkerComponents().get_conn_mgr().get_max_cpus_str()}\n"
-                                 f"CPUs utilized: NOT IMPLEMENTED\n"
+                                 f"CPUs utilized: {WorkerComponents().get_conn_mgr().get_cpu_usage_str()}\n"
                                  "Worker last harden: NOT IMPLEMENTED\n"
                                  "Worker repo size: NOT IMPLEMENTED\n"
                                  f"Worker uptime: {WorkerComponents().get_worker_process().get_uptime_str()}\n"
@@ -198,6 +201,7 @@ class CliTranslator(BaseCli):
                                 "Ongoing jobs count: NOT IMPLEMENTED\n"
                                 "Completed jobs count: NOT IMPLEMENTED\n"
                                 "Synced jobs count: NOT IMPLEMENTED\n"
+                                f"Unacknowledged result chunks: {WorkerComponents().get_test_job_mgr().get_num_unacked_results()}\n"
                                 "Blocked tasks: NOT IMPLEMENTED\n"
                                 "Average job time: NOT IMPLEMENTED\n")
 
@@ -205,7 +209,8 @@ class CliTranslator(BaseCli):
                                    f"Last registration KA hardened: {WorkerComponents().get_conn_mgr().get_last_ka_str()}\n"
                                    f"Registered name: {WorkerComponents().get_conn_mgr().get_registered_name()}\n"
                                    f"Session token: {WorkerComponents().get_conn_mgr().get_registered_token()}\n"
-                                   "Connection status: NOT IMPLEMENTED\n")
+                                   f"Connection status: {WorkerComponents().get_conn_mgr().get_connection_str()}\n"
+                                   f"Manager requests: {WorkerComponents().get_conn_mgr().get_http_stats_str()}\n")
 
         self._response = f"\n{worker_process_status}\n{test_jobs_mgr_status}\n{connectivity_mgr_status}"
 
@@ -0,0 +1,149 @@
+import json
+import socket
+import struct
+from typing import Iterator
+
+# Control channel between the CLI and the worker process, stdlib only so the fast CLI path can use it.
+# Every frame is a 4 byte big endian length followed by a JSON object of that length:
+#   request:  {"id": int, "args": [str, ...], "interval_s": float (optional)}
+#   cancel:   {"id": int, "cancel": true}
+#   response: {"id": int, "ok": bool, "response": str}
+# Requests on one connection are processed concurrently and answered in completion order, matched by id.
+# Requests with interval_s are repeated by the worker and answered until cancelled or disconnected.
+
+DEFAULT_CONTROL_SOCKET_PATH: str = "/tmp/Checkmate-Chariot-Worker.sock"
+
+FRAME_HEADER: struct.Struct = struct.Struct("!I")
+MAX_FRAME_SIZE: int = 16 * 1024 * 1024
+
+
+def encode_frame(message: dict[str, any]) -> bytes:
+    body = json.dumps(message).encode()
+
+    if len(body) > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {len(body)} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes")
+
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def decode_frame_size(header: bytes) -> int:
+    size = FRAME_HEADER.unpack(header)[0]
+
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the limit of {MAX_FRAME_SIZE} bytes")
+
+    return size
+
+
+def decode_frame_body(body: bytes) -> dict[str, any]:
+    message = json.loads(body)
+
+    if not isinstance(message, dict) or not isinstance(message.get("id"), int):
+        raise ValueError("Expected JSON object with an integer id")
+
+    return message
+
+
+class ControlClient:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _socket: socket.socket
+    _timeout_s: float
+    _next_id: int
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Connection is kept open, so monitoring scripts pay the connection cost only once
+    def __init__(self, path: str = DEFAULT_CONTROL_SOCKET_PATH, timeout_s: float = 5) -> None:
+        self._timeout_s = timeout_s
+        self._next_id = 0
+
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.settimeout(timeout_s)
+
+        try:
+            self._socket.connect(path)
+        except Exception:
+            self._socket.close()
+            raise
+
+    def close(self) -> None:
+        self._socket.close()
+
+    def __enter__(self) -> 'ControlClient':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Raises with the worker response when the command fails
+    def request(self, args: list[str]) -> str:
+        request_id = self._send_request(args)
+        return ControlClient._check_response(self._receive_response(request_id))
+
+    # Yields responses of the command repeated every interval, until the generator is closed
+    def stream(self, args: list[str], interval_s: float) -> Iterator[str]:
+        request_id = self._send_request(args, interval_s)
+        self._socket.settimeout(interval_s + self._timeout_s)
+
+        try:
+            while True:
+                yield ControlClient._check_response(self._receive_response(request_id))
+        finally:
+            self._socket.settimeout(self._timeout_s)
+
+            # Connection may be already broken, then there is nothing to cancel
+            try:
+                self._socket.sendall(encode_frame({"id": request_id, "cancel": True}))
+            except OSError:
+                pass
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _send_request(self, args: list[str], interval_s: float | None = None) -> int:
+        request_id = self._next_id
+        self._next_id += 1
+
+        message = {"id": request_id, "args": args}
+        if interval_s is not None:
+            message["interval_s"] = interval_s
+
+        self._socket.sendall(encode_frame(message))
+        return request_id
+
+    # Responses to cancelled streams may still arrive, they are skipped
+    def _receive_response(self, request_id: int) -> dict[str, any]:
+        while True:
+            size = decode_frame_size(self._receive_exact(FRAME_HEADER.size))
+            message = decode_frame_body(self._receive_exact(size))
+
+            if message["id"] == request_id:
+                return message
+
+    def _receive_exact(self, size: int) -> bytes:
+        data = bytearray()
+
+        while len(data) < size:
+            chunk = self._socket.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Worker process closed the connection")
+            data += chunk
+
+        return bytes(data)
+
+    @staticmethod
+    def _check_response(message: dict[str, any]) -> str:
+        if not message.get("ok", False):
+            raise Exception(message.get("response", "Unknown error"))
+
+        return message.get("response", "")
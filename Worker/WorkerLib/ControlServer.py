@@ -0,0 +1,187 @@
+import asyncio
+import os
+from typing import Callable
+
+from Utils.Logger import Logger, LogLevel
+from Worker.WorkerLib.ControlProtocol import encode_frame, decode_frame_size, decode_frame_body, FRAME_HEADER
+
+# Streams faster than that would only spin the worker
+MIN_STREAM_INTERVAL_S: float = 0.05
+
+# Time given to requests in flight to be answered when the server stops
+STOP_GRACE_PERIOD_S: float = 5
+
+
+class ControlServer:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _path: str
+    _handler: Callable[[list[str]], str]
+
+    _should_work: bool
+    _loop: asyncio.AbstractEventLoop | None
+    _stop_event: asyncio.Event | None
+    _connections: set[asyncio.Task]
+    _writers: set[asyncio.StreamWriter]
+    _single_requests: set[asyncio.Task]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Handler executes a single command and returns its response, failures are reported by raising.
+    # It is run in executor threads, so slow commands never block other clients.
+    def __init__(self, path: str, handler: Callable[[list[str]], str]) -> None:
+        self._path = path
+        self._handler = handler
+
+        self._should_work = True
+        self._loop = None
+        self._stop_event = None
+        self._connections = set()
+        self._writers = set()
+        self._single_requests = set()
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    # Blocks until stop is called, meant to be run with asyncio.run on a dedicated thread
+    async def serve(self) -> None:
+        self._stop_event = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+
+        if not self._should_work:
+            return
+
+        # Lock file guarantees a single worker, so the socket left behind by a crashed one is stale
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+
+        server = await asyncio.start_unix_server(self._handle_connection, path=self._path)
+        os.chmod(self._path, 0o600)
+        Logger().log_info(f"Control server listening on: {self._path}", LogLevel.LOW_FREQ)
+
+        try:
+            await self._stop_event.wait()
+        finally:
+            server.close()
+
+            # Commands already received, e.g. the stop command itself, still get their responses
+            if len(self._single_requests) != 0:
+                await asyncio.wait(self._single_requests, timeout=STOP_GRACE_PERIOD_S)
+
+            # Closed connections see EOF, so their handlers exit and cancel remaining streams
+            for writer in list(self._writers):
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await server.wait_closed()
+
+            if os.path.exists(self._path):
+                os.unlink(self._path)
+
+            Logger().log_info("Control server stopped", LogLevel.LOW_FREQ)
+
+    def stop(self) -> None:
+        self._should_work = False
+
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._stop_event.set)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections.add(asyncio.current_task())
+        self._writers.add(writer)
+        requests = dict[int, asyncio.Task]()
+
+        Logger().log_info("Control client connected", LogLevel.MEDIUM_FREQ)
+
+        try:
+            while True:
+                message = await ControlServer._read_frame(reader)
+                if message is None:
+                    break
+
+                request_id = message["id"]
+                if request_id in requests:
+                    requests.pop(request_id).cancel()
+
+                if message.get("cancel", False):
+                    continue
+
+                request = asyncio.create_task(self._process_request(message, writer))
+                request.add_done_callback(
+                    lambda task, key=request_id: requests.pop(key) if requests.get(key) is task else None)
+                requests[request_id] = request
+
+                if "interval_s" not in message:
+                    self._single_requests.add(request)
+                    request.add_done_callback(self._single_requests.discard)
+
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            Logger().log_info(f"Control client disconnected: {e}", LogLevel.MEDIUM_FREQ)
+        except ValueError as e:
+            Logger().log_error(f"Received malformed control frame: {e}", LogLevel.LOW_FREQ)
+        finally:
+            for request in requests.values():
+                request.cancel()
+            await asyncio.gather(*requests.values(), return_exceptions=True)
+
+            writer.close()
+            self._writers.discard(writer)
+            self._connections.discard(asyncio.current_task())
+
+    async def _process_request(self, message: dict[str, any], writer: asyncio.StreamWriter) -> None:
+        args = message.get("args")
+        interval_s = message.get("interval_s")
+
+        is_valid = isinstance(args, list) and all(isinstance(arg, str) for arg in args)
+
+        while True:
+            is_ok, response = await asyncio.to_thread(self._execute, args) if is_valid \
+                else (False, "Expected args as list of strings")
+
+            try:
+                await ControlServer._write_response(writer, message["id"], is_ok, response)
+            except OSError:
+                return
+
+            if not is_valid or not isinstance(interval_s, (int, float)):
+                return
+
+            await asyncio.sleep(max(interval_s, MIN_STREAM_INTERVAL_S))
+
+    def _execute(self, args: list[str]) -> tuple[bool, str]:
+        Logger().log_info(f"Received control command: {' '.join(args)}", LogLevel.MEDIUM_FREQ)
+
+        try:
+            return True, self._handler(args)
+        except Exception as e:
+            msg = f"Failed to parse or process command : {e}"
+            Logger().log_error(msg, LogLevel.LOW_FREQ)
+            return False, msg
+
+    @staticmethod
+    async def _read_frame(reader: asyncio.StreamReader) -> dict[str, any] | None:
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+        except asyncio.IncompleteReadError as e:
+            # Clean disconnect between frames
+            if len(e.partial) == 0:
+                return None
+            raise
+
+        body = await reader.readexactly(decode_frame_size(header))
+        return decode_frame_body(body)
+
+    # Every frame is written with a single call, so responses of concurrent requests never interleave
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, request_id: int, is_ok: bool, response: str) -> None:
+        writer.write(encode_frame({"id": request_id, "ok": is_ok, "response": response}))
+        await writer.drain()
@@ -0,0 +1,91 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from Utils.Logger import Logger, LogLevel
+from Utils.ProcessLimits import ProcessLimits, get_usable_cores, create_memory_cgroups, remove_cgroups
+
+
+class CoreAllocator:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    # Smaller shares can not fit a game with its engines, such slots are left without a memory cap
+    MIN_SLOT_MEMORY_MB: int = 128
+
+    _cpus: int
+    _memory_mb: int
+    _slots: list[ProcessLimits]
+    _free_slots: asyncio.Queue[ProcessLimits]
+    _cgroups: list[str]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    # Every game gets a slot with its own core and an equal share of memoryMB, zero memory means no limit.
+    # Must be created on the loop that acquires the slots.
+    def __init__(self, cpus: int, memory_mb: int, pin_cores: bool, limit_memory: bool) -> None:
+        self._cpus = max(1, cpus)
+        self._memory_mb = memory_mb
+
+        cores = get_usable_cores() if pin_cores else []
+        slot_memory_mb = memory_mb // self._cpus if limit_memory else 0
+
+        if 0 < slot_memory_mb < CoreAllocator.MIN_SLOT_MEMORY_MB:
+            Logger().log_warning(f"Worker declared {memory_mb} MB for {self._cpus} cpus, {slot_memory_mb} MB per game "
+                                 f"is below the minimum of {CoreAllocator.MIN_SLOT_MEMORY_MB} MB, game memory is not "
+                                 f"limited", LogLevel.LOW_FREQ)
+            slot_memory_mb = 0
+
+        if len(cores) != 0 and self._cpus > len(cores):
+            Logger().log_warning(f"Worker declared {self._cpus} cpus, but only {len(cores)} cores are usable, "
+                                 f"games will share cores", LogLevel.LOW_FREQ)
+
+        # Highest cores are taken, so the first ones stay for the worker itself and the system
+        pinned = cores[-self._cpus:]
+        slot_cores = [(pinned[i % len(pinned)],) if len(pinned) != 0 else () for i in range(self._cpus)]
+
+        self._cgroups = create_memory_cgroups([f"game-{i}" for i in range(self._cpus)], slot_memory_mb) \
+            if slot_memory_mb != 0 else []
+
+        if slot_memory_mb != 0 and len(self._cgroups) == 0:
+            Logger().log_warning(f"Memory cgroups are not usable, {slot_memory_mb} MB per game is enforced per "
+                                 f"process with rlimits, a game with its engines may use more in total",
+                                 LogLevel.LOW_FREQ)
+
+        self._slots = [ProcessLimits(cores=slot_cores[i], memory_mb=slot_memory_mb,
+                                     cgroup_path=self._cgroups[i] if len(self._cgroups) != 0 else "")
+                       for i in range(self._cpus)]
+        self._free_slots = asyncio.Queue()
+        for slot in self._slots:
+            self._free_slots.put_nowait(slot)
+
+        Logger().log_info(f"Core allocator created with {self._cpus} game slots, cores: "
+                          f"{[slot.cores for slot in self._slots] if len(cores) != 0 else 'not pinned'}, memory per "
+                          f"game: {f'{slot_memory_mb} MB' if slot_memory_mb != 0 else 'not limited'}, "
+                          f"memory limited by: {'cgroups' if len(self._cgroups) != 0 else 'rlimits'}",
+                          LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        remove_cgroups(self._cgroups)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def is_matching(self, cpus: int, memory_mb: int) -> bool:
+        return self._cpus == max(1, cpus) and self._memory_mb == memory_mb
+
+    def get_num_slots(self) -> int:
+        return len(self._slots)
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[ProcessLimits]:
+        slot = await self._free_slots.get()
+
+        try:
+            yield slot
+        finally:
+            self._free_slots.put_nowait(slot)
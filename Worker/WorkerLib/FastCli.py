@@ -0,0 +1,88 @@
+import json
+import sys
+import time
+
+from Worker.WorkerLib.ControlProtocol import ControlClient, DEFAULT_CONTROL_SOCKET_PATH
+
+# Forwards backend commands to the worker process using stdlib only. Pydantic models, psutil and all command
+# translators are never imported here, so short CLI invocations start almost instantly.
+
+# Commands executed by the CLI itself, they need the full Cli
+FRONTEND_COMMANDS: list[str] = ["deploy", "version", "help", "monitor"]
+
+CONNECT_RETRIES: int = 3
+
+
+def is_fast_path_possible(args: list[str]) -> bool:
+    if len(args) == 0 or not _is_command(args[0]):
+        return False
+
+    return all(arg.strip()[2:].strip() not in FRONTEND_COMMANDS for arg in args if _is_command(arg))
+
+
+# Returns the CLI exit code, same output as the full Cli
+def fast_forward_commands(args: list[str], settings_path: str) -> int:
+    try:
+        # All commands share a single connection
+        with connect_to_worker(read_control_socket_path(settings_path)) as client:
+            for command_parts in _split_commands(args):
+                full_command = ' '.join(command_parts)
+                print_response(full_command, client.request(command_parts))
+    except Exception as e:
+        print(f"Command failed: {e}")
+        return 1
+
+    return 0
+
+
+def read_control_socket_path(settings_path: str) -> str:
+    try:
+        with open(settings_path, "r") as f:
+            return str(json.load(f).get("control_socket_path", DEFAULT_CONTROL_SOCKET_PATH))
+    except (OSError, ValueError):
+        return DEFAULT_CONTROL_SOCKET_PATH
+
+
+def connect_to_worker(path: str) -> ControlClient:
+    retries = CONNECT_RETRIES
+
+    while True:
+        retries -= 1
+
+        try:
+            return ControlClient(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Nobody listens on the socket, retrying would only delay the error
+            raise Exception("Worker is not deployed!")
+        except Exception as e:
+            if retries == 0:
+                raise Exception(f"Failed to connect with worker process: {e}")
+
+            print(f"Failed to connect with worker process: {e}", file=sys.stderr)
+            time.sleep(1)
+
+
+def print_response(full_command: str, response: str) -> None:
+    print(
+        f"Command: {full_command}, received response:\n\n{response}"
+        f"\n----------------------------------------------------------------------------------")
+
+
+# ------------------------------
+# Private functions
+# ------------------------------
+
+def _is_command(arg: str) -> bool:
+    return arg.strip().startswith("--")
+
+
+def _split_commands(args: list[str]) -> list[list[str]]:
+    commands = list[list[str]]()
+
+    for arg in args:
+        if _is_command(arg):
+            commands.append([f"--{arg.strip()[2:].strip()}"])
+        else:
+            commands[-1].append(arg)
+
+    return commands
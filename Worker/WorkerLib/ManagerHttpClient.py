@@ -0,0 +1,151 @@
+import time
+from threading import Lock
+
+import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from Utils.Logger import Logger, LogLevel
+from Utils.SettingsLoader import SettingsLoader
+
+
+class EndpointStats:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    count: int
+    failures: int
+    total_s: float
+    max_s: float
+    last_s: float
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.total_s = 0
+        self.max_s = 0
+        self.last_s = 0
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def add_sample(self, latency_s: float, failed: bool) -> None:
+        self.count += 1
+        self.failures += 1 if failed else 0
+        self.total_s += latency_s
+        self.max_s = max(self.max_s, latency_s)
+        self.last_s = latency_s
+
+    def get_avg_s(self) -> float:
+        return self.total_s / self.count if self.count != 0 else 0
+
+
+class ManagerHttpClient:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    # Only unregister is retried by the pool: register is not idempotent and a lost KA is replaced by the next one
+    RETRIED_PATHS: list[str] = ["/worker/unregister"]
+    RETRIED_STATUSES: list[int] = [502, 503, 504]
+
+    _session: requests.Session
+    _mounted_hosts: set[str]
+
+    _stats_lock: Lock
+    _stats: dict[str, EndpointStats]
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        self._session = requests.Session()
+        self._session.headers.update({"Content-Type": "application/json"})
+        self._mounted_hosts = set[str]()
+
+        self._stats_lock = Lock()
+        self._stats = dict[str, EndpointStats]()
+
+    def destroy(self) -> None:
+        self._session.close()
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def post(self, host: str, path: str, model: BaseModel) -> requests.Response:
+        return self._send("POST", host, path, model)
+
+    def delete(self, host: str, path: str, model: BaseModel) -> requests.Response:
+        return self._send("DELETE", host, path, model)
+
+    def get_stats_str(self) -> str:
+        with self._stats_lock:
+            if len(self._stats) == 0:
+                return "NO REQUESTS SENT YET"
+
+            return "".join(f"\n\t{path}: count={stats.count}, failures={stats.failures}, "
+                           f"avg={stats.get_avg_s() * 1000:.1f}ms, max={stats.max_s * 1000:.1f}ms, "
+                           f"last={stats.last_s * 1000:.1f}ms"
+                           for path, stats in self._stats.items())
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _send(self, method: str, host: str, path: str, model: BaseModel) -> requests.Response:
+        self._mount_host(host)
+
+        payload = model.model_dump_json()
+        Logger().log_info(f"Sending {method} request to {host}{path} with payload: {payload}", LogLevel.MEDIUM_FREQ)
+
+        timestamp_before = time.perf_counter()
+        failed = True
+
+        try:
+            response = self._session.request(method, f"{host}{path}", data=payload,
+                                             timeout=SettingsLoader().get_settings().http_timeout)
+            failed = not response.ok
+        finally:
+            self._add_sample(path, time.perf_counter() - timestamp_before, failed)
+
+        Logger().log_info(f"Received response with status: {response.status_code}", LogLevel.HIGH_FREQ)
+
+        return response
+
+    def _add_sample(self, path: str, latency_s: float, failed: bool) -> None:
+        with self._stats_lock:
+            if path not in self._stats:
+                self._stats[path] = EndpointStats()
+
+            self._stats[path].add_sample(latency_s, failed)
+
+    def _mount_host(self, host: str) -> None:
+        if host in self._mounted_hosts:
+            return
+
+        settings = SettingsLoader().get_settings()
+
+        # requests picks the adapter with the longest matching prefix
+        self._session.mount(host, HTTPAdapter(pool_maxsize=settings.http_pool_size,
+                                              max_retries=Retry(total=1, connect=1, read=0, status=0, other=0)))
+
+        retry_policy = Retry(total=settings.unregister_retries,
+                             backoff_factor=settings.retry_timestep,
+                             status_forcelist=ManagerHttpClient.RETRIED_STATUSES,
+                             allowed_methods=["POST", "DELETE"],
+                             raise_on_status=False)
+
+        for path in ManagerHttpClient.RETRIED_PATHS:
+            self._session.mount(f"{host}{path}", HTTPAdapter(pool_maxsize=settings.http_pool_size,
+                                                             max_retries=retry_policy))
+
+        self._mounted_hosts.add(host)
@@ -1,18 +1,24 @@
+import asyncio
 import json
+import random
 import time
 from threading import Thread
-from time import sleep
+from typing import Callable, Awaitable
 
-import requests
-import websockets
 from pydantic import BaseModel
+from websockets.asyncio.client import connect, ClientConnection
 
 from Models.GlobalModels import CommandResult
-from Models.WorkerModels import WorkerRegistration, WorkerModel, WorkerAuth
+from Models.WorkerModels import WorkerRegistration, WorkerModel, WorkerAuth, SocketMsg, SocketMsgType, \
+    KeepAlivePayload, SocketAuthResult, WorkerResources
 from Utils.Helpers import get_pretty_time_spent_string_from_seconds, convert_ns_to_s
 from Utils.Logger import Logger, LogLevel
 from Utils.SettingsLoader import SettingsLoader
-from Worker.WorkerLib.WorkerComponents import WorkerComponents, StopType
+from Utils.WireCodec import WireCodec, JsonCodec, SUPPORTED_PROTOCOLS, create_codec
+from Worker.WorkerLib.ManagerHttpClient import ManagerHttpClient
+from Worker.WorkerLib.WorkerComponents import WorkerComponents, StopType, BlockType
+
+SocketMsgHandler = Callable[[SocketMsg], Awaitable[None]]
 
 
 class NetConnectionMgr:
@@ -23,14 +29,21 @@ class NetConnectionMgr:
     _session_token: int | None
     _session_model: WorkerModel | None
     _session_host: str | None
-
-    _socket_mgr: websockets.WebSocketClientProtocol | None
-    _connection_thread: Thread | None
-    _should_conn_thread_work: bool
+    _http_client: ManagerHttpClient
+
+    # Whole network stack lives on a single event loop owned by the runtime thread
+    _loop: asyncio.AbstractEventLoop
+    _runtime_thread: Thread
+
+    _socket_mgr: ClientConnection | None
+    _codec: WireCodec
+    _socket_msg_handlers: dict[SocketMsgType, SocketMsgHandler]
+    _on_connected_callbacks: list[Callable[[], None]]
+    _connection_task: asyncio.Task | None
+    _ka_task: asyncio.Task | None
+    _msg_tasks: set[asyncio.Task]
     _is_connected_and_authenticated: bool
 
-    _ka_thread: Thread | None
-    _should_ka_thread_work: bool
     _last_ka_time_stamp: int
 
     # ------------------------------
@@ -41,38 +54,40 @@ class NetConnectionMgr:
         self._session_token = None
         self._session_host = None
         self._session_model = None
+        self._http_client = ManagerHttpClient()
 
-        # Prepare conn thread
-        self._connection_thread = None
         self._socket_mgr = None
-        self._should_conn_thread_work = False
+        self._codec = JsonCodec()
+        self._socket_msg_handlers = {}
+        self._on_connected_callbacks = []
+        self._connection_task = None
+        self._ka_task = None
+        self._msg_tasks = set[asyncio.Task]()
         self._is_connected_and_authenticated = False
-
-        # Prepare KA thread
-        self._should_ka_thread_work = True
         self._last_ka_time_stamp = 0
-        self._ka_thread = Thread(target=self._ka_thread_func)
-        self._ka_thread.start()
+
+        self._loop = asyncio.new_event_loop()
+        self._runtime_thread = Thread(target=self._runtime_thread_func)
+        self._runtime_thread.start()
+
+        self._run_on_loop(self._start_ka())
 
     def destroy(self) -> None:
-        # Abort ka thread
-        self._should_ka_thread_work = False
-        self._ka_thread.join()
-        self._ka_thread = None
-
-        # TODO: Implement conn thread fully
-        # if WorkerComponents().get_worker_process().get_stop_type() == StopType.abort_stop or not WorkerComponents().get_conn_mgr().is_registered():
-        #     self.abort_connection_sync()
-        #     return
-
-        # self._should_conn_thread_work = False
-        # self._is_connected_and_authenticated = False
-        # try:
-        #     WorkerComponents().get_conn_mgr().unregister()
-        #     self._connection_thread.join(SettingsLoader().get_settings().gentle_stop_timeout)
-        # except Exception as e:
-        #     Logger().log_error(f"Failed to gently close connection with manager: {e}. Aborting...", LogLevel.LOW_FREQ)
-        #     self.abort_connection_sync()
+        # Gently stopped worker unregisters, so the manager requeues its jobs without waiting for the KA timeout
+        if WorkerComponents().get_worker_process().get_stop_type() == StopType.gentle_stop and self.is_registered():
+            try:
+                self.unregister()
+            except Exception as e:
+                Logger().log_error(f"Failed to gently close connection with manager: {e}. Aborting...",
+                                   LogLevel.LOW_FREQ)
+
+        self._run_on_loop(self._shutdown())
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._runtime_thread.join()
+        self._loop.close()
+
+        self._http_client.destroy()
 
     # ------------------------------
     # Class interaction
@@ -102,17 +117,50 @@ class NetConnectionMgr:
     def get_connection_str(self) -> str:
         return "CONNECTED" if self.is_connected() else "NOT CONNECTED"
 
+    # RSS in MB of the worker process with all its engines
     def get_mem_usage(self) -> int:
-        raise NotImplementedError("Method not implemented")
+        sample = WorkerComponents().get_resource_sampler().get_latest()
+        return round(sample.get_rss_mb()) if sample is not None else 0
 
+    # Percent of a single core used by the worker process with all its engines
     def gem_cpu_usage(self) -> int:
-        raise NotImplementedError("Method not implemented")
+        sample = WorkerComponents().get_resource_sampler().get_latest()
+        return round(sample.get_cpu_percent()) if sample is not None else 0
 
     def get_cpu_usage_str(self) -> str:
-        raise NotImplementedError("Method not implemented")
+        sample = WorkerComponents().get_resource_sampler().get_latest()
+        if sample is None:
+            return "NOT SAMPLED YET"
+
+        return (f"{sample.get_cpu_percent():.0f}% (worker: {sample.process_cpu_percent:.0f}%, "
+                f"engines: {sample.engines_cpu_percent:.0f}% in {sample.engine_processes} processes), "
+                f"machine: {sample.system_cpu_percent:.0f}% of "
+                f"{WorkerComponents().get_resource_sampler().get_host_cpus() * 100}%, load: {sample.load_avg:.2f}")
 
     def get_mem_usage_str(self) -> str:
-        raise NotImplementedError("Method not implemented")
+        sample = WorkerComponents().get_resource_sampler().get_latest()
+        if sample is None:
+            return "NOT SAMPLED YET"
+
+        return (f"{sample.get_rss_mb():.1f} MB (worker: {sample.process_rss_mb:.1f} MB, "
+                f"engines: {sample.engines_rss_mb:.1f} MB), machine available: {sample.system_available_mb:.0f} MB")
+
+    # None until the first sample is taken
+    def get_resources(self) -> WorkerResources | None:
+        sampler = WorkerComponents().get_resource_sampler()
+        sample = sampler.get_average(SettingsLoader().get_settings().ka_interval)
+
+        if sample is None:
+            return None
+
+        return WorkerResources(cpu_percent=sample.get_cpu_percent(), rss_mb=sample.get_rss_mb(),
+                               engine_processes=sample.engine_processes,
+                               system_cpu_percent=sample.system_cpu_percent,
+                               system_available_mb=sample.system_available_mb, load_avg=sample.load_avg,
+                               host_cpus=sampler.get_host_cpus())
+
+    def get_http_stats_str(self) -> str:
+        return self._http_client.get_stats_str()
 
     def get_last_ka_str(self) -> str:
         if self._last_ka_time_stamp == 0:
@@ -123,32 +171,37 @@ class NetConnectionMgr:
 
         return get_pretty_time_spent_string_from_seconds(time_from_last_ka_s)
 
-    def abort_connection_sync(self) -> None:
-        Logger().log_info("Started connection with Manager abort", LogLevel.LOW_FREQ)
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        return self._loop
+
+    def register_socket_msg_handler(self, msg_type: SocketMsgType, handler: SocketMsgHandler) -> None:
+        self._socket_msg_handlers[msg_type] = handler
+
+    # Callbacks run on the runtime loop after every successful authentication, including reconnects
+    def register_on_connected(self, callback: Callable[[], None]) -> None:
+        self._on_connected_callbacks.append(callback)
 
-        self._should_conn_thread_work = False
+    # Must be awaited on the runtime loop
+    async def send_msg(self, msg: SocketMsg) -> None:
+        socket = self._socket_mgr
 
-        if self._socket_mgr is not None:
-            self._socket_mgr.close()
-            self._socket_mgr = None
+        if socket is None or not self.is_connected():
+            raise Exception("Worker is not connected to the manager")
 
-        self._connection_thread.join()
-        self._connection_thread = None
+        await socket.send(self._codec.encode(msg))
 
+    def abort_connection_sync(self) -> None:
+        Logger().log_info("Started connection with Manager abort", LogLevel.LOW_FREQ)
+        self._run_on_loop(self._stop_connection())
         Logger().log_info("Connection with Manager aborted correctly", LogLevel.LOW_FREQ)
 
     def bond_connection_async(self, host: str) -> None:
         if self.is_connected():
             Logger().log_warning(f"New \"bond_connection\" was done, when there was already connection working",
                                  LogLevel.LOW_FREQ)
-            self.abort_connection_sync()
-
-        self._should_conn_thread_work = True
-        # self._are_new_jobs_globally_blocked = False TODO
-        self._connection_thread = Thread(target=self._connection_thread, args=host)
 
         Logger().log_info("Starting connection with manager", LogLevel.LOW_FREQ)
-        self._connection_thread.start()
+        self._run_on_loop(self._start_connection(host))
 
     def is_connected(self) -> bool:
         return self._is_connected_and_authenticated
@@ -157,8 +210,7 @@ class NetConnectionMgr:
         return self._session_token is not None and self._session_model is not None
 
     def register(self, host: str, register_request: WorkerModel) -> None:
-        url = f"{host}/worker/register"
-        response = NetConnectionMgr.send_request(requests.post, url, register_request)
+        response = self._http_client.post(host, "/worker/register", register_request)
 
         model_response = WorkerRegistration.model_validate(response.json())
         NetConnectionMgr.validate_response(model_response.result)
@@ -169,37 +221,34 @@ class NetConnectionMgr:
 
         self._register_internal()
 
+    def get_registered_host(self) -> str:
+        if not self.is_registered():
+            raise Exception("Worker is not registered to any host at the moment")
+        return self._session_host
+
     def get_connected_host(self) -> str:
         if not self.is_connected():
             raise Exception("Worker is not connected to any host at the moment")
         return self._session_host
 
     def unregister(self) -> None:
-        retries = 0
-
         request = self.prepare_unregister_request()
-        host = self.get_connected_host()
-        url = f"{host}/worker/unregister"
-        response = None
+        host = self.get_registered_host()
+
+        self.abort_connection_sync()
 
         self._session_token = None
         self._session_host = None
         self._session_model = None
 
-        while retries < SettingsLoader().get_settings().unregister_retries:
-            try:
-                response = NetConnectionMgr.send_request(requests.delete, url, request)
-                break
-            except Exception as e:
-                Logger().log_info(
-                    f"Unregister request failed, trying again with retry num: {retries + 1}, error trace: {e}",
-                    LogLevel.MEDIUM_FREQ)
-
-            time.sleep(SettingsLoader().get_settings().retry_timestep)
-            retries += 1
+        # Retries with backoff are done by the pooled client
+        try:
+            response = self._http_client.delete(host, "/worker/unregister", request)
+        except Exception as e:
+            Logger().log_error(f"Unregister request failed after all retries: {e}", LogLevel.LOW_FREQ)
+            return
 
-        if response is not None:
-            NetConnectionMgr.validate_response(CommandResult.model_validate(response.json()))
+        NetConnectionMgr.validate_response(CommandResult.model_validate(response.json()))
 
     def prepare_unregister_request(self) -> WorkerAuth:
         if not self.is_registered():
@@ -219,146 +268,203 @@ class NetConnectionMgr:
         return WorkerAuth(session_token=self._session_token, name=self._session_model.name)
 
     @staticmethod
-    def send_request(command_type, url: str, model: BaseModel) -> requests.Response:
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        Logger().log_info(f"Sending request to {url} with payload: {model.model_dump_json()}",
-                          LogLevel.MEDIUM_FREQ)
-        result = command_type(url, json=model.model_dump(), headers=headers)
-
-        Logger().log_info(f"Received response: {result.json()}", LogLevel.MEDIUM_FREQ)
-
-        return result
+    def prepare_success_response() -> str:
+        return json.dumps({"status": "SUCCESS"})
 
     # ------------------------------
     # Private methods
     # ------------------------------
 
-    def _ka_thread_func(self) -> None:
-        Logger().log_info("KA thread started", LogLevel.LOW_FREQ)
+    def _runtime_thread_func(self) -> None:
+        Logger().log_info("Network runtime started", LogLevel.LOW_FREQ)
+
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+        Logger().log_info("Network runtime stopped", LogLevel.LOW_FREQ)
+
+    def _run_on_loop(self, coro: Awaitable[any]) -> any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _start_ka(self) -> None:
+        self._ka_task = asyncio.create_task(self._ka_loop())
+
+    async def _start_connection(self, host: str) -> None:
+        await self._stop_connection()
+        self._connection_task = asyncio.create_task(self._connection_loop(host))
+
+    async def _stop_connection(self) -> None:
+        if self._connection_task is None:
+            return
+
+        self._connection_task.cancel()
+
+        try:
+            await self._connection_task
+        except asyncio.CancelledError:
+            pass
+
+        self._connection_task = None
+
+    async def _shutdown(self) -> None:
+        await self._stop_connection()
+
+        tasks = [self._ka_task] + list(self._msg_tasks)
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _ka_loop(self) -> None:
+        Logger().log_info("KA loop started", LogLevel.LOW_FREQ)
 
         execution_time = 0
 
-        while self._should_ka_thread_work:
+        while True:
             ka_interval = SettingsLoader().get_settings().ka_interval
-            sleep(max(0, ka_interval - execution_time))
-            prev_run_execution_time = execution_time
+            await asyncio.sleep(max(0, ka_interval - execution_time))
             execution_time = max(0, execution_time - ka_interval)
 
-            if not self.is_connected():
+            if not self.is_registered():
                 continue
 
             timestamp_before = time.perf_counter_ns()
-            auth = self.prepare_worker_auth()
 
             try:
-                Logger().log_info(
-                    f"Sending KA to currently connected host,"
-                    f" after previous KA which processing took {prev_run_execution_time}...",
-                    LogLevel.MEDIUM_FREQ)
-
-                url = f"{self.get_connected_host()}/worker/bump_ka"
-                response = self.send_request(requests.post, url, auth)
-                NetConnectionMgr.validate_response(response.json())
+                # HTTP is only a fallback for the time when the job socket is down
+                if not await self._send_ka_over_socket():
+                    await asyncio.to_thread(self._send_ka_over_http)
 
-                Logger().log_info("KA correctly sent to current host!", LogLevel.MEDIUM_FREQ)
+                Logger().log_info("KA correctly sent to current host!", LogLevel.HIGH_FREQ)
             except Exception as e:
                 Logger().log_error(f"Failed to send KA to the manager: {e}", LogLevel.MEDIUM_FREQ)
 
             timestamp_after = time.perf_counter_ns()
 
             self._last_ka_time_stamp = timestamp_after
-            execution_time += timestamp_after - timestamp_before
+            execution_time += convert_ns_to_s(timestamp_after - timestamp_before)
+
+    async def _send_ka_over_socket(self) -> bool:
+        if not self.is_connected():
+            return False
+
+        payload = KeepAlivePayload(progress=WorkerComponents().get_test_job_mgr().get_jobs_progress(),
+                                   resources=self.get_resources())
+
+        try:
+            await self.send_msg(SocketMsg(type=SocketMsgType.KA, payload=payload.model_dump()))
+        except Exception as e:
+            Logger().log_warning(f"Failed to send KA over job socket, falling back to HTTP: {e}", LogLevel.MEDIUM_FREQ)
+            return False
 
-        Logger().log_info("KA thread stopped", LogLevel.LOW_FREQ)
+        return True
+
+    def _send_ka_over_http(self) -> None:
+        response = self._http_client.post(self.get_registered_host(), "/worker/bump_ka", self.prepare_worker_auth())
+        NetConnectionMgr.validate_response(CommandResult.model_validate(response.json()))
 
-    # TODO:
     def _register_internal(self) -> None:
-        pass
+        WorkerComponents().get_test_job_mgr().block_new_jobs(BlockType.disable)
+        self.bond_connection_async(self._session_host)
 
-    def _process_msg(self, msg: str) -> str:
-        parsed = json.loads(msg)
+    @staticmethod
+    def _get_socket_url(host: str) -> str:
+        if host.startswith("https://"):
+            host = "wss://" + host.removeprefix("https://")
+        elif host.startswith("http://"):
+            host = "ws://" + host.removeprefix("http://")
 
-        proc = parsed['method']
-        kwargs = parsed['kwargs']
+        return f"{host}/worker/perform-test"
 
-        result = getattr(self, proc)(**kwargs)
+    @staticmethod
+    def _get_backoff_delay(attempt: int) -> float:
+        settings = SettingsLoader().get_settings()
+        cap = min(settings.reconnect_max_delay, settings.reconnect_base_delay * (2 ** attempt))
 
-        return result
+        # Full jitter keeps a fleet of workers from reconnecting in lockstep after a manager restart
+        return random.uniform(0, cap)
 
-    def _conn_msg_life_cycle(self, attempt: int) -> int:
-        try:
-            self._authenticate()
-        except Exception as e:
-            Logger().log_error(f"Failed to authenticate with Manager: {e}", LogLevel.LOW_FREQ)
-            return attempt + 1
+    async def _connection_loop(self, host: str) -> None:
+        attempt = 0
 
-        # save connected state
-        self._is_connected_and_authenticated = True
+        while attempt < SettingsLoader().get_settings().connection_retries:
+            if attempt != 0:
+                delay = NetConnectionMgr._get_backoff_delay(attempt)
+                Logger().log_info(f"Reconnecting to test websocket in {delay:.2f}s. Current attempt: {attempt + 1}",
+                                  LogLevel.MEDIUM_FREQ)
+                await asyncio.sleep(delay)
 
-        while self._should_conn_thread_work:
             try:
-                msg = self._socket_mgr.recv()
-                Logger().log_info(f"Received message from test socket: {msg}", LogLevel.HIGH_FREQ)
-                attempt = 0
-            except Exception as e:
-                Logger().log_error(f"Exception occurred during test websocket was receiving msg: {e}",
-                                   LogLevel.LOW_FREQ)
-                break
+                async with connect(NetConnectionMgr._get_socket_url(host)) as socket:
+                    self._socket_mgr = socket
+                    Logger().log_info(f"Connected with host: {host}", LogLevel.MEDIUM_FREQ)
 
-            try:
-                response = self._process_msg(msg)
-                Logger().log_info(f"Prepared response for last msg: {response}", LogLevel.HIGH_FREQ)
+                    await self._authenticate()
+                    self._is_connected_and_authenticated = True
+                    attempt = 0
+
+                    for callback in self._on_connected_callbacks:
+                        callback()
+
+                    await self._receive_loop()
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
-                Logger().log_error(f"Failed to process msg received from Manager: {e}", LogLevel.LOW_FREQ)
-                break
+                Logger().log_error(f"Connection with host {host} failed: {e}", LogLevel.MEDIUM_FREQ)
+            finally:
+                self._socket_mgr = None
+                self._is_connected_and_authenticated = False
+
+            attempt += 1
+
+        Logger().log_error(f"Giving up connection with host {host} after {attempt} attempts", LogLevel.LOW_FREQ)
+
+    async def _receive_loop(self) -> None:
+        async for msg in self._socket_mgr:
 
             try:
-                self._socket_mgr.send(response)
-                Logger().log_info("Response to Manager correctly send", LogLevel.HIGH_FREQ)
+                parsed = WireCodec.decode(msg)
             except Exception as e:
-                Logger().log_error(f"Failed to send response to Manager: {e}", LogLevel.LOW_FREQ)
-                break
+                Logger().log_error(f"Failed to parse msg received from Manager: {e}", LogLevel.LOW_FREQ)
+                continue
+
+            Logger().log_info(f"Received message from test socket: {parsed.type.name}", LogLevel.HIGH_FREQ)
 
-        return attempt + 1
+            handler = self._socket_msg_handlers.get(parsed.type)
+            if handler is None:
+                Logger().log_warning(f"Received unhandled msg type from Manager: {parsed.type.name}",
+                                     LogLevel.MEDIUM_FREQ)
+                continue
+
+            # Handlers run as separate tasks, so long jobs never stall the socket and outlive reconnects
+            task = asyncio.create_task(self._run_handler(handler, parsed))
+            self._msg_tasks.add(task)
+            task.add_done_callback(self._msg_tasks.discard)
+
+    @staticmethod
+    async def _run_handler(handler: SocketMsgHandler, msg: SocketMsg) -> None:
+        try:
+            await handler(msg)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            Logger().log_error(f"Failed to process msg {msg.type.name} received from Manager: {e}", LogLevel.LOW_FREQ)
 
-    def _authenticate(self) -> None:
-        auth = WorkerComponents().get_conn_mgr().prepare_worker_auth().model_dump_json()
+    async def _authenticate(self) -> None:
+        auth = self.prepare_worker_auth()
+        auth.protocols = SUPPORTED_PROTOCOLS
+        auth = auth.model_dump_json()
 
         Logger().log_info(f"Sending auth msg to manager: {auth}", LogLevel.MEDIUM_FREQ)
-        self._socket_mgr.send(auth)
+        await self._socket_mgr.send(auth)
 
-        rsp = self._socket_mgr.recv()
+        rsp = await self._socket_mgr.recv()
         Logger().log_info(f"Received auth response from manager: {rsp}", LogLevel.MEDIUM_FREQ)
 
-        result = CommandResult.model_validate(rsp)
+        result = SocketAuthResult.model_validate_json(rsp)
 
         if result.result != "SUCCESS":
             raise Exception(f"Auth process failed: {result.result}")
 
-    async def _conn_thread(self, host: str):
-        attempt = 0
-
-        while self._should_conn_thread_work and attempt < SettingsLoader().get_settings().connection_retries:
-
-            if attempt != 0:
-                Logger().log_info(
-                    f"Performing another attempt to work with test websocket after 1 second."
-                    f" Current attempt: {attempt + 1}",
-                    LogLevel.MEDIUM_FREQ)
-                time.sleep(1)
-
-            try:
-                self._socket_mgr = await websockets.connect(f"{host}/perform-test")
-                Logger().log_info(f"Connected with host: {host}", LogLevel.MEDIUM_FREQ)
-                attempt = self._conn_msg_life_cycle(attempt)
-                self._socket_mgr = None
-            except Exception as e:
-                Logger().log_error(f"Failed to connect with host {host}: {e}", LogLevel.MEDIUM_FREQ)
-                attempt += 1
-
-    @staticmethod
-    def prepare_success_response() -> str:
-        return json.dumps({"status": "SUCCESS"})
+        self._codec = create_codec(result.protocol)
+        Logger().log_info(f"Using wire protocol: {result.protocol}", LogLevel.MEDIUM_FREQ)
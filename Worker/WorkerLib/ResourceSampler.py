@@ -0,0 +1,178 @@
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from threading import Thread, Condition
+
+import psutil
+
+from Utils.Logger import Logger, LogLevel
+
+BYTES_IN_MB: int = 1024 * 1024
+
+
+# Cpu usage is in percent of a single core, so a process using two cores reports 200
+@dataclass(frozen=True, slots=True)
+class ResourceSample:
+    timestamp: float
+    process_cpu_percent: float
+    process_rss_mb: float
+    engines_cpu_percent: float
+    engines_rss_mb: float
+    engine_processes: int
+    system_cpu_percent: float
+    system_available_mb: float
+    load_avg: float
+
+    def get_cpu_percent(self) -> float:
+        return self.process_cpu_percent + self.engines_cpu_percent
+
+    def get_rss_mb(self) -> float:
+        return self.process_rss_mb + self.engines_rss_mb
+
+
+class ResourceSampler:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _interval_s: float
+    _samples: deque[ResourceSample]
+
+    _process: psutil.Process
+    # Cpu usage is measured between two calls on the same object, so child processes are kept across samples
+    _children: dict[int, psutil.Process]
+    _host_cpus: int
+
+    _cv: Condition
+    _should_work: bool
+    _thread: Thread
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self, interval_s: float, history_size: int) -> None:
+        self._interval_s = interval_s
+        self._samples = deque(maxlen=history_size)
+
+        self._process = psutil.Process()
+        self._children = {}
+        self._host_cpus = psutil.cpu_count() or 1
+
+        # First calls only start the cpu time measurement
+        self._process.cpu_percent(None)
+        psutil.cpu_percent(None)
+
+        self._cv = Condition()
+        self._should_work = True
+        self._thread = Thread(target=self._sampler_thread)
+        self._thread.start()
+
+        Logger().log_info("Resource sampler started", LogLevel.LOW_FREQ)
+
+    def destroy(self) -> None:
+        with self._cv:
+            self._should_work = False
+            self._cv.notify_all()
+
+        self._thread.join()
+        Logger().log_info("Resource sampler destroyed", LogLevel.LOW_FREQ)
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def get_host_cpus(self) -> int:
+        return self._host_cpus
+
+    def get_latest(self) -> ResourceSample | None:
+        with self._cv:
+            return self._samples[-1] if len(self._samples) != 0 else None
+
+    # Samples from the last window, oldest first
+    def get_samples(self, window_s: float | None = None) -> list[ResourceSample]:
+        with self._cv:
+            samples = list(self._samples)
+
+        if window_s is None:
+            return samples
+
+        since = time.perf_counter() - window_s
+        return [sample for sample in samples if sample.timestamp >= since]
+
+    # Short spikes are smoothed out, so single samples never decide about scheduling
+    def get_average(self, window_s: float) -> ResourceSample | None:
+        samples = self.get_samples(window_s)
+        if len(samples) == 0:
+            return None
+
+        count = len(samples)
+        return ResourceSample(timestamp=samples[-1].timestamp,
+                              process_cpu_percent=sum(s.process_cpu_percent for s in samples) / count,
+                              process_rss_mb=sum(s.process_rss_mb for s in samples) / count,
+                              engines_cpu_percent=sum(s.engines_cpu_percent for s in samples) / count,
+                              engines_rss_mb=sum(s.engines_rss_mb for s in samples) / count,
+                              engine_processes=round(sum(s.engine_processes for s in samples) / count),
+                              system_cpu_percent=sum(s.system_cpu_percent for s in samples) / count,
+                              system_available_mb=sum(s.system_available_mb for s in samples) / count,
+                              load_avg=samples[-1].load_avg)
+
+    def take_sample(self) -> ResourceSample:
+        engines_cpu_percent, engines_rss_mb = self._sample_children()
+
+        sample = ResourceSample(timestamp=time.perf_counter(),
+                                process_cpu_percent=self._process.cpu_percent(None),
+                                process_rss_mb=self._process.memory_info().rss / BYTES_IN_MB,
+                                engines_cpu_percent=engines_cpu_percent,
+                                engines_rss_mb=engines_rss_mb,
+                                engine_processes=len(self._children),
+                                # System wide usage is scaled to the same units as the processes
+                                system_cpu_percent=psutil.cpu_percent(None) * self._host_cpus,
+                                system_available_mb=psutil.virtual_memory().available / BYTES_IN_MB,
+                                load_avg=os.getloadavg()[0])
+
+        with self._cv:
+            self._samples.append(sample)
+
+        return sample
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _sampler_thread(self) -> None:
+        while True:
+            with self._cv:
+                self._cv.wait_for(lambda: not self._should_work, self._interval_s)
+
+                if not self._should_work:
+                    return
+
+            try:
+                self.take_sample()
+            except Exception as e:
+                Logger().log_error(f"Resource sampling failed: {e}", LogLevel.LOW_FREQ)
+
+    # Engines are started by the tournament runners, so all descendants are counted
+    def _sample_children(self) -> tuple[float, float]:
+        children = {}
+        cpu_percent = 0.0
+        rss_mb = 0.0
+
+        for child in self._process.children(recursive=True):
+            # Equality includes the creation time, so a reused pid gets a fresh measurement
+            cached = self._children.get(child.pid)
+            child = cached if cached == child else child
+
+            try:
+                with child.oneshot():
+                    cpu_percent += child.cpu_percent(None)
+                    rss_mb += child.memory_info().rss / BYTES_IN_MB
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+
+            children[child.pid] = child
+
+        self._children = children
+        return cpu_percent, rss_mb
@@ -0,0 +1,95 @@
+import asyncio
+
+from Models.WorkerModels import JobResultChunk, JobResultPayload, JobAckPayload, SocketMsg, SocketMsgType
+from Utils.Logger import Logger, LogLevel
+from Worker.WorkerLib.WorkerComponents import WorkerComponents
+
+
+# Lives entirely on the network runtime loop, so no locking is needed
+class ResultOutbox:
+    # ------------------------------
+    # Class fields
+    # ------------------------------
+
+    _next_seqs: dict[int, int]
+    _pending: list[JobResultChunk]
+    _unacked: dict[tuple[int, int], JobResultChunk]
+    _flush_task: asyncio.Task | None
+
+    # ------------------------------
+    # Class creation
+    # ------------------------------
+
+    def __init__(self) -> None:
+        self._next_seqs = dict[int, int]()
+        self._pending = list[JobResultChunk]()
+        self._unacked = dict[tuple[int, int], JobResultChunk]()
+        self._flush_task = None
+
+    # ------------------------------
+    # Class interaction
+    # ------------------------------
+
+    def push(self, job_id: int, seeds: list[int], results: list[str], durations: list[float] | None = None,
+             error: str = "", done: bool = False) -> None:
+        seq = self._next_seqs.get(job_id, 0)
+        self._next_seqs[job_id] = seq + 1
+
+        chunk = JobResultChunk(job_id=job_id, seq=seq, seeds=seeds, results=results,
+                               durations=[] if durations is None else durations, error=error, done=done)
+        self._unacked[(job_id, seq)] = chunk
+        self._pending.append(chunk)
+
+        self._schedule_flush()
+
+    def on_ack(self, ack: JobAckPayload) -> None:
+        for job_id, seq in zip(ack.job_ids, ack.seqs):
+            chunk = self._unacked.pop((job_id, seq), None)
+
+            if chunk is not None and chunk.done:
+                self._next_seqs.pop(job_id, None)
+
+    # Everything the manager has not confirmed is sent again, it ignores chunks it already merged
+    def resend_unacked(self) -> None:
+        if len(self._unacked) == 0:
+            return
+
+        Logger().log_info(f"Resending {len(self._unacked)} unacknowledged result chunks", LogLevel.MEDIUM_FREQ)
+
+        self._pending = sorted(self._unacked.values(), key=lambda chunk: (chunk.job_id, chunk.seq))
+        self._schedule_flush()
+
+    # Results of a cancelled job are of no use to the manager anymore
+    def drop_job(self, job_id: int) -> None:
+        self._pending = [chunk for chunk in self._pending if chunk.job_id != job_id]
+        self._unacked = {key: chunk for key, chunk in self._unacked.items() if key[0] != job_id}
+        self._next_seqs.pop(job_id, None)
+
+    def get_num_unacked(self) -> int:
+        return len(self._unacked)
+
+    # ------------------------------
+    # Private methods
+    # ------------------------------
+
+    def _schedule_flush(self) -> None:
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        # Yield once, so all games finished in the same loop iteration go out in a single frame
+        await asyncio.sleep(0)
+
+        chunks = self._pending
+        self._pending = []
+        self._flush_task = None
+
+        if len(chunks) == 0:
+            return
+
+        try:
+            await WorkerComponents().get_conn_mgr().send_msg(
+                SocketMsg(type=SocketMsgType.RESULT, payload=JobResultPayload(chunks=chunks).model_dump()))
+        except Exception as e:
+            # Chunks stay unacknowledged and are resent once the connection is back
+            Logger().log_warning(f"Failed to send {len(chunks)} result chunks: {e}", LogLevel.MEDIUM_FREQ)
@@ -1,4 +1,17 @@
+import asyncio
+import copy
+import time
+from threading import Lock
+
+from Models.WorkerModels import JobProgress, SocketMsg, SocketMsgType, JobRequestPayload, JobAckPayload, \
+    JobCancelPayload, TaskSetupPayload
+from Modules.ModuleMgr import ModuleMgr
+from Modules.WorkerTestModule.BaseWorkerTestModule import BaseWorkerTestModule
+from Utils.Helpers import ensure_path_exists
 from Utils.Logger import Logger, LogLevel
+from Utils.SettingsLoader import SettingsLoader
+from Worker.WorkerLib.CoreAllocator import CoreAllocator
+from Worker.WorkerLib.ResultOutbox import ResultOutbox
 from Worker.WorkerLib.TestTask import TestTask
 from Worker.WorkerLib.WorkerComponents import StopType, BlockType, WorkerComponents
 
@@ -10,6 +23,14 @@ class TestJobMgr:
 
     _are_new_jobs_globally_blocked: bool
     _ongoing_tasks: dict[str, TestTask]
+    _jobs_progress: dict[int, JobProgress]
+    _progress_lock: Lock
+
+    # Modules are set up in the background, jobs of the task wait for the setup to finish
+    _test_modules: dict[int, tuple[TaskSetupPayload, asyncio.Task]]
+    _core_allocator: CoreAllocator | None
+    _result_outbox: ResultOutbox
+    _running_jobs: dict[int, asyncio.Task]
 
     # ------------------------------
     # Class creation
@@ -18,10 +39,27 @@ class TestJobMgr:
     def __init__(self) -> None:
         self._are_new_jobs_globally_blocked = True
         self._ongoing_tasks = dict[str, TestTask]()
+        self._jobs_progress = dict[int, JobProgress]()
+        self._progress_lock = Lock()
+
+        self._test_modules = dict[int, tuple[TaskSetupPayload, asyncio.Task]]()
+        self._core_allocator = None
+        self._result_outbox = ResultOutbox()
+        self._running_jobs = dict[int, asyncio.Task]()
+
+        conn_mgr = WorkerComponents().get_conn_mgr()
+        conn_mgr.register_socket_msg_handler(SocketMsgType.JOB, self._on_job_msg)
+        conn_mgr.register_socket_msg_handler(SocketMsgType.ACK, self._on_ack_msg)
+        conn_mgr.register_socket_msg_handler(SocketMsgType.CANCEL, self._on_cancel_msg)
+        conn_mgr.register_socket_msg_handler(SocketMsgType.SETUP, self._on_setup_msg)
+        conn_mgr.register_on_connected(self._result_outbox.resend_unacked)
 
     def destroy(self) -> None:
         self.destroy_ongoing_jobs()
 
+        if self._core_allocator is not None:
+            self._core_allocator.destroy()
+
     # ------------------------------
     # Class interaction
     # ------------------------------
@@ -51,6 +89,22 @@ class TestJobMgr:
         else:
             raise Exception(f"Received unknown stop type: {stop_type}")
 
+    # Progress is piggybacked on the next KA frame
+    def report_job_progress(self, job_id: int, games_done: int, games_total: int) -> None:
+        with self._progress_lock:
+            self._jobs_progress[job_id] = JobProgress(job_id=job_id, games_done=games_done, games_total=games_total)
+
+    def clear_job_progress(self, job_id: int) -> None:
+        with self._progress_lock:
+            self._jobs_progress.pop(job_id, None)
+
+    def get_jobs_progress(self) -> list[JobProgress]:
+        with self._progress_lock:
+            return list(self._jobs_progress.values())
+
+    def get_num_unacked_results(self) -> int:
+        return self._result_outbox.get_num_unacked()
+
     # task_name == "" => block all tasks
     def block_new_jobs(self, block_type: BlockType, task_name: str = "") -> None:
         type_value = True if block_type == BlockType.enable else False
@@ -72,6 +126,125 @@ class TestJobMgr:
 
         return self._ongoing_tasks[task_name].is_blocked or self._are_new_jobs_globally_blocked
 
+    def _get_core_allocator(self) -> CoreAllocator:
+        cpus = WorkerComponents().get_conn_mgr().get_max_cpus()
+        memory_mb = WorkerComponents().get_conn_mgr().get_max_mem_mb()
+
+        # Lives on the network runtime loop, recreated only when the worker is registered again with other limits
+        if self._core_allocator is None or not self._core_allocator.is_matching(cpus, memory_mb):
+            if self._core_allocator is not None:
+                self._core_allocator.destroy()
+
+            settings = SettingsLoader().get_settings()
+            self._core_allocator = CoreAllocator(cpus, memory_mb, settings.pin_game_cores, settings.limit_game_memory)
+
+        return self._core_allocator
+
+    async def _play_single_game(self, module: BaseWorkerTestModule, job: JobRequestPayload, seed: int,
+                                games_done: list[int]) -> str:
+        async with self._get_core_allocator().acquire() as limits:
+            start = time.perf_counter()
+            result = await module.run_single_test(job.arg_str, seed, limits)
+            duration = time.perf_counter() - start
+
+        games_done[0] += 1
+        self.report_job_progress(job.job_id, games_done[0], len(job.seeds))
+
+        # Each game is streamed on its own, the outbox coalesces games finished together into one frame
+        self._result_outbox.push(job.job_id, [seed], [result], [duration])
+
+        return result
+
+    async def _on_job_msg(self, msg: SocketMsg) -> None:
+        job = JobRequestPayload.model_validate(msg.payload)
+        error = ""
+
+        Logger().log_info(f"Received job: {job.job_id} for task: {job.task_id} with {len(job.seeds)} games",
+                          LogLevel.MEDIUM_FREQ)
+
+        if self._are_new_jobs_globally_blocked:
+            error = "New jobs are blocked on worker"
+        elif job.task_id not in self._test_modules:
+            error = f"Task: {job.task_id} is not set up on worker"
+        else:
+            games_done = [0]
+            self.report_job_progress(job.job_id, 0, len(job.seeds))
+            self._running_jobs[job.job_id] = asyncio.current_task()
+
+            # Every game of every job competes for the same cpu slots
+            try:
+                # Shielded, a cancelled job must not cancel the setup shared with other jobs of the task
+                module = await asyncio.shield(self._test_modules[job.task_id][1])
+
+                # First failed game cancels the others, so no game of a finished job keeps a slot or sends results
+                async with asyncio.TaskGroup() as games:
+                    for seed in job.seeds:
+                        games.create_task(self._play_single_game(module, job, seed, games_done))
+            except* Exception as group:
+                error = str(group.exceptions[0])
+            finally:
+                self.clear_job_progress(job.job_id)
+                self._running_jobs.pop(job.job_id, None)
+
+        self._result_outbox.push(job.job_id, [], [], error=error, done=True)
+
+        Logger().log_info(f"Job: {job.job_id} finished {"with error: " + error if error else "correctly"}",
+                          LogLevel.MEDIUM_FREQ)
+
+    async def _on_ack_msg(self, msg: SocketMsg) -> None:
+        self._result_outbox.on_ack(JobAckPayload.model_validate(msg.payload))
+
+    # Another copy of the job finished first, games still waiting for a cpu slot are never started
+    async def _on_cancel_msg(self, msg: SocketMsg) -> None:
+        for job_id in JobCancelPayload.model_validate(msg.payload).job_ids:
+            task = self._running_jobs.pop(job_id, None)
+
+            if task is not None:
+                task.cancel()
+
+            self._result_outbox.drop_job(job_id)
+            Logger().log_info(f"Job: {job_id} cancelled by manager", LogLevel.MEDIUM_FREQ)
+
+    # Setup arrives before the first job of the task on every connection and again whenever the task changes
+    async def _on_setup_msg(self, msg: SocketMsg) -> None:
+        setup = TaskSetupPayload.model_validate(msg.payload)
+        current = self._test_modules.get(setup.task_id)
+
+        if current is not None and current[0] == setup:
+            return
+
+        # Built module is reused when only its config changed
+        if current is not None and \
+                current[0].model_dump(exclude={"worker_config"}) == setup.model_dump(exclude={"worker_config"}):
+            module = asyncio.create_task(TestJobMgr._reconfigure_test_module(current[1], setup))
+        else:
+            # Builds run shell commands, so they get a thread with their own loop
+            module = asyncio.create_task(asyncio.to_thread(asyncio.run, TestJobMgr._build_test_module(setup)))
+
+        self._test_modules[setup.task_id] = (setup, module)
+        Logger().log_info(f"Setting up module: {setup.module_name} for task: {setup.task_id}", LogLevel.LOW_FREQ)
+
+    # Modules write keys into the passed configs, so they always get their own copies
+    @staticmethod
+    async def _build_test_module(setup: TaskSetupPayload) -> BaseWorkerTestModule:
+        build_config = copy.deepcopy(setup.worker_build_config)
+        build_config["build_dir"] = SettingsLoader().get_settings().build_dir
+        ensure_path_exists(build_config["build_dir"])
+
+        module = ModuleMgr().get_module_worker_part(setup.module_name).build(copy.deepcopy(setup.worker_init))
+        await module.configure_build(build_config)
+        await module.build_module()
+        await module.configure_module(copy.deepcopy(setup.worker_config))
+
+        Logger().log_info(f"Module: {setup.module_name} for task: {setup.task_id} set up", LogLevel.LOW_FREQ)
+        return module
+
+    @staticmethod
+    async def _reconfigure_test_module(built: asyncio.Task, setup: TaskSetupPayload) -> BaseWorkerTestModule:
+        module = await asyncio.shield(built)
+        await module.configure_module(copy.deepcopy(setup.worker_config))
+        return module
+
     # ------------------------------
     # RPC procedures
     # ------------------------------
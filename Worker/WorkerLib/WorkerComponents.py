@@ -1,6 +1,7 @@
 from enum import IntEnum
 
 from Utils.GlobalObj import GlobalObj
+from Utils.SettingsLoader import SettingsLoader
 
 
 class StopType(IntEnum):
@@ -17,6 +18,7 @@ from typing import TYPE_CHECKING, Union
 
 if TYPE_CHECKING:
     from .NetConnectionMgr import NetConnectionMgr
+    from .ResourceSampler import ResourceSampler
     from .TestJobsMgr import TestJobMgr
     from .WorkerProcess import WorkerProcess
 
@@ -29,6 +31,7 @@ class WorkerComponents(metaclass=GlobalObj):
     _connection_mgr: Union['NetConnectionMgr', None]
     _test_job_mgr: Union['TestJobMgr', None]
     _worker_process: Union['WorkerProcess', None]
+    _resource_sampler: Union['ResourceSampler', None]
 
     # ------------------------------
     # Class creation
@@ -38,6 +41,7 @@ class WorkerComponents(metaclass=GlobalObj):
         self._connection_mgr = None
         self._test_job_mgr = None
         self._worker_process = None
+        self._resource_sampler = None
 
     # ------------------------------
     # Class interaction
@@ -45,23 +49,30 @@ class WorkerComponents(metaclass=GlobalObj):
 
     def init_components(self) -> None:
         from .NetConnectionMgr import NetConnectionMgr
+        from .ResourceSampler import ResourceSampler
         from .TestJobsMgr import TestJobMgr
         from .WorkerProcess import WorkerProcess
 
         self._worker_process = WorkerProcess()
-        self._test_job_mgr = TestJobMgr()
+        self._resource_sampler = ResourceSampler(SettingsLoader().get_settings().resource_sample_interval_s,
+                                                 SettingsLoader().get_settings().resource_history_size)
+        # Job manager registers its socket handlers on creation
         self._connection_mgr = NetConnectionMgr()
+        self._test_job_mgr = TestJobMgr()
 
     def destroy_components(self) -> None:
         if self._test_job_mgr:
             self._test_job_mgr.destroy()
         if self._connection_mgr:
             self._connection_mgr.destroy()
+        if self._resource_sampler:
+            self._resource_sampler.destroy()
         if self._worker_process:
             self._worker_process.destroy()
 
     def is_inited(self) -> bool:
-        return self._connection_mgr is not None and self._test_job_mgr is not None and self._worker_process is not None
+        return self._connection_mgr is not None and self._test_job_mgr is not None and \
+            self._worker_process is not None and self._resource_sampler is not None
 
     def get_conn_mgr(self) -> Union['NetConnectionMgr', None]:
         return self._connection_mgr
@@ -71,3 +82,6 @@ class WorkerComponents(metaclass=GlobalObj):
 
     def get_worker_process(self) -> Union['WorkerProcess', None]:
         return self._worker_process
+
+    def get_resource_sampler(self) -> Union['ResourceSampler', None]:
+        return self._resource_sampler
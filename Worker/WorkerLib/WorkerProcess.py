@@ -1,16 +1,22 @@
-import json
-import socket
+import asyncio
 import time
-from threading import Thread, Semaphore
+from threading import Thread, Semaphore, Lock
 from typing import Callable
 
 from Utils.Helpers import get_pretty_time_spent_string_from_seconds, convert_ns_to_s
 from Utils.Logger import Logger, LogLevel
 from Utils.SettingsLoader import SettingsLoader
 from Worker.WorkerLib.CliTranslator import CliTranslator
+from Worker.WorkerLib.ControlServer import ControlServer
 from Worker.WorkerLib.LockFile import LockFile, LOCK_FILE_PATH
 from Worker.WorkerLib.WorkerComponents import StopType
 
+# Commands only reading the worker state, e.g. monitor streams, run concurrently with everything else
+READ_ONLY_COMMANDS: set[str] = {"query_worker_state", "help"}
+
+# Control server runs commands on executor threads, state changing ones are executed one at a time
+_state_command_lock: Lock = Lock()
+
 
 class WorkerProcess:
     # ------------------------------
@@ -27,7 +33,7 @@ class WorkerProcess:
     _lock_file: LockFile
 
     _cli_thread: Thread
-    _cli_socket: socket.socket
+    _control_server: ControlServer
 
     # ------------------------------
     # Class creation
@@ -49,7 +55,7 @@ class WorkerProcess:
         self._should_threads_work = False
 
         # Cleanup CLI connection thread
-        self._cli_socket.close()
+        self._control_server.stop()
         self._cli_thread.join()
 
         self._lock_file.unlock_file()
@@ -71,8 +77,9 @@ class WorkerProcess:
         self._stop_sem = Semaphore(0)
 
         # Start CLI thread
+        self._control_server = ControlServer(SettingsLoader().get_settings().control_socket_path,
+                                             WorkerProcess._process_cli_command)
         self._cli_thread = Thread(target=self._worker_cli_thread_guarded)
-        self._cli_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self._cli_thread.start()
 
     def set_stop_type(self, stop_type: StopType) -> None:
@@ -112,52 +119,29 @@ class WorkerProcess:
 
         Logger().log_info("Thread stopped...", LogLevel.LOW_FREQ)
 
-    def _worker_cli_try_catch_guard(self, call: Callable) -> any:
-        try:
-            return call()
-        except socket.timeout:
-            return None
-        except Exception as e:
-            if self._should_threads_work:
-                Logger().log_error(f"Failed to process socket operation {call} because of error: {e}",
-                                   LogLevel.LOW_FREQ)
-            return None
-
     def _worker_cli_thread(self) -> None:
         Logger().log_info("CLI thread started...", LogLevel.LOW_FREQ)
 
-        self._cli_socket.bind(("localhost", SettingsLoader().get_settings().process_port))
-        self._cli_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._cli_socket.listen()
-        self._cli_socket.settimeout(5)
+        asyncio.run(self._control_server.serve())
 
-        while self._should_threads_work:
-            result = self._worker_cli_try_catch_guard(self._cli_socket.accept)
-            if result is None:
-                continue
+    @staticmethod
+    def _process_cli_command(args: list[str]) -> str:
+        commands = [arg.strip()[2:].strip() for arg in args if CliTranslator.is_command(arg)]
 
-            conn, addr = result
+        if all(command in READ_ONLY_COMMANDS for command in commands):
+            return WorkerProcess._execute_cli_command(args)
 
-            Logger().log_info(f"Received connection from: {addr}", LogLevel.MEDIUM_FREQ)
-            data = self._worker_cli_try_catch_guard(conn.recv(1024).decode)
-            if data is None:
-                continue
+        with _state_command_lock:
+            return WorkerProcess._execute_cli_command(args)
 
-            Logger().log_info(f"Received command payload: {data}", LogLevel.MEDIUM_FREQ)
-            try:
-                cli_translator = CliTranslator()
-                cli_translator.parse_args(json.loads(data)["args"])
-                response = f"SUCCESS: {cli_translator.get_response()}"
-            except Exception as e:
-                msg = f"Failed to parse or process command : {e}"
-                Logger().log_error(msg, LogLevel.LOW_FREQ)
-                response = msg
+    @staticmethod
+    def _execute_cli_command(args: list[str]) -> str:
+        cli_translator = CliTranslator()
 
-            try:
-                conn.sendall(response.encode())
-                conn.close()
-            except Exception as e:
-                Logger().log_error(f"Failed to send response to client: {e}", LogLevel.LOW_FREQ)
+        if cli_translator.parse_args(args) != 0:
+            raise Exception(cli_translator.get_response())
+
+        return f"SUCCESS: {cli_translator.get_response()}"
 
     def _worker_cli_thread_guarded(self):
         self._thread_guard(self._worker_cli_thread)
@@ -1,11 +1,22 @@
 from pydantic import BaseModel
 
+from Worker.WorkerLib.ControlProtocol import DEFAULT_CONTROL_SOCKET_PATH
+
 
 class WorkerSettings(BaseModel):
     unregister_retries: int = 10
     retry_timestep: float = 1
     thread_retries: int = 10
-    process_port: int = 60101
+    control_socket_path: str = DEFAULT_CONTROL_SOCKET_PATH
     connection_retries: int = 10
+    reconnect_base_delay: float = 0.5
+    reconnect_max_delay: float = 30
     gentle_stop_timeout: float = 15
     ka_interval: int = 10
+    http_pool_size: int = 4
+    http_timeout: float = 10
+    resource_sample_interval_s: float = 1
+    resource_history_size: int = 600
+    pin_game_cores: bool = True
+    limit_game_memory: bool = True
+    build_dir: str = "/tmp/Checkmate-Chariot-tune-worker-builds/"
@@ -1,5 +1,5 @@
 #!/bin/bash
-OPTS="--help --version --connect --unregister --set_log_level --stop_worker --abort_worker --switch_jobs_block --query_worker_state --deploy"
+OPTS="--help --version --connect --unregister --set_log_level --stop_worker --abort_worker --switch_jobs_block --query_worker_state --deploy --monitor"
 
 _worker_cli_completion() {
     local cur
@@ -1,21 +1,40 @@
 import os
 
-from ProjectInfo.ProjectInfo import ProjectInfoInstance
-from Utils.Logger import Logger, LogLevel
-from Utils.SettingsLoader import SettingsLoader
-from Worker.WorkerLib.Cli import Cli
-from Worker.WorkerLib.WorkerSettings import WorkerSettings
+from Utils.StartupProfiler import StartupProfiler
+from Worker.WorkerLib.FastCli import is_fast_path_possible, fast_forward_commands
 
 SETTINGS_PATH = f"{os.path.dirname(os.path.abspath(__file__))}/settings.json"
 
 
 def main_cli(args: list[str]) -> int:
+    if is_fast_path_possible(args):
+        with StartupProfiler().phase("Forward backend commands"):
+            rv = fast_forward_commands(args, SETTINGS_PATH)
+    else:
+        rv = _main_full_cli(args)
+
+    StartupProfiler().report()
+    return rv
+
+
+def _main_full_cli(args: list[str]) -> int:
+    # Imported lazily, only frontend commands need pydantic, psutil and the command translators
+    with StartupProfiler().phase("Import Cli"):
+        from Utils.Logger import Logger, LogLevel
+        from Utils.SettingsLoader import SettingsLoader
+        from Worker.WorkerLib.Cli import Cli
+        from Worker.WorkerLib.WorkerSettings import WorkerSettings
+
     # init logger
-    Logger("./cli.log", False, LogLevel.MEDIUM_FREQ)
-    SettingsLoader(WorkerSettings, SETTINGS_PATH)
+    with StartupProfiler().phase("Logger"):
+        Logger("./cli.log", False, LogLevel.MEDIUM_FREQ)
+
+    with StartupProfiler().phase("SettingsLoader"):
+        SettingsLoader(WorkerSettings, SETTINGS_PATH)
 
     cli = Cli()
-    rv = cli.parse_args(args)
+    with StartupProfiler().phase("Cli.parse_args"):
+        rv = cli.parse_args(args)
 
     SettingsLoader().destroy()
     Logger().destroy()
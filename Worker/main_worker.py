@@ -2,6 +2,7 @@ import os
 
 from Utils.Logger import Logger, LogLevel
 from Utils.SettingsLoader import SettingsLoader
+from Utils.StartupProfiler import StartupProfiler
 from Worker.WorkerLib.WorkerComponents import WorkerComponents
 from Worker.WorkerLib.WorkerSettings import WorkerSettings
 
@@ -11,19 +12,24 @@ SETTINGS_PATH = f"{os.path.dirname(os.path.abspath(__file__))}/settings.json"
 
 def worker_process_init():
     # init logger
-    Logger(LOGGER_PATH, False, LogLevel.MEDIUM_FREQ)
+    with StartupProfiler().phase("Logger"):
+        Logger(LOGGER_PATH, False, LogLevel.MEDIUM_FREQ)
 
     # init SettingsLoader
-    SettingsLoader(WorkerSettings, SETTINGS_PATH)
+    with StartupProfiler().phase("SettingsLoader"):
+        SettingsLoader(WorkerSettings, SETTINGS_PATH)
 
     try:
-        WorkerComponents().init_components()
+        with StartupProfiler().phase("WorkerComponents.init_components"):
+            WorkerComponents().init_components()
     except Exception as e:
         Logger().log_error(f"Failed to start worker process: {e}", LogLevel.LOW_FREQ)
 
         if not WorkerComponents().is_inited():
             WorkerComponents().destroy_components()
 
+    StartupProfiler().report()
+
     if WorkerComponents().is_inited():
 
         WorkerComponents().get_worker_process().start_processing()
@@ -1,8 +1,12 @@
 #!/bin/python
 
 import sys
-from Worker.main_cli import main_cli
+from Utils.StartupProfiler import start_startup_profiler
 
 if __name__ == '__main__':
-    rv = main_cli(sys.argv[1:])
+    # Started before the CLI is imported, so its import cost is measured too
+    args = start_startup_profiler(sys.argv[1:])
+
+    from Worker.main_cli import main_cli
+    rv = main_cli(args)
     exit(rv)
\ No newline at end of file
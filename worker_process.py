@@ -1,6 +1,11 @@
 #!/bin/python
 
-from Worker.main_worker import worker_process_init
+import sys
+from Utils.StartupProfiler import start_startup_profiler
 
 if __name__ == '__main__':
+    # Started before the worker is imported, so its import cost is measured too
+    start_startup_profiler(sys.argv[1:])
+
+    from Worker.main_worker import worker_process_init
     worker_process_init()